@@ -1,4 +1,24 @@
+import argparse
+import time
+
+parser = argparse.ArgumentParser(description="ICA Bot")
+parser.add_argument("--fast", action="store_true", help="독립적인 시작 단계를 동시에 실행 (재시작용)")
+parser.add_argument("--quiet", action="store_true", help="표 출력 없이 빠른 시작 (--fast 포함)")
+args = parser.parse_args()
+startup_at = time.perf_counter()
+
+if args.fast or args.quiet:
+    # 빠른 시작: env 확인 후 세팅값 확인과 db -> 토큰 -> 잔고 조회를 동시에 실행
+    from utils.initailize import print_startup_timings, run_startup
+
+    ok, timings = run_startup(quiet=args.quiet)
+    print_startup_timings(timings, time.perf_counter() - startup_at, quiet=args.quiet)
+    if not ok:
+        exit(1)
+    exit()
+
 from utils.initailize import check_db, check_env_file, check_holdings, check_kis_token, check_settings
+from utils.log_print import flush_logs
 from rich.console import Console
 from rich.table import Table
 console = Console()
@@ -13,6 +33,7 @@ console.print()
 
 
 def print_step_table(step_num, column_title, row_text):
+    flush_logs()
     table = Table(
         title=f"[bold yellow]Step{step_num}[/bold yellow]",
         border_style="yellow",
@@ -22,14 +43,19 @@ def print_step_table(step_num, column_title, row_text):
     console.print(table, justify="center")
 
 def print_check_result(title, success_message, error_message, check_function):
-    """재사용 가능한 체크 결과 출력 함수"""
-    if check_function():
-        console.rule(f"[bold green]:white_check_mark: {title} 완료! :white_check_mark:[/bold green]")
+    """재사용 가능한 체크 결과 출력 함수 (단계 소요 시간 포함)"""
+    start = time.perf_counter()
+    ok = check_function()
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    # 단계에서 남긴 로그를 먼저 출력한 뒤 결과 표시 (로그는 백그라운드 스레드에서 출력됨)
+    flush_logs()
+    if ok:
+        console.rule(f"[bold green]:white_check_mark: {title} 완료! ({elapsed_ms:.0f}ms) :white_check_mark:[/bold green]")
         console.print(f"[bold green]{success_message}[/bold green]", justify="center")
         console.print()
         return True
     else:
-        console.print(f"[bold red]{error_message}[/bold red]", justify="center")
+        console.print(f"[bold red]{error_message} ({elapsed_ms:.0f}ms)[/bold red]", justify="center")
         return False
 
 # Step1 : .env 파일 확인
@@ -58,7 +84,7 @@ if not print_check_result(
     "KIS 토큰 조회/생성",
     "KIS 토큰이 정상적으로 조회/생성되었습니다.",
     "KIS 토큰 조회/생성 실패했습니다.",
-    check_kis_token 
+    check_kis_token
 ):
     exit()
 
@@ -72,7 +98,7 @@ if not print_check_result(
 ):
     exit()
 
-# Step5 : 무한매수법 세팅값 확인 및 시작 
+# Step5 : 무한매수법 세팅값 확인 및 시작
 print_step_table(5, "무한매수법 세팅값 확인", "무한매수법 세팅값을 확인합니다.")
 if not print_check_result(
     "무한매수법 세팅값 확인",
@@ -81,3 +107,5 @@ if not print_check_result(
     check_settings
 ):
     exit()
+
+console.print(f"[dim]전체 시작 시간: {(time.perf_counter() - startup_at) * 1000:.0f}ms[/dim]", justify="center")
@@ -0,0 +1,19 @@
+import os
+import pytest
+
+# 테스트 중에는 logs/ 파일 기록/콘솔 출력 끔 (utils 임포트 전에 설정)
+os.environ.setdefault("LOG_FILE", "")
+os.environ.setdefault("LOG_CONSOLE", "0")
+
+from utils import database  # noqa: E402
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """임시 SQLite DB (테이블 생성 완료, 테스트가 끝나면 연결 닫음)"""
+    monkeypatch.setattr(database, "DB_PATH", str(tmp_path / "db.sqlite3"))
+    monkeypatch.setattr(database, "_conn", None)
+    database.create_tables()
+    yield database
+    if database._conn is not None:
+        database._conn.close()
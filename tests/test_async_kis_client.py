@@ -0,0 +1,30 @@
+import asyncio
+import pytest
+from utils.kis_tr.async_kis_client import AsyncKisClient
+from utils.kis_tr.mock_server import MockKisServer
+from utils.kis_tr.해외주식_현재체결가 import OverseasPrice
+
+
+@pytest.fixture
+def gateway_down():
+    server = MockKisServer(latency_ms=0, jitter_ms=0, rate_limit=0, error_rate=1.0)
+    url = server.serve_in_background()
+    yield server, url
+    server.shutdown()
+
+
+def test_gateway_error_with_text_body_is_retried_then_returned(gateway_down, monkeypatch):
+    server, url = gateway_down
+    monkeypatch.setattr(AsyncKisClient, "RETRY_BACKOFF", 0.001)
+
+    async def main():
+        async with AsyncKisClient("ak", "as", "token", base_url=url) as client:
+            inquiry = await client.get(OverseasPrice.API_PATH, OverseasPrice.TR_ID, params={"EXCD": "AMS", "SYMB": "SOXL"})
+            order = await client.post("/uapi/overseas-stock/v1/trading/order", "TTTT1002U", body={})
+            return inquiry, order
+
+    inquiry, order = asyncio.run(main())
+    # 조회는 재시도 후 (502, None), 주문은 재시도 없이 (502, None) - JSONDecodeError 없음
+    assert inquiry == (502, None)
+    assert order == (502, None)
+    assert server.stats["errors"] == AsyncKisClient.RETRY_COUNT + 2
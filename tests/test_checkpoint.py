@@ -0,0 +1,224 @@
+import asyncio
+import numpy as np
+import pytest
+from utils import database
+from utils.price_store import PriceStore
+from utils.strategy.backtest import run_backtest
+from utils.strategy.checkpoint import StrategyState, load_fills, save_checkpoints
+from utils.strategy.infinite_buying import (
+    REASON_CYCLE_END, REASON_SELL_MOC, REASON_SELL_STAR, REASON_SELL_TARGET, calc_t, unit_amount,
+)
+from utils.strategy.runner import StrategyInstance, StrategyRunner, restore_states
+
+ACCOUNT = "12345678-01"
+SETTINGS = {
+    "symbol": "SOXL", "ovrs_excg_cd": "AMEX", "initial_capital": 12000, "num_of_purchases": 40,
+    "sell_multiplier": 1.1, "moc_trigger_rate": 0.95, "profit_sell_ratio": 0.75, "rsi_period": 14,
+    "rsi_entry_threshold": 100, "reinvestment_type": "compound", "compound_ratio": 25,
+}
+
+
+def _prices(n, seed):
+    rng = np.random.default_rng(seed)
+    close = 20 * np.exp(np.cumsum(rng.normal(0, 0.04, n)))
+    high = close * (1 + np.abs(rng.normal(0, 0.02, n)))
+    return high, close
+
+
+def _bars(start, close):
+    dates = np.datetime64(start) + np.arange(len(close))
+    return {"date": dates, "open": close, "high": close, "low": close, "close": close, "volume": np.ones(len(close))}
+
+
+def _insert_fills(fills):
+    with database.transaction() as conn:
+        conn.executemany(
+            "INSERT INTO fills (account, side, ovrs_excg_cd, symbol, qty, price, filled_at) "
+            "VALUES (?, ?, 'AMEX', ?, ?, ?, '2026-10-16 15:59:00')",
+            [(ACCOUNT, side, symbol, qty, str(price)) for symbol, side, qty, price in fills],
+        )
+
+
+def _row(instance):
+    return ("2026-10-16T15:50:00", instance.instance_id, instance.symbol, instance.ovrs_excg_cd) + (
+        (0,) * len(database.STRATEGY_RESULT_VALUE_COLUMNS)
+    )
+
+
+class Held:
+    def __init__(self, qty, avg_price, now_price):
+        self.qty = qty
+        self.avg_price = avg_price
+        self.now_price = now_price
+
+
+class FakeRunner(StrategyRunner):
+    """API 클라이언트 없이 체결 반영/평가만 실행 (positions: account -> {(excg, symbol): Held} 또는 예외)"""
+
+    def __init__(self, instances, store, positions):
+        self.instances = instances
+        self.store = store
+        self.positions = positions
+        self.holdings = dict.fromkeys(positions)
+
+    async def _fetch_positions(self, account):
+        positions = self.positions[account]
+        if isinstance(positions, Exception):
+            raise positions
+        return positions
+
+
+@pytest.mark.parametrize("reinvestment_type", ["simple", "compound"])
+def test_apply_fill_matches_backtest_accounting(reinvestment_type):
+    settings = dict(SETTINGS, reinvestment_type=reinvestment_type)
+    high, close = _prices(400, seed=0)
+    result = run_backtest(high, close, settings)
+    state = StrategyState.initial("backtest", settings)
+    ratio = settings["profit_sell_ratio"]
+    position, sell_tp = 0, 0.0
+    cycles_ended = 0
+
+    for i, (c, reason) in enumerate(zip(close.tolist(), result["reason"].tolist())):
+        # 그날 체결을 백테스트 규칙대로 다시 만들어 매도 -> 매수 순서로 반영
+        sells = []
+        if reason & REASON_SELL_MOC:
+            sells.append((position - int(position * ratio) or position, c))
+        if reason & REASON_SELL_TARGET:
+            sells.append((int(position * ratio), sell_tp))
+        if reason & REASON_SELL_STAR:
+            sells.append((position - int(position * ratio), c))
+        ended = False
+        for qty, price in sells:
+            ended |= state.apply_fill("sell", qty, price, settings)
+        bought = int(result["position"][i]) - (position - sum(qty for qty, _ in sells))
+        if bought:
+            state.apply_fill("buy", bought, c, settings)
+        assert ended == bool(reason & REASON_CYCLE_END)
+        cycles_ended += ended
+        state.mark(state.value(c))
+
+        position, sell_tp = int(result["position"][i]), float(result["sell_target_price"][i])
+        assert state.position == position
+        assert state.cycle == result["cycle"][i] + ended
+        assert state.avg_price == pytest.approx(result["avg_price"][i])
+        assert state.cumulative_buy_amount == pytest.approx(result["cumulative_buy_amount"][i], abs=1e-6)
+        assert state.realized_profit_amount == pytest.approx(result["realized_profit_amount"][i], abs=1e-6)
+        # 현금에 매도금이 쌓이므로 평가금액/MDD 가 실현손익을 포함 (사이클 종료로 평가금액이 떨어지지 않음)
+        assert state.cash == pytest.approx(result["cash"][i], abs=1e-6)
+        assert state.value(c) == pytest.approx(result["portfolio_value"][i], abs=1e-6)
+        assert state.position_mdd == pytest.approx(result["position_mdd"][i], abs=1e-9)
+        # T 는 누적매수금 / 원금 기준 1회매수금 -> compound 원금까지 같아야 함
+        assert calc_t(state.cumulative_buy_amount, unit_amount(state.capital, settings["num_of_purchases"])) == (
+            pytest.approx(result["T"][i], abs=1e-9)
+        )
+    assert cycles_ended >= 2
+
+
+def test_restore_from_checkpoint_matches_uninterrupted_run(db, tmp_path):
+    settings = dict(SETTINGS, rsi_entry_threshold=40)
+    store = PriceStore(str(tmp_path / "prices"))
+    _, close = _prices(60, seed=3)
+    store.append("SOXL", "AMEX", _bars("2026-01-01", close[:20]))
+
+    def _start():
+        instance = StrategyInstance(settings, ACCOUNT)
+        restore_states([instance], store)
+        return instance, FakeRunner([instance], store, {})
+
+    straight, straight_runner = _start()
+    resumed, resumed_runner = _start()
+
+    def _catch_up(runner, instance):
+        last_id, fills = load_fills(instance.state.fill_id)
+        runner._catch_up(instance, fills.get(instance.key, ()), last_id)
+
+    _insert_fills([("SOXL", "buy", 10, 20.5), ("TQQQ", "buy", 3, 50), ("SOXL", "buy", 12, 19.25)])
+    store.append("SOXL", "AMEX", _bars("2026-01-21", close[20:40]))
+    _catch_up(straight_runner, straight)
+    _catch_up(resumed_runner, resumed)
+
+    # 재시작: 체크포인트 저장 후 새 인스턴스로 복구
+    save_checkpoints([_row(resumed)], [resumed.state])
+    resumed = StrategyInstance(settings, ACCOUNT)
+    assert restore_states([resumed], store) == 0
+
+    _insert_fills([("SOXL", "sell", 16, 23.0), ("SOXL", "buy", 4, 21.0), ("SOXL", "sell", 10, 24.0)])
+    store.append("SOXL", "AMEX", _bars("2026-02-10", close[40:]))
+    _catch_up(straight_runner, straight)
+    _catch_up(resumed_runner, resumed)
+
+    assert straight.state.cycle == 2 and straight.state.fill_id == 6
+    assert resumed.state.strategy_result_id is not None
+    assert resumed.state.to_row()[2:] == straight.state.to_row()[2:]
+    assert resumed.rsi.peek(20.0) == straight.rsi.peek(20.0)
+
+
+def test_sync_position_corrects_drift():
+    state = StrategyState.initial("drift", SETTINGS)
+    state.apply_fill("buy", 10, 20.0, SETTINGS)
+
+    state.sync_position(10, 20.5, SETTINGS)     # 수량 같음 -> 평단만
+    assert (state.position, state.avg_price, state.cumulative_buy_amount, state.cash) == (10, 20.5, 200.0, 11800.0)
+
+    state.sync_position(15, 21.0, SETTINGS)     # 기록 밖 매수 -> 누적매수금 다시 계산, 현금은 매수금 차이만큼
+    assert (state.position, state.avg_price, state.cumulative_buy_amount, state.cash) == (15, 21.0, 315.0, 11685.0)
+
+    state.sync_position(0, 0.0, SETTINGS)       # 기록 없이 0 -> 사이클 종료 (보유분은 매수금으로 회수)
+    assert (state.position, state.cycle, state.cumulative_buy_amount, state.avg_price) == (0, 2, 0.0, 0.0)
+    assert state.cash == 12000.0
+
+
+def test_cash_is_filled_for_checkpoints_without_it():
+    state = StrategyState("old", capital=12000.0, position=10, cumulative_buy_amount=200.0, realized_profit_amount=150.0)
+    assert state.with_cash(SETTINGS).cash == 12000.0 + 150.0 - 200.0
+
+
+def test_dry_run_does_not_persist(db, tmp_path):
+    store = PriceStore(str(tmp_path / "prices"))
+    instance = StrategyInstance(dict(SETTINGS), ACCOUNT)
+    restore_states([instance], store)
+    runner = FakeRunner([instance], store, {ACCOUNT: {("AMEX", "SOXL"): Held(0, 0.0, 20.0)}})
+
+    async def _no_orders():
+        return []
+
+    runner.reconcile_orders = _no_orders
+    [decision] = asyncio.run(runner.run_once(submit=False))
+    assert decision["plan"]["orders"]
+    assert database.fetchone("SELECT COUNT(*) FROM strategy_result")[0] == 0
+    assert database.fetchone("SELECT COUNT(*) FROM strategy_checkpoint")[0] == 0
+
+
+def test_fill_cursor_only_passes_applied_fills(db, tmp_path, monkeypatch):
+    store = PriceStore(str(tmp_path / "prices"))
+    instance = StrategyInstance(dict(SETTINGS), ACCOUNT)
+    restore_states([instance], store)
+    runner = FakeRunner([instance], store, {ACCOUNT: RuntimeError("잔고 조회 실패")})
+    _insert_fills([("SOXL", "buy", 10, 20.0), ("SOXL", "buy", 5, 18.0), ("TQQQ", "buy", 1, 50)])
+
+    # 잔고 조회 실패 (체결은 이미 반영됨) -> 커서도 지나가서 다음 실행에서 두 번 반영하지 않음
+    [decision] = asyncio.run(runner.evaluate())
+    assert "error" in decision
+    assert instance.state.fill_id == 3 and instance.state.cumulative_buy_amount == 290.0
+
+    # 체결 반영 도중 실패 -> 반영한 체결까지만 지나감
+    _insert_fills([("SOXL", "buy", 2, 19.0), ("SOXL", "sell", 5, 21.0)])
+    original = StrategyState.apply_fill
+
+    def _failing(self, side, qty, price, settings):
+        if side == "sell":
+            raise RuntimeError("반영 실패")
+        return original(self, side, qty, price, settings)
+
+    monkeypatch.setattr(StrategyState, "apply_fill", _failing)
+    [decision] = asyncio.run(runner.evaluate())
+    assert "error" in decision
+    assert instance.state.fill_id == 4 and instance.state.position == 17
+
+    # 다음 실행에서 남은 매도 1건만 반영
+    monkeypatch.setattr(StrategyState, "apply_fill", original)
+    runner.positions[ACCOUNT] = {("AMEX", "SOXL"): Held(12, instance.state.avg_price, 21.0)}
+    [decision] = asyncio.run(runner.evaluate())
+    assert "error" not in decision
+    assert instance.state.fill_id == 5 and instance.state.position == 12
+    assert instance.state.cumulative_buy_amount == pytest.approx(328.0 - 5 * 328.0 / 17)
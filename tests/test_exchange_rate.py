@@ -0,0 +1,72 @@
+import asyncio
+from datetime import date, datetime
+import pytest
+from utils.exchange_rate import KST, ExchangeRateService
+
+
+def _items(rate):
+    return [{"result": 1, "cur_unit": "USD", "cur_nm": "미국 달러", "deal_bas_r": f"{rate:,.2f}", "ttb": "", "tts": ""}]
+
+
+class FakeService(ExchangeRateService):
+    """_fetch_all 을 고정 응답으로 바꾼 서비스 (failing 날짜는 예외)"""
+
+    def __init__(self, failing=()):
+        super().__init__(access_key="key", base_url="http://127.0.0.1:1")
+        self.failing = set(failing)
+        self.requested = []
+
+    async def _fetch_all(self, days):
+        self.requested.append(list(days))
+        return [
+            (day, RuntimeError(f"조회 실패 {day}")) if day in self.failing else (day, _items(1300 + day.day))
+            for day in days
+        ]
+
+
+def _record_fetch(db, day, rates, fetched_at):
+    with db.transaction() as conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO exchange_rate_fetch (date, rates, fetched_at) VALUES (?, ?, ?)",
+            (day.isoformat(), rates, fetched_at.isoformat()),
+        )
+
+
+def test_empty_fetch_before_publication_is_retried_on_later_days(db):
+    day = date(2024, 3, 8)
+    _record_fetch(db, day, 0, datetime(2024, 3, 8, 9, 0, tzinfo=KST))
+    fx = FakeService()
+    assert fx._needs_fetch(day, date(2024, 3, 12))
+    assert fx.get_rate("USD", day) == 1308.0
+    # 다음 날 이후에 받은 빈 결과(휴일)는 다시 요청하지 않음
+    holiday = date(2024, 3, 1)
+    _record_fetch(db, holiday, 0, datetime(2024, 3, 4, 9, 0, tzinfo=KST))
+    assert not FakeService()._needs_fetch(holiday, date(2024, 3, 12))
+
+
+def test_partial_failure_keeps_successful_days(db):
+    failing = date(2024, 3, 6)
+    fx = FakeService(failing=[failing])
+    assert fx.backfill("2024-03-04", "2024-03-08") == 5
+    assert list(fx.failed_days) == [failing]
+    assert db.fetchone("SELECT COUNT(*) FROM exchange_rate_fetch")[0] == 4
+    assert fx.get_rate("USD", "2024-03-06") == 1305.0    # 실패한 날은 직전 영업일 환율
+
+    # 실패한 날짜만 다시 요청
+    fx.failing.clear()
+    assert fx.backfill("2024-03-04", "2024-03-08") == 1
+    assert fx.requested[-1] == [failing]
+    assert fx.get_rate("USD", "2024-03-06") == 1306.0
+
+
+def test_async_entry_points_inside_event_loop(db):
+    fx = FakeService()
+
+    async def main():
+        with pytest.raises(RuntimeError):
+            fx.get_rate("USD", "2024-03-08")
+        rate = await fx.aget_rate("USD", "2024-03-08")
+        rates = await fx.aget_rates("USD", ["2024-03-07", "2024-03-09"])
+        return rate, rates.tolist()
+
+    assert asyncio.run(main()) == (1308.0, [1307.0, 1308.0])
@@ -0,0 +1,46 @@
+import threading
+import time
+from datetime import datetime, timedelta
+from utils.kis_tr.kis_client import KisClient
+from utils.token import get_token
+
+
+class _SlowTokenResponse:
+    ok = True
+    status_code = 200
+    text = ""
+
+    def json(self):
+        expired_at = (datetime.now() + timedelta(hours=24)).strftime("%Y-%m-%d %H:%M:%S")
+        return {"access_token": f"token-{time.perf_counter_ns()}", "access_token_token_expired": expired_at}
+
+
+def test_issue_token_does_not_block_other_db_writes(db, monkeypatch):
+    monkeypatch.setenv("KIS_APP_KEY", "k")
+    monkeypatch.setenv("KIS_APP_SECRET", "s")
+    issuing = threading.Event()
+    calls = []
+
+    def issue_token(self):
+        calls.append(1)
+        issuing.set()
+        time.sleep(0.5)
+        return _SlowTokenResponse()
+
+    monkeypatch.setattr(KisClient, "issue_token", issue_token)
+    threads = [threading.Thread(target=get_token.fetch_kis_token) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    assert issuing.wait(5)
+
+    # 발급 요청이 진행 중이어도 공용 연결 쓰기는 바로 끝나야 함
+    started = time.perf_counter()
+    with db.transaction() as conn:
+        conn.execute("INSERT INTO scheduler_job (name, last_run_at) VALUES ('job', '2024-01-01')")
+    assert time.perf_counter() - started < 0.2
+
+    for thread in threads:
+        thread.join()
+    # 단일 실행: 잠금을 기다린 스레드는 먼저 발급된 토큰을 사용
+    assert len(calls) == 1
+    assert db.fetchone("SELECT COUNT(*) FROM Token")[0] == 1
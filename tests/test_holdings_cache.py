@@ -0,0 +1,79 @@
+import threading
+from utils.kis_tr.holdings_cache import HoldingsCache
+from utils.kis_tr.해외주식_주문 import OverseasStockOrder
+
+
+class FakeHoldings:
+    """iter_pages 호출마다 qty 를 1씩 늘린 잔고 1페이지 (block 이 설정되면 release 까지 대기)"""
+
+    account = "12345678-01"
+
+    def __init__(self):
+        self.calls = 0
+        self.block = None
+        self.started = threading.Event()
+
+    def iter_pages(self):
+        self.calls += 1
+        self.started.set()
+        if self.block is not None:
+            self.block.wait(5)
+        yield {"output1": [{"pdno": "SOXL", "ovrs_excg_cd": "AMEX", "ccld_qty_smtl1": str(self.calls), "avg_unpr3": "10"}]}
+
+
+def test_ttl_hit_and_invalidate():
+    holdings = FakeHoldings()
+    cache = HoldingsCache(holdings, ttl=60, watch_orders=False)
+    assert cache.get_position("AMEX", "SOXL").qty == 1
+    assert cache.get_position("AMEX", "SOXL").qty == 1
+    assert holdings.calls == 1
+    cache.invalidate()
+    assert cache.get_position("AMEX", "SOXL").qty == 2
+
+
+def test_invalidate_during_refresh_is_not_lost():
+    holdings = FakeHoldings()
+    cache = HoldingsCache(holdings, ttl=60, watch_orders=False)
+    holdings.block = threading.Event()
+    thread = threading.Thread(target=cache.get_positions)
+    thread.start()
+    assert holdings.started.wait(5)
+    # 조회가 진행 중일 때 주문 -> 무효화
+    cache.invalidate()
+    holdings.block.set()
+    thread.join()
+    # 주문 전에 시작한 조회 결과는 유효로 표시되지 않아 다시 조회
+    holdings.block = None
+    assert cache.get_position("AMEX", "SOXL").qty == 2
+    assert holdings.calls == 2
+
+
+class FakeResponse:
+    def json(self):
+        return {"rt_cd": "0", "msg_cd": "APBK0013", "msg1": "주문 전송 완료 되었습니다.", "output": {"ODNO": "0000000001"}}
+
+
+class FakeClient:
+    def post(self, path, tr_id, body=None):
+        return FakeResponse()
+
+
+def test_listener_error_does_not_hide_accepted_order():
+    received = []
+
+    def broken(account, side, body, result):
+        raise RuntimeError("database is locked")
+
+    def recorder(account, side, body, result):
+        received.append((account, side, result["output"]["ODNO"]))
+
+    OverseasStockOrder.add_order_listener(broken)
+    OverseasStockOrder.add_order_listener(recorder)
+    try:
+        order = OverseasStockOrder(None, None, None, "12345678", "01", client=FakeClient())
+        result = order.buy("US", "AMEX", "SOXL", 1, 30.0, "34")
+    finally:
+        OverseasStockOrder.remove_order_listener(broken)
+        OverseasStockOrder.remove_order_listener(recorder)
+    assert result["output"]["ODNO"] == "0000000001"
+    assert received == [("12345678-01", "buy", "0000000001")]
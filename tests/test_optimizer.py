@@ -0,0 +1,30 @@
+import numpy as np
+from utils.strategy.optimizer import _sweep_base, default_grid, sweep, write_best_settings
+
+BASE = {
+    "initial_capital": 12000, "num_of_purchases": 40, "sell_multiplier": 1.1, "moc_trigger_rate": 0.95,
+    "profit_sell_ratio": 0.75, "rsi_period": 14, "rsi_entry_threshold": 100, "reinvestment_type": "simple",
+    "compound_ratio": 25,
+}
+
+
+def test_default_sweep_keeps_simple_reinvestment(tmp_path):
+    grid = default_grid(BASE)
+    assert "compound_ratio" not in grid
+    assert _sweep_base(BASE, grid) is BASE
+
+    rng = np.random.default_rng(0)
+    close = 20 * np.exp(np.cumsum(rng.normal(0, 0.04, 300)))
+    results = sweep(close * 1.01, close, BASE, {"sell_multiplier": [1.05, 1.1]}, max_workers=1)
+    settings = write_best_settings(_sweep_base(BASE, grid), results[0], tmp_path / "setting.json")
+    assert settings["reinvestment_type"] == "simple"
+
+
+def test_compound_ratio_sweep_only_when_requested_or_already_compound():
+    compound = dict(BASE, reinvestment_type="compound")
+    assert default_grid(compound)["compound_ratio"] == [0, 25, 50]
+    assert _sweep_base(compound, default_grid(compound)) is compound
+
+    # simple 세팅에서 직접 compound_ratio 를 스윕하면 compound 로 고정
+    grid = dict(default_grid(BASE), compound_ratio=[0, 50])
+    assert _sweep_base(BASE, grid)["reinvestment_type"] == "compound"
@@ -0,0 +1,150 @@
+import asyncio
+from datetime import datetime, timedelta
+from decimal import Decimal
+from utils.kis_tr.models import Execution
+from utils.kis_tr.order_manager import (
+    CANCELLED, EXPIRED, FILLED, PARTIAL, REJECTED, SUBMITTED, AsyncOrderManager, OrderManager,
+)
+from utils.kis_tr.해외주식_주문 import OverseasStockOrder
+from utils.market_calendar import exchange_date
+
+ACCOUNT = "12345678-01"
+
+
+def _execution(ord_dt, odno, side, qty, filled, price, status="접수", orgn_odno="", rvse_cncl_dvsn="00"):
+    return Execution.from_item({
+        "ord_dt": ord_dt, "odno": odno, "orgn_odno": orgn_odno,
+        "sll_buy_dvsn_cd": "02" if side == "buy" else "01", "pdno": "SOXL", "ovrs_excg_cd": "AMEX",
+        "ft_ord_qty": str(qty), "ft_ord_unpr3": "30", "ft_ccld_qty": str(filled), "ft_ccld_unpr3": str(price),
+        "nccs_qty": str(qty - filled), "prcs_stat_name": status, "rvse_cncl_dvsn": rvse_cncl_dvsn,
+    })
+
+
+def _body(qty, price="30.0"):
+    return {"PDNO": "SOXL", "OVRS_EXCG_CD": "AMEX", "ORD_QTY": str(qty), "OVRS_ORD_UNPR": price, "ORD_DVSN": "34"}
+
+
+def _accepted(odno):
+    return {"rt_cd": "0", "msg_cd": "APBK0013", "msg1": "주문 전송 완료 되었습니다.", "output": {"ODNO": odno}}
+
+
+class FakeHistory:
+    account = ACCOUNT
+
+    def __init__(self):
+        self.executions = []
+        self.calls = 0
+
+    def get_executions(self, start, end):
+        self.calls += 1
+        return [execution for execution in self.executions if start <= execution.ord_dt <= end]
+
+
+class AsyncFakeHistory(FakeHistory):
+    async def get_executions(self, start, end):
+        return FakeHistory.get_executions(self, start, end)
+
+
+def _insert_open_order(db, ord_dt, odno, qty):
+    with db.transaction() as conn:
+        conn.execute(
+            "INSERT INTO orders (account, ord_dt, odno, side, ovrs_excg_cd, symbol, qty, price, ord_dvsn, status) "
+            "VALUES (?, ?, ?, 'buy', 'AMEX', 'SOXL', ?, '30', '34', ?)",
+            (ACCOUNT, ord_dt, odno, qty, SUBMITTED),
+        )
+
+
+def test_partial_then_filled_updates_position_and_fills(db):
+    history = FakeHistory()
+    manager = OrderManager(history, watch_orders=False)
+    order = manager.record("buy", _body(10), _accepted("0000000001"))
+    assert order.ord_dt == exchange_date("AMEX")
+    assert manager.reconcile() == []    # 체결 없음 -> 바뀐 것 없음
+
+    history.executions = [_execution(order.ord_dt, "0000000001", "buy", 10, 4, "30")]
+    assert [o.status for o in manager.reconcile()] == [PARTIAL]
+    assert manager.get_position("AMEX", "SOXL") == (4, Decimal("30"))
+
+    # 누적 10주 평균 31 -> 나머지 6주는 (310 - 120) / 6
+    history.executions = [_execution(order.ord_dt, "0000000001", "buy", 10, 10, "31")]
+    assert [o.status for o in manager.reconcile()] == [FILLED]
+    qty, avg = manager.get_position("AMEX", "SOXL")
+    assert (qty, avg) == (10, Decimal("31.00000000"))
+    assert not manager.open_orders
+    fills = db.fetchall("SELECT side, qty, price FROM fills ORDER BY id")
+    assert fills == [("buy", 4, "30.00000000"), ("buy", 6, "31.66666667")]
+    # 재시작 후 열린 주문/보유 상태 복원
+    reloaded = OrderManager(history, watch_orders=False)
+    assert reloaded.get_position("AMEX", "SOXL") == (10, Decimal("31.00000000"))
+    assert not reloaded.open_orders
+
+
+def test_cancel_keeps_filled_part_and_rejection(db):
+    history = FakeHistory()
+    manager = OrderManager(history, watch_orders=False)
+    first = manager.record("buy", _body(10), _accepted("0000000001"))
+    second = manager.record("buy", _body(5), _accepted("0000000002"))
+    rejected = manager.record("buy", _body(1), {"rt_cd": "1", "msg_cd": "APBK0952", "msg1": "주문가능금액을 초과 했습니다"})
+    assert rejected.status == REJECTED and rejected.order_key not in manager.open_orders
+
+    history.executions = [
+        _execution(first.ord_dt, "0000000001", "buy", 10, 3, "30"),
+        _execution(first.ord_dt, "0000000003", "buy", 7, 0, "0", "완료", orgn_odno="0000000001", rvse_cncl_dvsn="02"),
+        _execution(second.ord_dt, "0000000002", "buy", 5, 0, "0", "거부"),
+    ]
+    statuses = {o.odno: o.status for o in manager.reconcile()}
+    assert statuses == {"0000000001": CANCELLED, "0000000002": REJECTED}
+    assert manager.get_position("AMEX", "SOXL") == (3, Decimal("30.00000000"))
+
+
+def test_stale_open_order_expires(db):
+    old = exchange_date("AMEX", datetime.now().astimezone() - timedelta(days=OrderManager.EXPIRE_DAYS + 2))
+    _insert_open_order(db, old, "0000000001", 10)
+    history = FakeHistory()
+    manager = OrderManager(history, watch_orders=False)
+    assert [o.status for o in manager.reconcile()] == [EXPIRED]
+    assert db.fetchone("SELECT status FROM orders")[0] == EXPIRED
+
+
+def test_same_odno_on_different_days_is_not_mixed_up(db):
+    now = datetime.now().astimezone()
+    yesterday = exchange_date("AMEX", now - timedelta(days=1))
+    today = exchange_date("AMEX", now)
+    _insert_open_order(db, yesterday, "0000000001", 10)
+    _insert_open_order(db, today, "0000000001", 4)
+    history = FakeHistory()
+    manager = OrderManager(history, watch_orders=False)
+    assert len(manager.open_orders) == 2
+
+    # 어제 주문번호 1 만 체결 -> 오늘 주문번호 1 은 그대로
+    history.executions = [_execution(yesterday, "0000000001", "buy", 10, 10, "30", "완료")]
+    updates = manager.reconcile()
+    assert [(o.ord_dt, o.status) for o in updates] == [(yesterday, FILLED)]
+    assert manager.open_orders[today, "0000000001"].status == SUBMITTED
+    assert manager.get_position("AMEX", "SOXL") == (10, Decimal("30.00000000"))
+
+
+def test_async_manager_records_off_loop_and_reconciles(db):
+    history = AsyncFakeHistory()
+
+    class FakeResponse:
+        def json(self):
+            return _accepted("0000000001")
+
+    class FakeClient:
+        def post(self, path, tr_id, body=None):
+            return FakeResponse()
+
+    async def main():
+        manager = AsyncOrderManager(history)
+        try:
+            # 이벤트 루프 안에서 주문 -> 주문 콜백이 기록을 스레드 풀로 넘김
+            OverseasStockOrder(None, None, None, "12345678", "01", client=FakeClient()).buy("US", "AMEX", "SOXL", 10, 30.0, "34")
+            history.executions = [_execution(exchange_date("AMEX"), "0000000001", "buy", 10, 10, "30", "완료")]
+            return await manager.reconcile()
+        finally:
+            manager.close()
+
+    updates = asyncio.run(main())
+    assert [o.status for o in updates] == [FILLED]
+    assert db.fetchone("SELECT status, filled_qty FROM orders") == (FILLED, 10)
@@ -0,0 +1,61 @@
+import asyncio
+import pytest
+from utils.kis_tr.해외주식_주문체결내역 import AsyncOverseasOrderHistory, OverseasOrderHistory
+from utils.kis_tr.해외주식_체결기준현재잔고 import AsyncOverseasHoldings, OverseasHoldings
+
+PAGE = {"rt_cd": "0", "msg1": "정상처리", "output": [], "output1": [], "output2": [], "output3": {}}
+
+
+class FakeResponse:
+    ok = True
+    status_code = 200
+    headers = {"tr_cont": "M"}      # 항상 다음 페이지가 있다고 응답
+
+    def json(self):
+        return dict(PAGE)
+
+
+class FakeClient:
+    def __init__(self):
+        self.calls = 0
+
+    def get(self, path, tr_id, params=None, tr_cont=""):
+        self.calls += 1
+        return FakeResponse()
+
+    async def get_page(self, path, tr_id, params=None, tr_cont=""):
+        self.calls += 1
+        return 200, dict(PAGE), "M"
+
+
+@pytest.fixture(autouse=True)
+def few_pages(monkeypatch):
+    monkeypatch.setattr(OverseasHoldings, "MAX_PAGES", 3)
+    monkeypatch.setattr(OverseasOrderHistory, "MAX_PAGES", 3)
+
+
+def test_sync_page_limit_raises_instead_of_truncating():
+    client = FakeClient()
+    holdings = OverseasHoldings(None, None, None, "12345678-01", client=client)
+    with pytest.raises(RuntimeError, match="3페이지"):
+        list(holdings.iter_pages())
+    assert client.calls == 3
+    assert holdings.get_holdings() is None      # 잘린 잔고를 완전한 것처럼 돌려주지 않음
+
+    history = OverseasOrderHistory(None, None, None, "12345678-01", client=FakeClient())
+    with pytest.raises(RuntimeError, match="3페이지"):
+        history.get_executions("20261015", "20261016")
+
+
+def test_async_page_limit_raises_instead_of_truncating():
+    async def main():
+        holdings = AsyncOverseasHoldings(None, None, None, "12345678-01", client=FakeClient())
+        with pytest.raises(RuntimeError, match="3페이지"):
+            [page async for page in holdings.iter_pages()]
+        assert await holdings.get_snapshot() is None
+
+        history = AsyncOverseasOrderHistory(None, None, None, "12345678-01", client=FakeClient())
+        with pytest.raises(RuntimeError, match="3페이지"):
+            await history.get_executions("20261015", "20261016")
+
+    asyncio.run(main())
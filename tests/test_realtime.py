@@ -0,0 +1,167 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from utils import database
+from utils.kis_tr.해외주식_실시간지연체결가 import OverseasRealtimeQuote
+from utils.market_calendar import NEW_YORK
+from utils.strategy.checkpoint import StrategyState
+from utils.strategy.infinite_buying import REASON_SELL_TARGET
+from utils.strategy.runner import StrategyInstance, StrategyRunner
+from utils.strategy.triggers import EXPIRED, FIRED, UP, TriggerBook
+
+SETTINGS = {"initial_capital": 10000, "rsi_entry_threshold": 30}
+
+
+class FakeRSI:
+    def entry_limit(self, threshold):
+        return 20.0
+
+
+class FakeFeed:
+    """quotes 를 차례로 리스너에 넘기고 stop() 까지 대기"""
+
+    def __init__(self, quotes):
+        self.quotes = quotes
+        self.listeners = []
+        self.subscribed = []
+        self._stop = asyncio.Event()
+
+    def add_listener(self, callback):
+        self.listeners.append(callback)
+
+    async def subscribe(self, ovrs_excg_cd, symbol):
+        self.subscribed.append((ovrs_excg_cd, symbol))
+
+    def stop(self):
+        self._stop.set()
+
+    async def run(self):
+        for quote in self.quotes:
+            for callback in list(self.listeners):
+                await callback(quote)
+        await self._stop.wait()
+
+
+class FakeRunner(StrategyRunner):
+    """API 클라이언트 없이 미리 만든 계획으로 run_realtime 만 실행"""
+
+    def __init__(self, instances):
+        self.instances = instances
+        self.submitted = []
+
+    async def reconcile_orders(self):
+        return []
+
+    async def evaluate(self):
+        decisions = []
+        for instance in self.instances:
+            position = 10 if instance.symbol == "SOXL" else 0
+            orders = [{"side": "sell", "qty": 10, "price": 30.0, "ord_type": "00", "reason": REASON_SELL_TARGET}] if position else []
+            row = ("2026-10-16T15:50:00", instance.instance_id, instance.symbol, instance.ovrs_excg_cd)
+            decisions.append({
+                "instance": instance, "plan": {"orders": orders}, "position": position, "capital": 10000.0, "cash": 10000.0,
+                "row": row + (0,) * len(database.STRATEGY_RESULT_VALUE_COLUMNS),
+            })
+        return decisions
+
+    async def _submit(self, items):
+        self.submitted.extend(order for _, order in items)
+        return []
+
+
+def _instances():
+    instances = []
+    for symbol in ("SOXL", "TQQQ"):
+        instance = StrategyInstance(dict(SETTINGS, symbol=symbol, ovrs_excg_cd="AMEX"), "12345678-01")
+        instance.state = StrategyState.initial(instance.instance_id, instance.settings)
+        instance.rsi = FakeRSI() if symbol == "TQQQ" else None
+        instances.append(instance)
+    return instances
+
+
+def _quote(symbol, price):
+    return {"ovrs_excg_cd": "AMEX", "symbol": symbol, "price": price}
+
+
+def _triggers():
+    return database.fetchall("SELECT instance, session_date, name, status, quote_price FROM strategy_trigger ORDER BY name")
+
+
+def test_feed_stops_at_close_and_unfired_triggers_expire(db):
+    runner = FakeRunner(_instances())
+    feed = FakeFeed([_quote("SOXL", 30.5), _quote("TQQQ", 25.0)])
+    until = datetime.now(timezone.utc) + timedelta(seconds=0.2)    # 세션 마감
+    session_date = until.astimezone(NEW_YORK).strftime("%Y%m%d")
+
+    asyncio.run(asyncio.wait_for(runner.run_realtime(feed, until=until), 5))
+    assert [order["reason"] for order in runner.submitted] == [REASON_SELL_TARGET]
+    assert _triggers() == [
+        ("12345678-01:TQQQ", session_date, "entry", EXPIRED, None),
+        ("12345678-01:SOXL", session_date, "sell_target", FIRED, 30.5),
+    ]
+    assert feed.listeners == []
+
+    # 같은 세션에 다시 실행 -> 이미 발동한 목표가 매도는 다시 걸지 않음 (진입만 감시, 마감이 지났으니 바로 종료)
+    runner.submitted = []
+    feed = FakeFeed([_quote("SOXL", 31.0)])
+    asyncio.run(asyncio.wait_for(runner.run_realtime(feed, until=until), 5))
+    assert runner.submitted == []
+    assert feed.subscribed == [("AMEX", "TQQQ")]
+
+
+def test_feed_stops_when_all_triggers_fire(db):
+    runner = FakeRunner(_instances()[:1])
+    feed = FakeFeed([_quote("SOXL", 29.0), _quote("SOXL", 30.0)])
+    until = datetime.now(timezone.utc) + timedelta(hours=6)
+    asyncio.run(asyncio.wait_for(runner.run_realtime(feed, until=until), 5))
+    assert len(runner.submitted) == 1
+    assert [row[3] for row in _triggers()] == [FIRED]
+
+
+def test_empty_frame_is_ignored():
+    feed = OverseasRealtimeQuote(None, None, client=object())
+    asyncio.run(feed._on_message(None, ""))
+    assert feed.stats["messages"] == 1
+
+
+def _frame(count, *records):
+    return f"0|HDFSCNT0|{count}|" + "^".join(records)
+
+
+def _record(symbol, last):
+    values = dict.fromkeys(OverseasRealtimeQuote.FIELDS, "1")
+    values.update(RSYM=OverseasRealtimeQuote.tr_key("AMEX", symbol), LAST=last, XHMS="093000")
+    return "^".join(values[name] for name in OverseasRealtimeQuote.FIELDS)
+
+
+def test_malformed_quote_frames_are_skipped():
+    async def main():
+        feed = OverseasRealtimeQuote(None, None, client=object())
+        feed._wakeup = asyncio.Event()
+        for symbol in ("SOXL", "TQQQ"):
+            await feed.subscribe("AMEX", symbol)
+        await feed._on_message(None, _frame("x", _record("SOXL", "30.1")))              # 건수 깨짐
+        await feed._on_message(None, _frame(2, _record("SOXL", "abc"), _record("TQQQ", "50.5")))   # 가격 깨짐
+        await feed._on_message(None, _frame(2, _record("SOXL", "30.2")))                # 잘린 프레임
+        return feed
+
+    feed = asyncio.run(main())
+    assert feed.latest("AMEX", "TQQQ")["price"] == 50.5
+    assert feed.latest("AMEX", "SOXL")["price"] == 30.2
+    assert feed.stats["errors"] == 3
+
+
+def test_failing_trigger_callback_does_not_block_others():
+    book = TriggerBook()
+    sent = []
+
+    def _broken(trigger, quote):
+        raise RuntimeError("주문 실패")
+
+    async def _ok(trigger, quote):
+        sent.append(trigger.name)
+
+    book.add("AMEX", "SOXL", "first", 30.0, UP, _broken)
+    book.add("AMEX", "SOXL", "second", 30.5, UP, _ok)
+    asyncio.run(book.on_quote(_quote("SOXL", 31.0)))
+    assert sent == ["second"]
+    assert [trigger.name for trigger in book.fired] == ["first", "second"]
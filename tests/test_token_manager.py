@@ -0,0 +1,54 @@
+from datetime import datetime, timedelta
+import pytest
+from utils.token import get_token
+from utils.token.token_manager import TokenManager
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    monkeypatch.setattr(TokenManager, "_schedule", lambda self, delay_seconds: None)
+    manager = TokenManager()
+    manager._token = "old-token"
+    manager._expired_at = datetime.now() + timedelta(minutes=30)    # 갱신 시점(만료 1시간 전)은 지남
+    return manager
+
+
+def test_failed_refresh_backs_off_and_serves_cached_token(manager, monkeypatch):
+    calls = []
+
+    def _fail():
+        calls.append(1)
+        return None, None
+
+    monkeypatch.setattr(get_token, "fetch_kis_token", _fail)
+    assert [manager.get_token() for _ in range(5)] == ["old-token"] * 5
+    assert len(calls) == 1
+
+    # 재시도 대기가 끝나면 다시 시도 -> 성공하면 새 토큰
+    manager._retry_after = datetime.now() - timedelta(seconds=1)
+    new_expiry = datetime.now() + timedelta(hours=24)
+    monkeypatch.setattr(get_token, "fetch_kis_token", lambda: (calls.append(1), ("new-token", new_expiry))[1])
+    assert manager.get_token() == "new-token"
+    assert manager.get_token() == "new-token"
+    assert len(calls) == 2 and manager._retry_after is None
+
+
+def test_fetch_exception_is_treated_as_failure(manager, monkeypatch):
+    calls = []
+
+    def _raise():
+        calls.append(1)
+        raise RuntimeError("DB 잠김")
+
+    monkeypatch.setattr(get_token, "fetch_kis_token", _raise)
+    assert manager.get_token() == "old-token"
+    assert manager.get_token() == "old-token"
+    assert len(calls) == 1
+
+
+def test_expired_token_is_not_served(manager, monkeypatch):
+    monkeypatch.setattr(get_token, "fetch_kis_token", lambda: (None, None))
+    manager._expired_at = datetime.now() - timedelta(seconds=1)
+    manager._retry_after = datetime.now() + timedelta(minutes=5)
+    assert manager.get_token() == "old-token"      # 갱신 실패 -> 메모리 값 그대로 (기존 동작)
+    assert manager._cached(datetime.now()) is None
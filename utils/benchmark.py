@@ -0,0 +1,373 @@
+import argparse
+import asyncio
+import gc
+import json
+import os
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from rich.console import Console
+from rich.table import Table
+from utils import database
+from utils.log_print import flush_logs, log_print
+
+# 주문/잔고/토큰/전략 핫패스 벤치마크
+# 네트워크 없이 로컬 목 서버(utils.kis_tr.mock_server)와 임시 SQLite DB 로 돌립니다.
+# 결과는 VERSION 별로 database/benchmark.jsonl 에 쌓이고, 직전 버전 결과와 p50 을 비교해 회귀를 표시합니다.
+#
+# 실행: python -m utils.benchmark [--iterations 200] [--only token,holdings] [--no-save]
+
+RESULT_PATH = os.path.join("database", "benchmark.jsonl")
+
+# 직전 버전 대비 p50 이 이 비율 이상 느려지면 회귀로 표시
+REGRESSION_RATIO = 1.2
+
+APP_KEY = "bench-appkey"
+APP_SECRET = "bench-appsecret"
+ACCOUNT = "12345678-01"
+
+console = Console()
+
+
+def read_version(path="VERSION"):
+    """VERSION 파일의 마지막 버전 (예: 'v0.0.2'), 없으면 'unknown'"""
+    if not os.path.exists(path):
+        return "unknown"
+    version = "unknown"
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.startswith("v"):
+                version = line.split()[0]
+    return version
+
+
+def percentile(sorted_values, pct):
+    """정렬된 값의 pct 백분위 (선형 보간)"""
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * pct / 100
+    low = int(k)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (k - low)
+
+
+def summarize_timings(name, timings, items=1):
+    """
+    초 단위 측정값 목록 -> 결과 dict
+
+    Args:
+        items (int): 1회 측정에 처리한 건수 (처리량 = items / 평균 시간)
+    """
+    ordered = sorted(timings)
+    total = sum(ordered)
+    return {
+        "name": name,
+        "iterations": len(ordered),
+        "items": items,
+        "p50_ms": percentile(ordered, 50) * 1000,
+        "p99_ms": percentile(ordered, 99) * 1000,
+        "mean_ms": statistics.fmean(ordered) * 1000,
+        "max_ms": ordered[-1] * 1000,
+        "throughput": items * len(ordered) / total if total else 0.0,
+    }
+
+
+def bench(name, func, iterations, warmup=5, items=1):
+    """동기 함수 func() 를 iterations 번 실행해 측정 (측정 중 GC 중지)"""
+    for _ in range(warmup):
+        func()
+    timings = []
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(iterations):
+            started = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - started)
+    finally:
+        if gc_enabled:
+            gc.enable()
+    return summarize_timings(name, timings, items)
+
+
+def bench_async(name, coro_func, iterations, warmup=5, items=1, cleanup=None):
+    """
+    코루틴 함수 coro_func() 를 한 이벤트 루프에서 iterations 번 실행해 측정
+
+    Args:
+        cleanup (callable, optional): 같은 루프에서 마지막에 await 할 정리 함수 (aiohttp 세션 close 등)
+    """
+    async def _run():
+        try:
+            for _ in range(warmup):
+                await coro_func()
+            timings = []
+            for _ in range(iterations):
+                started = time.perf_counter()
+                await coro_func()
+                timings.append(time.perf_counter() - started)
+            return timings
+        finally:
+            if cleanup is not None:
+                await cleanup()
+
+    return summarize_timings(name, asyncio.run(_run()), items)
+
+
+class BenchmarkEnv:
+    """
+    벤치마크 실행 환경: 백그라운드 목 서버 + 임시 DB + 환경변수
+
+    종료 시 환경변수/DB 경로를 원래대로 되돌립니다.
+    """
+
+    ENV_KEYS = ("KIS_BASE_URL", "KIS_APP_KEY", "KIS_APP_SECRET", "KIS_RATE_LIMIT", "KIS_RATE_BURST", "ACCOUNT")
+
+    def __init__(self, latency_ms=0.0, positions=40, page_size=20):
+        from utils.kis_tr.mock_server import MockKisServer
+        self.server = MockKisServer(latency_ms=latency_ms, jitter_ms=0, rate_limit=0, positions=positions, page_size=page_size, seed=0)
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self._saved_env = {}
+        self._saved_db_path = None
+        self.url = None
+
+    def __enter__(self):
+        self.url = self.server.serve_in_background()
+        self._saved_env = {key: os.environ.get(key) for key in self.ENV_KEYS}
+        os.environ.update(
+            KIS_BASE_URL=self.url,
+            KIS_APP_KEY=APP_KEY,
+            KIS_APP_SECRET=APP_SECRET,
+            KIS_RATE_LIMIT="100000",
+            KIS_RATE_BURST="1000",
+            ACCOUNT=ACCOUNT,
+        )
+        self._saved_db_path = database.DB_PATH
+        database.DB_PATH = os.path.join(self.tmpdir.name, "bench.sqlite3")
+        database.create_tables()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.server.shutdown()
+        connection = database.get_connection()
+        connection.close()
+        database._conn = None
+        database.DB_PATH = self._saved_db_path
+        for key, value in self._saved_env.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+        self.tmpdir.cleanup()
+
+
+def _bench_token(iterations):
+    """토큰: get_kis_token(SQLite 조회) vs token_manager(메모리) vs 신규 발급(목 서버)"""
+    from utils.kis_tr.kis_client import KisClient
+    from utils.token.get_token import get_kis_token, token_provider
+    from utils.token.token_manager import token_manager
+
+    results = [bench("token.issue (HTTP tokenP)", lambda: KisClient(APP_KEY, APP_SECRET).issue_token(), iterations)]
+
+    # 유효한 토큰 1개를 미리 넣어 두고 잠금 없는 조회 경로만 측정
+    expired_at = (datetime.now() + timedelta(hours=20)).strftime("%Y-%m-%d %H:%M:%S")
+    with database.transaction() as conn:
+        conn.execute(
+            "INSERT INTO Token (provider, token, expired_at) VALUES (?, ?, ?)",
+            (token_provider(), "bench-token", expired_at),
+        )
+    results.append(bench("token.get_kis_token (SQLite)", get_kis_token, iterations))
+    token_manager.refresh()
+    results.append(bench("token.token_manager (memory)", token_manager.get_token, iterations))
+    return results
+
+
+def _bench_holdings(iterations):
+    """잔고: 전체 페이지 조회, 보유종목 파싱, HoldingsSnapshot 변환, print_all_outputs 렌더링"""
+    from utils.kis_tr.models import HoldingsSnapshot
+    from utils.kis_tr.해외주식_체결기준현재잔고 import OverseasHoldings, merge_pages, parse_position, print_all_outputs, console as holdings_console
+
+    holdings = OverseasHoldings(APP_KEY, APP_SECRET, "bench-token", ACCOUNT)
+    data = merge_pages(holdings.iter_pages())
+    items = data["output1"]
+
+    def _render():
+        with holdings_console.capture():
+            print_all_outputs(data)
+
+    return [
+        bench("holdings.fetch (all pages)", lambda: merge_pages(holdings.iter_pages()), iterations, items=len(items)),
+        bench("holdings.parse_position", lambda: [parse_position(item) for item in items], iterations, items=len(items)),
+        bench("holdings.snapshot (output1~3)", lambda: HoldingsSnapshot.from_response(data), iterations, items=len(items)),
+        bench("holdings.print_all_outputs", _render, max(iterations // 10, 5), warmup=2, items=len(items)),
+    ]
+
+
+def _bench_strategy(iterations):
+    """전략: 주문 계획 계산 (plan_orders)"""
+    from utils.strategy.infinite_buying import load_settings, plan_orders
+
+    settings = load_settings()
+    capital = float(settings["initial_capital"])
+    cases = [(position, 20.0 + position / 100) for position in range(0, 600, 6)]
+
+    def _plan():
+        for position, avg_price in cases:
+            plan_orders(position, avg_price, capital, capital - position * avg_price, avg_price, settings)
+
+    return [bench("strategy.plan_orders", _plan, iterations, items=len(cases))]
+
+
+def _bench_order(iterations):
+    """주문: 동기 1건, 비동기 10건 동시 전송"""
+    from utils.kis_tr.해외주식_주문 import AsyncOverseasStockOrder, OverseasStockOrder, submit_orders
+
+    order = OverseasStockOrder(APP_KEY, APP_SECRET, "bench-token", ACCOUNT[:8], ACCOUNT[-2:])
+    results = [bench("order.buy (sync)", lambda: order.buy("US", "NASD", "AAPL", 1, 1.0), iterations)]
+
+    async_order = AsyncOverseasStockOrder(APP_KEY, APP_SECRET, "bench-token", ACCOUNT[:8], ACCOUNT[-2:])
+    spec = {"side": "buy", "exchange": "US", "ovrs_excg_cd": "NASD", "symbol": "AAPL", "qty": 1, "price": 1.0}
+
+    async def _fan_out():
+        await submit_orders([(async_order, spec)] * 10)
+
+    results.append(bench_async("order.submit_orders x10 (async)", _fan_out, max(iterations // 5, 5), items=10, cleanup=async_order.client.close))
+    return results
+
+
+def _bench_cycle(iterations):
+    """전체 사이클: 토큰 조회 -> 잔고 조회/파싱 -> 주문 계획 -> 주문 전송"""
+    from utils.kis_tr.해외주식_주문 import OverseasStockOrder
+    from utils.kis_tr.해외주식_체결기준현재잔고 import OverseasHoldings, parse_position
+    from utils.strategy.infinite_buying import load_settings, plan_orders
+    from utils.token.get_token import get_kis_token
+
+    settings = load_settings()
+    capital = float(settings["initial_capital"])
+    holdings = OverseasHoldings(APP_KEY, APP_SECRET, None, ACCOUNT)
+    order = OverseasStockOrder(APP_KEY, APP_SECRET, None, ACCOUNT[:8], ACCOUNT[-2:])
+
+    def _cycle():
+        token = get_kis_token()
+        holdings.client.access_token = token
+        order.client.access_token = token
+        positions = {position.pdno: position for position in holdings.iter_positions()}
+        held = positions.get(settings["symbol"])
+        position = held.qty if held else 0
+        avg_price = float(held.avg_price) if held else 0.0
+        last_price = float(held.now_price) if held else 30.0
+        plan = plan_orders(position, avg_price, capital, max(capital - position * avg_price, 0.0), last_price, settings)
+        for spec in plan["orders"]:
+            if spec["side"] == "buy":
+                order.buy("US", settings["ovrs_excg_cd"], settings["symbol"], spec["qty"], spec["price"], spec["ord_type"])
+
+    return [bench("cycle.full (token+holdings+plan+order)", _cycle, max(iterations // 2, 5))]
+
+
+BENCHMARKS = {
+    "token": _bench_token,
+    "holdings": _bench_holdings,
+    "strategy": _bench_strategy,
+    "order": _bench_order,
+    "cycle": _bench_cycle,
+}
+
+
+def run_benchmarks(iterations=200, only=None, latency_ms=0.0, positions=40):
+    """
+    벤치마크 실행 -> 결과 dict 목록
+
+    Args:
+        iterations (int): 벤치마크별 측정 횟수 (느린 항목은 줄여서 측정)
+        only (list[str], optional): BENCHMARKS 키 중 실행할 그룹
+        latency_ms (float): 목 서버 응답 지연 (0 이면 순수 클라이언트 오버헤드 측정)
+        positions (int): 목 계좌 보유 종목 수
+    """
+    results = []
+    with BenchmarkEnv(latency_ms=latency_ms, positions=positions):
+        for group, func in BENCHMARKS.items():
+            if only and group not in only:
+                continue
+            results.extend(func(iterations))
+    return results
+
+
+def load_history(path=RESULT_PATH):
+    """저장된 결과 목록 (파일이 없으면 빈 목록)"""
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def previous_results(history, version):
+    """현재 버전이 아닌 가장 최근 버전의 벤치마크별 결과 {name: result}"""
+    previous = {}
+    for record in reversed(history):
+        if record["version"] == version:
+            continue
+        previous.setdefault(record["name"], record)
+    return previous
+
+
+def save_results(results, version, path=RESULT_PATH):
+    """결과를 버전/시각과 함께 JSON Lines 로 추가 저장"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    executed_at = datetime.now().isoformat(timespec="seconds")
+    with open(path, "a", encoding="utf-8") as f:
+        for result in results:
+            f.write(json.dumps(dict(result, version=version, executed_at=executed_at), ensure_ascii=False) + "\n")
+
+
+def print_results(results, previous, version):
+    table = Table(title=f"[bold cyan]벤치마크 결과 ({version})[/bold cyan]", show_header=True, header_style="bold cyan")
+    table.add_column("벤치마크", style="white", no_wrap=True)
+    table.add_column("횟수", justify="right")
+    table.add_column("p50 (ms)", justify="right", style="yellow")
+    table.add_column("p99 (ms)", justify="right", style="yellow")
+    table.add_column("처리량 (/s)", justify="right", style="green")
+    table.add_column("직전 버전 대비 p50", justify="right")
+
+    for result in results:
+        before = previous.get(result["name"])
+        if before and before["p50_ms"] > 0:
+            ratio = result["p50_ms"] / before["p50_ms"]
+            color = "red" if ratio >= REGRESSION_RATIO else "green" if ratio <= 1 / REGRESSION_RATIO else "white"
+            change = f"[{color}]{(ratio - 1) * 100:+.1f}% ({before['version']})[/{color}]"
+        else:
+            change = "-"
+        table.add_row(
+            result["name"],
+            f"{result['iterations']}",
+            f"{result['p50_ms']:.3f}",
+            f"{result['p99_ms']:.3f}",
+            f"{result['throughput']:,.0f}",
+            change,
+        )
+    console.print(table)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="주문/잔고/토큰/전략 핫패스 벤치마크 (로컬 목 서버)")
+    parser.add_argument("--iterations", type=int, default=200, help="벤치마크별 측정 횟수")
+    parser.add_argument("--only", default="", help=f"실행할 그룹 (쉼표 구분: {', '.join(BENCHMARKS)})")
+    parser.add_argument("--latency", type=float, default=0.0, help="목 서버 응답 지연(ms)")
+    parser.add_argument("--positions", type=int, default=40, help="목 계좌 보유 종목 수")
+    parser.add_argument("--no-save", action="store_true", help=f"{RESULT_PATH} 에 저장하지 않음")
+    args = parser.parse_args()
+
+    only = [group.strip() for group in args.only.split(",") if group.strip()]
+    version = read_version()
+    log_print(f"[bold cyan]⏱️  벤치마크 시작 ({version}, {args.iterations}회)[/bold cyan]")
+    results = run_benchmarks(args.iterations, only, args.latency, args.positions)
+
+    history = load_history()
+    print_results(results, previous_results(history, version), version)
+    if not args.no_save:
+        save_results(results, version)
+        log_print(f"[bold green]결과 저장: {RESULT_PATH}[/bold green]")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,403 @@
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from utils.log_print import log_print
+from utils.metrics import DB_SECONDS
+
+# SQLite 영속성 계층
+# 프로세스마다 긴 수명의 연결 1개를 WAL 모드로 열어 두고 모든 모듈이 공유합니다.
+# synchronous=NORMAL + WAL 이면 커밋마다 fsync 하지 않으므로 쓰기 지연이 거의 없습니다.
+
+DB_PATH = os.path.join("database", "db.sqlite3")
+
+# 잠금 대기 최대 시간(초) - 다른 프로세스의 토큰 발급 등
+BUSY_TIMEOUT = 30
+
+# 행 식별 컬럼 (instance: 전략 인스턴스 ID, 예: "12345678-01:SOXL")
+STRATEGY_RESULT_KEY_COLUMNS = ("executed_at", "instance", "symbol", "ovrs_excg_cd")
+# 전략 상태/지표 컬럼
+STRATEGY_RESULT_VALUE_COLUMNS = (
+    "cycle", "round", "T", "star_pct", "position", "avg_price",
+    "sell_target_price", "star_pct_target_price", "cash", "portfolio_value",
+    "signal", "reason", "position_rev_rate", "realized_profit_amount",
+    "position_mdd", "cumulative_buy_amount", "cumulative_return_rate",
+)
+STRATEGY_RESULT_COLUMNS = STRATEGY_RESULT_KEY_COLUMNS + STRATEGY_RESULT_VALUE_COLUMNS
+
+INSERT_STRATEGY_RESULT_SQL = (
+    f"INSERT INTO strategy_result ({', '.join(STRATEGY_RESULT_COLUMNS)}) "
+    f"VALUES ({', '.join('?' * len(STRATEGY_RESULT_COLUMNS))})"
+)
+
+CREATE_TABLE_SQL = (
+    """
+    CREATE TABLE IF NOT EXISTS Token (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        provider TEXT NOT NULL,
+        token TEXT UNIQUE NOT NULL,
+        expired_at DATETIME NOT NULL,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    # cycle, symbol, round, T, star_pct, position, avg_price, sell_target_price, star_pct_target_price,cash, portfolio_value, signal, reason, position_rev_rate, realized_profit_amount, position_mdd, cumulative_buy_amount, cumulative_return_rate
+    """
+    CREATE TABLE IF NOT EXISTS strategy_result (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        executed_at DATETIME NOT NULL,
+        cycle INTEGER,
+        symbol TEXT,
+        ovrs_excg_cd TEXT,
+        round INTEGER,
+        T REAL,
+        star_pct REAL,
+        position REAL,
+        avg_price REAL,
+        sell_target_price REAL,
+        star_pct_target_price REAL,
+        cash REAL,
+        portfolio_value REAL,
+        signal INTEGER,
+        reason TEXT,
+        position_rev_rate REAL,
+        realized_profit_amount REAL,
+        position_mdd REAL,
+        cumulative_buy_amount REAL,
+        cumulative_return_rate REAL,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    # 한국수출입은행 환율 (cur_unit 은 'JPY(100)' -> 'JPY' 처럼 1단위 기준으로 환산해 저장)
+    """
+    CREATE TABLE IF NOT EXISTS exchange_rate (
+        date TEXT NOT NULL,
+        cur_unit TEXT NOT NULL,
+        cur_nm TEXT,
+        deal_bas_r REAL,
+        ttb REAL,
+        tts REAL,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (cur_unit, date)
+    )
+    """,
+    # 날짜별 조회 기록 (휴일처럼 고시가 없는 날도 남겨서 다시 요청하지 않음)
+    """
+    CREATE TABLE IF NOT EXISTS exchange_rate_fetch (
+        date TEXT PRIMARY KEY,
+        rates INTEGER NOT NULL,
+        fetched_at DATETIME NOT NULL
+    )
+    """,
+    # 주문 생애주기 (접수 -> 부분체결 -> 체결/거부/취소/만료), 가격은 Decimal 문자열
+    """
+    CREATE TABLE IF NOT EXISTS orders (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        account TEXT NOT NULL,
+        ord_dt TEXT NOT NULL,
+        odno TEXT,
+        side TEXT NOT NULL,
+        ovrs_excg_cd TEXT NOT NULL,
+        symbol TEXT NOT NULL,
+        qty INTEGER NOT NULL,
+        price TEXT,
+        ord_dvsn TEXT,
+        status TEXT NOT NULL,
+        filled_qty INTEGER NOT NULL DEFAULT 0,
+        avg_fill_price TEXT,
+        msg TEXT,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    # 체결 반영으로 갱신하는 계좌별 보유수량/평균단가
+    """
+    CREATE TABLE IF NOT EXISTS position_state (
+        account TEXT NOT NULL,
+        ovrs_excg_cd TEXT NOT NULL,
+        symbol TEXT NOT NULL,
+        qty INTEGER NOT NULL,
+        avg_price TEXT NOT NULL,
+        updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (account, ovrs_excg_cd, symbol)
+    )
+    """,
+    # 체결 delta 기록 (주문 대사 1회에서 늘어난 체결수량과 그 체결단가, 가격은 Decimal 문자열)
+    """
+    CREATE TABLE IF NOT EXISTS fills (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        account TEXT NOT NULL,
+        order_id INTEGER,
+        odno TEXT,
+        side TEXT NOT NULL,
+        ovrs_excg_cd TEXT NOT NULL,
+        symbol TEXT NOT NULL,
+        qty INTEGER NOT NULL,
+        price TEXT NOT NULL,
+        filled_at DATETIME NOT NULL
+    )
+    """,
+    # 전략 인스턴스별 최신 상태 1행 (strategy_result 저장과 같은 트랜잭션으로 덮어씀)
+    # fill_id / bar_date 는 이 상태에 반영된 마지막 체결 id / 일봉 날짜 - 복구 시 그 이후만 반영
+    """
+    CREATE TABLE IF NOT EXISTS strategy_checkpoint (
+        instance TEXT PRIMARY KEY,
+        strategy_result_id INTEGER,
+        fill_id INTEGER NOT NULL DEFAULT 0,
+        bar_date TEXT,
+        cycle INTEGER NOT NULL,
+        round INTEGER NOT NULL,
+        T REAL,
+        star_pct REAL,
+        capital REAL NOT NULL,
+        position INTEGER NOT NULL,
+        avg_price REAL NOT NULL,
+        cumulative_buy_amount REAL NOT NULL,
+        realized_profit_amount REAL NOT NULL,
+        cycle_realized_amount REAL NOT NULL,
+        peak_value REAL NOT NULL,
+        position_mdd REAL NOT NULL,
+        cash REAL,
+        rsi_state TEXT,
+        updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    # 실시간 가격 트리거 발동/만료 기록 (session_date: 감시한 정규장 날짜, 미국 동부 기준 YYYYMMDD)
+    # 재시작 시 같은 세션에 이미 발동한 트리거는 다시 걸지 않음
+    """
+    CREATE TABLE IF NOT EXISTS strategy_trigger (
+        instance TEXT NOT NULL,
+        session_date TEXT NOT NULL,
+        name TEXT NOT NULL,
+        direction TEXT NOT NULL,
+        price REAL NOT NULL,
+        status TEXT NOT NULL,
+        quote_price REAL,
+        updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (instance, session_date, name)
+    )
+    """,
+    # 예약 작업 마지막 실행 (재시작 시 놓친 실행 따라잡기용)
+    """
+    CREATE TABLE IF NOT EXISTS scheduler_job (
+        name TEXT PRIMARY KEY,
+        last_run_at DATETIME NOT NULL,
+        last_status TEXT,
+        last_error TEXT,
+        updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_orders_account_status ON orders (account, status)",
+    "CREATE INDEX IF NOT EXISTS idx_orders_account_odno ON orders (account, odno)",
+    "CREATE INDEX IF NOT EXISTS idx_strategy_result_symbol_cycle_executed_at ON strategy_result (symbol, cycle, executed_at)",
+    "CREATE INDEX IF NOT EXISTS idx_token_provider_expired_at ON Token (provider, expired_at)",
+)
+
+# 기존 DB 에 없을 수 있는 컬럼 (테이블, 컬럼, 타입) - create_tables 에서 추가
+MIGRATION_COLUMNS = (
+    ("strategy_result", "instance", "TEXT"),
+    ("strategy_checkpoint", "cash", "REAL"),
+)
+
+# 마이그레이션 컬럼이 생긴 뒤에 만드는 인덱스
+CREATE_INDEX_SQL = (
+    "CREATE INDEX IF NOT EXISTS idx_strategy_result_instance_id ON strategy_result (instance, id)",
+)
+
+_conn = None
+_conn_pid = None
+_lock = threading.RLock()
+
+
+def get_connection():
+    """
+    프로세스 공용 연결 반환 (최초 호출 시 생성, fork 된 자식 프로세스에서는 새로 생성)
+
+    autocommit 모드(isolation_level=None)로 열고 트랜잭션은 transaction() 으로만 엽니다.
+    여러 스레드가 공유하므로 직접 사용할 때는 lock() 안에서 사용하세요.
+    """
+    global _conn, _conn_pid
+    with _lock:
+        if _conn is None or _conn_pid != os.getpid():
+            os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
+            conn = sqlite3.connect(
+                DB_PATH,
+                timeout=BUSY_TIMEOUT,
+                isolation_level=None,
+                check_same_thread=False,
+                cached_statements=256,
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA temp_store=MEMORY")
+            _conn = conn
+            _conn_pid = os.getpid()
+        return _conn
+
+
+def lock():
+    """공용 연결 사용 잠금 (스레드 간 직렬화)"""
+    return _lock
+
+
+@contextmanager
+def transaction(immediate=False):
+    """
+    명시적 트랜잭션 (예외 시 롤백)
+
+    Args:
+        immediate (bool): True 면 BEGIN IMMEDIATE 로 시작해 쓰기 잠금을 바로 잡음
+            (블록 안에서 네트워크 요청처럼 오래 걸리는 일은 하지 마세요 - 그동안 모든 DB 사용이 멈춤, 대신 process_lock 사용)
+    """
+    with _lock, DB_SECONDS.time("transaction"):
+        conn = get_connection()
+        conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+        try:
+            yield conn
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        if conn.in_transaction:
+            conn.execute("COMMIT")
+
+
+@contextmanager
+def process_lock(name, timeout=BUSY_TIMEOUT):
+    """
+    프로세스 간 단일 실행 잠금 (예: 토큰 발급)
+
+    공용 연결/DB 파일이 아니라 DB_PATH 옆 name.lock 파일에 짧게 여는 별도 연결로 BEGIN IMMEDIATE 를 잡습니다.
+    잠금을 쥔 동안 네트워크 요청을 해도 다른 스레드/프로세스의 DB 읽기·쓰기(_lock, DB 쓰기 잠금)는 막지 않습니다.
+    timeout 초 안에 잠금을 못 얻으면 sqlite3.OperationalError 가 발생합니다.
+    """
+    directory = os.path.dirname(DB_PATH)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(os.path.join(directory, f"{name}.lock"), timeout=timeout, isolation_level=None)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        yield
+    finally:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        conn.close()
+
+
+def fetchone(sql, params=()):
+    """조회 1행"""
+    with _lock, DB_SECONDS.time("fetchone"):
+        return get_connection().execute(sql, params).fetchone()
+
+
+def fetchall(sql, params=()):
+    """조회 전체 행"""
+    with _lock, DB_SECONDS.time("fetchall"):
+        return get_connection().execute(sql, params).fetchall()
+
+
+def create_tables():
+    """테이블/인덱스 생성 (이미 있으면 건너뜀) + 누락 컬럼 추가"""
+    with transaction() as conn:
+        for sql in CREATE_TABLE_SQL:
+            conn.execute(sql)
+        for table, column, column_type in MIGRATION_COLUMNS:
+            existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+            if column not in existing:
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}")
+        for sql in CREATE_INDEX_SQL:
+            conn.execute(sql)
+
+
+def insert_strategy_results(rows, batch_size=10000):
+    """
+    strategy_result 일괄 저장 (batch_size 행마다 트랜잭션 1개 + executemany)
+
+    Args:
+        rows (iterable[tuple]): STRATEGY_RESULT_COLUMNS 순서의 행
+        batch_size (int): 트랜잭션당 행 수
+
+    Returns:
+        int: 저장한 행 수
+    """
+    total = 0
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            with transaction() as conn:
+                conn.executemany(INSERT_STRATEGY_RESULT_SQL, batch)
+            total += len(batch)
+            batch = []
+    if batch:
+        with transaction() as conn:
+            conn.executemany(INSERT_STRATEGY_RESULT_SQL, batch)
+        total += len(batch)
+    return total
+
+
+class StrategyResultWriter:
+    """
+    strategy_result 백그라운드 배치 저장기 (실매매용)
+
+    write() 는 큐에 넣기만 하고 바로 돌아오며, 백그라운드 스레드가
+    큐에 쌓인 행을 최대 batch_size 개씩 묶어 한 트랜잭션으로 저장합니다.
+
+    사용 예시:
+        writer = StrategyResultWriter()
+        writer.start()
+        writer.write(row)
+        writer.stop()   # 남은 행 저장 후 종료
+    """
+
+    def __init__(self, batch_size=500, flush_interval=1.0):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue()
+        self._thread = None
+        self._stopped = threading.Event()
+        self.written = 0
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def write(self, row):
+        """행 1개 저장 예약 (STRATEGY_RESULT_COLUMNS 순서 tuple)"""
+        self._queue.put(row)
+
+    def write_many(self, rows):
+        for row in rows:
+            self._queue.put(row)
+
+    def stop(self, timeout=10):
+        """남은 행을 저장하고 스레드 종료"""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+
+    def _drain(self, first):
+        batch = [first]
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while not (self._stopped.is_set() and self._queue.empty()):
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            batch = self._drain(first)
+            try:
+                self.written += insert_strategy_results(batch, batch_size=self.batch_size)
+            except Exception as e:
+                log_print(f"[bold red]Error:[/bold red] strategy_result 저장 실패 ({len(batch)}건): {e}")
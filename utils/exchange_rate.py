@@ -0,0 +1,348 @@
+import argparse
+import asyncio
+import bisect
+import os
+import threading
+from datetime import date as date_cls, datetime, timedelta
+from zoneinfo import ZoneInfo
+import aiohttp
+import numpy as np
+from utils import database
+from utils.log_print import log_print
+
+# 한국수출입은행(KOREXIM) 현재환율 API 캐시
+# - API 는 날짜 1개씩만 조회되므로, 필요한 기간의 빠진 영업일만 골라 동시에 요청하고 한 트랜잭션으로 저장합니다.
+# - 저장된 환율은 통화별로 메모리에 한 번 올려 두고 이후 조회는 메모리에서 처리합니다.
+# - 고시가 없는 날(주말/휴일/고시 전)은 직전 영업일 환율을 씁니다.
+# - 고시(보통 11시) 전에 조회해 비어 있던 날짜는 RETRY_EMPTY 마다 다시 확인하고 (다음 날 이후에도),
+#   한 번 받은 날짜는 다시 요청하지 않습니다. (영업일 단위 TTL)
+# - 이벤트 루프 안(runner/scheduler 코루틴)에서는 aget_rate / aget_rates / abackfill 을 사용하세요.
+
+KST = ZoneInfo("Asia/Seoul")
+
+
+def _to_date(value):
+    if value is None:
+        return datetime.now(KST).date()
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date_cls):
+        return value
+    if isinstance(value, np.datetime64):
+        return value.astype("datetime64[D]").astype(date_cls)
+    return date_cls.fromisoformat(str(value)[:10])
+
+
+def _to_float(text):
+    """'1,380.5' -> 1380.5 (빈 값은 None)"""
+    text = (text or "").replace(",", "").strip()
+    return float(text) if text else None
+
+
+def business_days(start, end):
+    """start~end (포함) 의 평일 목록"""
+    days = []
+    day = _to_date(start)
+    end = _to_date(end)
+    while day <= end:
+        if day.weekday() < 5:
+            days.append(day)
+        day += timedelta(days=1)
+    return days
+
+
+class ExchangeRateService:
+    """
+    KOREXIM 환율 조회 서비스 (SQLite + 메모리 캐시)
+
+    사용 예시:
+        fx = ExchangeRateService()
+        usd = fx.get_rate("USD")                          # 오늘(없으면 직전 영업일) 매매기준율
+        fx.backfill("2015-01-01", "2024-12-31")           # 빠진 날짜만 일괄 수집
+        rates = fx.get_rates("USD", bars["date"])         # 백테스트 날짜 배열 -> 환율 배열 (요청 없음)
+    """
+    BASE_URL = "https://www.koreaexim.go.kr"
+    # 설정하면 BASE_URL 대신 이 서버로 요청 (예: 목 서버)
+    BASE_URL_ENV = "KOREXIM_BASE_URL"
+    PATH = "/site/program/financial/exchangeJSON"
+
+    # 동시 요청 수 / 1회 수집 최대 요청 수 (KOREXIM 일일 호출 한도 1,000건)
+    CONCURRENCY = 8
+    DAILY_LIMIT = 1000
+    TIMEOUT = 10
+    # 조회했을 때 아직 고시되지 않았던 날짜를 다시 확인하는 간격
+    RETRY_EMPTY = timedelta(hours=1)
+    # 직전 영업일 환율을 찾을 때 거슬러 올라가는 최대 일수 (연휴 대비)
+    MAX_LOOKBACK_DAYS = 14
+
+    RATE_KINDS = ("deal_bas_r", "ttb", "tts")
+
+    def __init__(self, access_key=None, base_url=None):
+        self.access_key = access_key or os.getenv("KOREXIM_ACCESS_KEY")
+        self.base_url = (base_url or os.getenv(self.BASE_URL_ENV) or self.BASE_URL).rstrip("/")
+        self._lock = threading.Lock()
+        # 통화 -> (정렬된 날짜 ordinal 목록, {kind: 환율 목록})
+        self._memory = {}
+        # 조회 기록 {date: (환율 수, 조회 시각 KST)}
+        self._fetched = None
+        # 마지막 수집에서 실패한 날짜 {date: 오류 메시지} (조회 기록을 남기지 않아 다음에 다시 요청)
+        self.failed_days = {}
+
+    # ------------------------------------------------------------------ 캐시
+
+    def _load_fetched(self):
+        if self._fetched is None:
+            rows = database.fetchall("SELECT date, rates, fetched_at FROM exchange_rate_fetch")
+            # 예전 기록은 시간대 없이 로컬 시각으로 저장됨 -> astimezone 이 로컬로 보고 KST 로 변환
+            self._fetched = {
+                date_cls.fromisoformat(day): (rates, datetime.fromisoformat(fetched_at).astimezone(KST))
+                for day, rates, fetched_at in rows
+            }
+        return self._fetched
+
+    def _series(self, currency):
+        """통화별 메모리 시계열 (처음 한 번만 DB 에서 읽음)"""
+        series = self._memory.get(currency)
+        if series is None:
+            rows = database.fetchall(
+                f"SELECT date, {', '.join(self.RATE_KINDS)} FROM exchange_rate WHERE cur_unit = ? ORDER BY date",
+                (currency,),
+            )
+            ordinals = [date_cls.fromisoformat(row[0]).toordinal() for row in rows]
+            values = {kind: [row[i + 1] for row in rows] for i, kind in enumerate(self.RATE_KINDS)}
+            series = self._memory[currency] = (ordinals, values)
+        return series
+
+    def _needs_fetch(self, day, today):
+        """이 날짜를 API 에 요청해야 하는지 (이미 받았거나 미래/주말이면 False)"""
+        if day > today or day.weekday() >= 5:
+            return False
+        fetched = self._load_fetched().get(day)
+        if fetched is None:
+            return True
+        rates, fetched_at = fetched
+        # 그 날짜 당일(KST)에 받아서 비어 있었다면 고시 전이었을 수 있으므로 일정 시간 뒤 다시 확인
+        # (다음 날 이후에 받은 빈 결과는 휴일이라 고시가 없는 것)
+        return rates == 0 and fetched_at.date() <= day and datetime.now(KST) - fetched_at >= self.RETRY_EMPTY
+
+    def _missing(self, days):
+        today = datetime.now(KST).date()
+        return [day for day in days if self._needs_fetch(day, today)]
+
+    # ------------------------------------------------------------------ 조회
+
+    def get_rate(self, currency="USD", date=None, kind="deal_bas_r"):
+        """
+        통화 1단위 원화 환율 (해당 날짜에 고시가 없으면 직전 영업일, 없으면 None)
+
+        Args:
+            currency (str): 통화코드 (USD, JPY, HKD ...)
+            date (str | date, optional): 기준일 (기본: 오늘 KST)
+            kind (str): deal_bas_r(매매기준율), ttb(송금 받을 때), tts(송금 보낼 때)
+        """
+        day = _to_date(date)
+        missing = self._missing(self._window(day))
+        if missing:
+            self._fetch(missing)
+        return self._lookup(currency, day, kind)
+
+    async def aget_rate(self, currency="USD", date=None, kind="deal_bas_r"):
+        """get_rate 비동기 버전 (이벤트 루프 안에서 사용)"""
+        day = _to_date(date)
+        missing = self._missing(self._window(day))
+        if missing:
+            await self._afetch(missing)
+        return self._lookup(currency, day, kind)
+
+    def _window(self, day):
+        """day 환율을 정하는 데 필요한 날짜 (직전 영업일 탐색 범위)"""
+        return [day - timedelta(days=offset) for offset in range(self.MAX_LOOKBACK_DAYS)]
+
+    def _lookup(self, currency, day, kind):
+        ordinals, values = self._series(currency)
+        index = bisect.bisect_right(ordinals, day.toordinal()) - 1
+        if index < 0 or day.toordinal() - ordinals[index] >= self.MAX_LOOKBACK_DAYS:
+            return None
+        return values[kind][index]
+
+    def get_rates(self, currency, dates, kind="deal_bas_r", fetch=True):
+        """
+        날짜 배열 -> 환율 배열 (백테스트/리포트용, 직전 영업일 환율로 채움, 없으면 NaN)
+
+        Args:
+            fetch (bool): True 면 빠진 기간을 먼저 backfill
+        """
+        days = np.asarray(dates).astype("datetime64[D]")
+        if fetch and len(days):
+            self.backfill(*self._range(days))
+        return self._lookup_many(currency, days, kind)
+
+    async def aget_rates(self, currency, dates, kind="deal_bas_r", fetch=True):
+        """get_rates 비동기 버전 (이벤트 루프 안에서 사용)"""
+        days = np.asarray(dates).astype("datetime64[D]")
+        if fetch and len(days):
+            await self.abackfill(*self._range(days))
+        return self._lookup_many(currency, days, kind)
+
+    def _range(self, days):
+        return days.min() - np.timedelta64(self.MAX_LOOKBACK_DAYS, "D"), days.max()
+
+    def _lookup_many(self, currency, days, kind):
+        ordinals, values = self._series(currency)
+        out = np.full(len(days), np.nan)
+        if not ordinals:
+            return out
+        stored = np.array(ordinals, dtype=np.int64)
+        # datetime64[D] 는 1970-01-01 기준 일수, ordinal 은 0001-01-01 기준
+        targets = days.astype(np.int64) + date_cls(1970, 1, 1).toordinal()
+        index = np.searchsorted(stored, targets, side="right") - 1
+        valid = (index >= 0) & (targets - stored[np.clip(index, 0, None)] < self.MAX_LOOKBACK_DAYS)
+        rates = np.array([np.nan if value is None else value for value in values[kind]], dtype=np.float64)
+        out[valid] = rates[index[valid]]
+        return out
+
+    def to_krw(self, amount, currency="USD", date=None):
+        """외화 금액 -> 원화 (환율이 없으면 None)"""
+        rate = self.get_rate(currency, date)
+        return None if rate is None else amount * rate
+
+    # ------------------------------------------------------------------ 수집
+
+    def backfill(self, start, end=None):
+        """start~end 중 아직 받지 않은 영업일만 일괄 수집 -> 요청한 날짜 수 (실패한 날짜는 failed_days)"""
+        missing = self._backfill_days(start, end)
+        if missing:
+            self._fetch(missing)
+        return len(missing)
+
+    async def abackfill(self, start, end=None):
+        """backfill 비동기 버전 (이벤트 루프 안에서 사용)"""
+        missing = self._backfill_days(start, end)
+        if missing:
+            await self._afetch(missing)
+        return len(missing)
+
+    def _backfill_days(self, start, end):
+        missing = self._missing(business_days(start, end or datetime.now(KST).date()))
+        if len(missing) > self.DAILY_LIMIT:
+            log_print(
+                f"[bold yellow]Warning:[/bold yellow] 빠진 날짜 {len(missing)}일 중 일일 한도 "
+                f"{self.DAILY_LIMIT}일만 수집합니다. (최근 날짜부터)"
+            )
+            missing = missing[-self.DAILY_LIMIT:]
+        return missing
+
+    def _fetch(self, days):
+        """
+        날짜 목록 동시 요청 후 저장 (동기 진입점)
+
+        이벤트 루프 안에서 부르면 asyncio.run 을 쓸 수 없으므로 RuntimeError - aget_rate/abackfill 을 사용하세요.
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self._afetch(days))
+        raise RuntimeError("이벤트 루프 안에서는 aget_rate / aget_rates / abackfill 을 사용하세요.")
+
+    async def _afetch(self, days):
+        """날짜 목록 동시 요청 후 받은 날짜만 한 트랜잭션으로 저장 + 메모리 캐시 무효화 -> 실패한 날짜 목록"""
+        if not self.access_key:
+            raise RuntimeError("KOREXIM_ACCESS_KEY 가 설정되지 않았습니다.")
+        results = await self._fetch_all(days)
+        self._store([result for result in results if not isinstance(result[1], Exception)])
+
+        failed = {day: str(result) for day, result in results if isinstance(result, Exception)}
+        self.failed_days = failed
+        if failed:
+            first = min(failed)
+            log_print(
+                f"[bold yellow]Warning:[/bold yellow] 환율 {len(days)}일 중 {len(failed)}일 조회 실패 "
+                f"({', '.join(day.isoformat() for day in sorted(failed))}): {failed[first]}"
+            )
+        return sorted(failed)
+
+    def _store(self, results):
+        """(날짜, 응답 항목) 목록 저장 (환율 + 조회 기록)"""
+        now = datetime.now(KST)
+        rows = []
+        fetch_rows = []
+        for day, items in results:
+            for item in items:
+                cur_unit = item.get("cur_unit", "")
+                scale = 1.0
+                if "(" in cur_unit:
+                    # JPY(100), IDR(100) 등은 1단위 기준으로 환산
+                    cur_unit, unit = cur_unit.rstrip(")").split("(")
+                    scale = float(unit)
+                rates = [_to_float(item.get(kind)) for kind in self.RATE_KINDS]
+                rows.append((day.isoformat(), cur_unit, item.get("cur_nm", ""),
+                             *[None if rate is None else rate / scale for rate in rates]))
+            fetch_rows.append((day.isoformat(), len(items), now.isoformat(timespec="seconds")))
+        if not fetch_rows:
+            return
+
+        with self._lock:
+            with database.transaction() as conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO exchange_rate (date, cur_unit, cur_nm, deal_bas_r, ttb, tts) VALUES (?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+                conn.executemany(
+                    "INSERT OR REPLACE INTO exchange_rate_fetch (date, rates, fetched_at) VALUES (?, ?, ?)",
+                    fetch_rows,
+                )
+            fetched = self._load_fetched()
+            for day, count, _ in fetch_rows:
+                fetched[date_cls.fromisoformat(day)] = (count, now)
+            self._memory.clear()
+
+    async def _fetch_all(self, days):
+        semaphore = asyncio.Semaphore(self.CONCURRENCY)
+        timeout = aiohttp.ClientTimeout(total=self.TIMEOUT)
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+
+            async def _one(day):
+                params = {"authkey": self.access_key, "searchdate": day.strftime("%Y%m%d"), "data": "AP01"}
+                async with semaphore:
+                    async with session.get(self.base_url + self.PATH, params=params) as response:
+                        items = await response.json(content_type=None)
+                # result: 1 성공, 2 DATA코드 오류, 3 인증코드 오류, 4 일일제한횟수 마감
+                if not isinstance(items, list) or any(item.get("result") != 1 for item in items):
+                    raise RuntimeError(f"KOREXIM 환율 조회 실패 ({day}): {items}")
+                return day, items
+
+            # 실패한 날짜가 있어도 받은 날짜는 저장하도록 예외를 결과로 받음 -> [(날짜, 응답 항목 | 예외)]
+            results = await asyncio.gather(*(_one(day) for day in days), return_exceptions=True)
+            out = []
+            for day, result in zip(days, results):
+                if isinstance(result, BaseException) and not isinstance(result, Exception):
+                    raise result    # 취소 등은 그대로 전파
+                out.append((day, result) if isinstance(result, Exception) else result)
+            return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="한국수출입은행 환율 캐시")
+    sub = parser.add_subparsers(dest="command", required=True)
+    backfill = sub.add_parser("backfill", help="기간 환율 일괄 수집 (빠진 날짜만)")
+    backfill.add_argument("start")
+    backfill.add_argument("end", nargs="?")
+    show = sub.add_parser("show", help="환율 조회")
+    show.add_argument("currency", nargs="?", default="USD")
+    show.add_argument("date", nargs="?")
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+    load_dotenv(".env")
+    database.create_tables()
+    fx = ExchangeRateService()
+    if args.command == "backfill":
+        requested = fx.backfill(args.start, args.end)
+        log_print(f"[bold green]환율 {requested - len(fx.failed_days)}/{requested}일 수집 완료[/bold green]")
+    else:
+        rate = fx.get_rate(args.currency, args.date)
+        log_print(f"[bold cyan]{args.currency}[/bold cyan] {args.date or '오늘'}: {rate if rate is None else f'₩{rate:,.2f}'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,29 @@
+import importlib
 import json
 import os
-import sqlite3
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
-from utils.log_print import log_print
-from rich import print
-from utils.token.get_token import get_kis_token
+from utils import database
+from utils.log_print import flush_logs, log_print
 from utils.token.token_scheduler import start_token_scheduler, get_scheduler_status
 
-def check_env_file():
+# 빠른 시작 (run_startup) 에서 보여 줄 단계 이름
+STARTUP_STEPS = {
+    "env": ".env 파일 확인",
+    "imports": "네트워크 모듈 로드",
+    "db": "db 파일 확인",
+    "token": "KIS 토큰 조회/생성",
+    "holdings": "해외주식 체결기준현재잔고",
+    "settings": "무한매수법 세팅값 확인",
+}
+
+# 네트워크 단계에서 쓰는 무거운 모듈 (requests 등) - 로컬 확인과 동시에 미리 import
+NETWORK_MODULES = ("utils.kis_tr.kis_client", "utils.kis_tr.해외주식_체결기준현재잔고")
+
+
+def check_env_file(quiet=False):
     if not os.path.exists(".env"):
         log_print("[bold red]Error:[/bold red] .env 파일이 존재하지 않습니다.")
         return False
@@ -23,11 +39,11 @@ def check_env_file():
         if value is None or value.strip() == "":
             log_print(f"[bold red]{key}[/bold red] : [red]설정되지 않음[/red]")
             all_ok = False
-        else:
+        elif not quiet:
             log_print(f"[bold green]{key}[/bold green] : {value}")
     return all_ok
 
-def check_db():
+def check_db(quiet=False):
     try:
         # database 디렉토리 생성
         os.makedirs("database", exist_ok=True)
@@ -36,89 +52,51 @@ def check_db():
             log_print("[bold yellow]Warning:[/bold yellow] db.sqlite3 파일이 존재하지 않습니다.")
             log_print("[bold yellow]Warning:[/bold yellow] db.sqlite3 파일을 생성합니다.")
         
-        conn = sqlite3.connect("database/db.sqlite3")
-        cursor = conn.cursor()
-        
-        # Token 테이블 생성
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS Token (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                provider TEXT NOT NULL,
-                token TEXT UNIQUE NOT NULL,
-                expired_at DATETIME NOT NULL,
-                created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-
-        # strategy_result 테이블 생성 
-        # cycle, symbol, round, T, star_pct, position, avg_price, sell_target_price, star_pct_target_price,cash, portfolio_value, signal, reason, position_rev_rate, realized_profit_amount, position_mdd, cumulative_buy_amount, cumulative_return_rate
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS strategy_result (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,   
-                executed_at DATETIME NOT NULL,
-                cycle INTEGER,               
-                symbol TEXT,
-                ovrs_excg_cd TEXT,
-                round INTEGER,
-                T REAL,
-                star_pct REAL,
-                position REAL,
-                avg_price REAL,
-                sell_target_price REAL,
-                star_pct_target_price REAL,
-                cash REAL,
-                portfolio_value REAL,
-                signal INTEGER,
-                reason TEXT,
-                position_rev_rate REAL,
-                realized_profit_amount REAL,
-                position_mdd REAL,
-                cumulative_buy_amount REAL,
-                cumulative_return_rate REAL,
-                created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
-            )
-            """)
-        if not os.path.exists("database/db.sqlite3"):
+        # Token / strategy_result 테이블 및 인덱스 생성 (WAL 모드 공용 연결)
+        db_exists = os.path.exists(database.DB_PATH)
+        database.create_tables()
+
+        if quiet:
+            return True
+        if not db_exists:
             log_print("[bold green]db.sqlite3 파일을 생성했습니다.[/bold green]")
         else:
             # 데이터베이스에 존재하는 테이블들을 보기 좋게 출력
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%'")
-            tables = [table[0] for table in cursor.fetchall()]
+            tables = [table[0] for table in database.fetchall("SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%'")]
             if tables:
                 log_print("[bold green]📋 현재 데이터베이스에 존재하는 테이블 목록:[/bold green]")
                 for idx, table_name in enumerate(tables, 1):
                     log_print(f"[bold cyan]{idx}. {table_name}[/bold cyan]")
             else:
                 log_print("[bold yellow]데이터베이스에 테이블이 존재하지 않습니다.[/bold yellow]")
-
-                   
-        conn.commit()
-        conn.close()
             
         return True
     except Exception as e:
         log_print(f"[bold red]Error:[/bold red] {e}")
         return False
 
-def check_kis_token():
+def check_kis_token(quiet=False):
     """KIS 토큰 체크 및 스케줄러 시작 - True/False만 반환"""
     try:
-        # 토큰 조회 및 갱신
-        get_kis_token()
-        
-        # Step5 : 토큰 자동 갱신 스케줄러 시작
+        if quiet:
+            # 스케줄러 안내 출력 없이 토큰 로드 + 갱신 예약만
+            from utils.token.token_manager import token_manager
+            return bool(token_manager.token or token_manager.start())
+
+        # 토큰 조회/갱신 + 만료 1시간 전 자동 갱신 예약
         log_print("[bold cyan]🚀 토큰 자동 갱신 스케줄러를 시작합니다...[/bold cyan]")
-        start_token_scheduler(check_interval_minutes=30)
+        start_token_scheduler()
 
         # 스케줄러 상태 출력
         status = get_scheduler_status()
+        if not status["current_token"]:
+            return False
         log_print(f"[bold green]\t✅ 스케줄러 상태: {'실행 중' if status['is_running'] else '중지됨'}[/bold green]")
-        log_print(f"[bold green]\t⏰ 체크 간격: {status['check_interval_minutes']}분[/bold green]")
+        log_print(f"[bold green]\t⏰ 토큰 만료: {status['expired_at'].strftime('%Y-%m-%d %H:%M:%S')}[/bold green]")
+        log_print(f"[bold green]\t⏰ 다음 갱신: {status['next_refresh_at'].strftime('%Y-%m-%d %H:%M:%S')}[/bold green]")
 
         log_print("[bold green]\t🎉 모든 초기화가 완료되었습니다![/bold green]")
-        log_print("[bold yellow]\t🔄 토큰은 30분마다 자동으로 체크되고 갱신됩니다.[/bold yellow]")
+        log_print("[bold yellow]\t🔄 토큰은 만료 1시간 전에 자동으로 갱신됩니다.[/bold yellow]")
         
         return True
     except Exception as e:
@@ -126,19 +104,14 @@ def check_kis_token():
         return False   
 
 
-def check_holdings():
+def check_holdings(quiet=False):
     """해외주식 보유종목 조회 체크 함수"""
     from utils.kis_tr.해외주식_체결기준현재잔고 import check_overseas_holdings
-    return check_overseas_holdings()
+    return check_overseas_holdings(quiet)
 
 
-def check_settings():
+def check_settings(quiet=False):
     # setting.json 파일 내 모든 세팅값이 존재하는지 확인 + 표로 출력
-    from rich.table import Table
-    from rich.console import Console
-
-    console = Console()
-
     if not os.path.exists("setting.json"):
         log_print("[bold red]Error:[/bold red] setting.json 파일이 존재하지 않습니다.")
         return False
@@ -146,6 +119,18 @@ def check_settings():
     with open("setting.json", "r") as f:
         settings = json.load(f)
 
+    if quiet:
+        missing = [key for key, value in settings.items() if value is None or (isinstance(value, str) and value.strip() == "")]
+        if missing:
+            log_print(f"[bold red]설정값 중 누락된 항목이 있습니다:[/bold red] {', '.join(missing)}")
+            return False
+        return True
+
+    from rich.table import Table
+    from rich.console import Console
+
+    console = Console()
+
     table = Table(title="[bold yellow]무한매수법 세팅값 확인[/bold yellow]", border_style="yellow")
     table.add_column("설정 항목", style="cyan", justify="center")
     table.add_column("값", style="magenta", justify="center")
@@ -160,10 +145,89 @@ def check_settings():
         else:
             table.add_row(f"{key}", f"{value}", "[bold green]✅[/bold green]")
 
+    flush_logs()
     console.print(table, justify="center")
 
     if not all_ok:
         log_print("[bold red]설정값 중 누락된 항목이 있습니다. 설정을 확인해주세요.[/bold red]")
         return False
 
-    return True
\ No newline at end of file
+    return True
+
+def _timed(timings, name, check, quiet):
+    """단계 1개 실행 + 소요 시간 기록 (예외는 실패로 처리)"""
+    start = time.perf_counter()
+    try:
+        ok = bool(check(quiet))
+    except Exception as e:
+        log_print(f"[bold red]Error:[/bold red] {STARTUP_STEPS[name]} 중 오류 발생: {e}")
+        ok = False
+    timings[name] = (ok, time.perf_counter() - start)
+    return ok
+
+
+def _warm_imports(quiet):
+    """네트워크 단계 모듈 미리 import (실패는 해당 단계에서 다시 드러나므로 여기서는 True)"""
+    for module in NETWORK_MODULES:
+        try:
+            importlib.import_module(module)
+        except Exception:
+            pass
+    return True
+
+
+def run_startup(quiet=False):
+    """
+    빠른 시작: 서로 독립적인 단계를 동시에 실행
+
+    .env 확인 뒤 아래 두 흐름을 스레드로 동시에 실행합니다.
+      - 로컬: 세팅값 확인
+      - 네트워크: (db 확인 + 네트워크 모듈 미리 import) -> 토큰 -> 잔고 조회
+    한 단계라도 실패하면 False 를 돌려주고, 단계별 소요 시간은 timings 에 남습니다.
+
+    Args:
+        quiet (bool): True 면 표/안내 출력 없이 오류만 출력
+
+    Returns:
+        tuple[bool, dict]: (성공 여부, {단계: (성공 여부, 소요 초)})
+    """
+    timings = {}
+    if not _timed(timings, "env", check_env_file, quiet):
+        return False, timings
+
+    with ThreadPoolExecutor(max_workers=3, thread_name_prefix="startup") as pool:
+        warm = pool.submit(_timed, timings, "imports", _warm_imports, quiet)
+        settings = pool.submit(_timed, timings, "settings", check_settings, quiet)
+        network_ok = _timed(timings, "db", check_db, quiet)
+        warm.result()
+        network_ok = network_ok and _timed(timings, "token", check_kis_token, quiet)
+        network_ok = network_ok and _timed(timings, "holdings", check_holdings, quiet)
+        ok = settings.result() and network_ok
+    return ok, timings
+
+
+def print_startup_timings(timings, total, quiet=False):
+    """단계별 소요 시간 출력 (quiet 이면 rich 없이 한 줄)"""
+    flush_logs()
+    if quiet:
+        steps = " ".join(
+            f"{name}={timings[name][1] * 1000:.0f}ms{'' if timings[name][0] else '(실패)'}"
+            for name in STARTUP_STEPS if name in timings
+        )
+        sys.stdout.write(f"startup {total * 1000:.0f}ms {steps}\n")
+        sys.stdout.flush()
+        return
+
+    from rich.table import Table
+    from rich.console import Console
+
+    table = Table(title="[bold yellow]시작 단계별 소요 시간[/bold yellow]", border_style="yellow")
+    table.add_column("단계", style="cyan")
+    table.add_column("소요(ms)", style="magenta", justify="right")
+    table.add_column("상태", justify="center")
+    for name in STARTUP_STEPS:
+        if name in timings:
+            ok, elapsed = timings[name]
+            table.add_row(STARTUP_STEPS[name], f"{elapsed * 1000:.1f}", "[bold green]✅[/bold green]" if ok else "[bold red]❌[/bold red]")
+    table.add_row("[bold]전체[/bold]", f"[bold]{total * 1000:.1f}[/bold]", "")
+    Console().print(table, justify="center")
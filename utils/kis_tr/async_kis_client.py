@@ -0,0 +1,139 @@
+import asyncio
+import time
+import aiohttp
+from utils.kis_tr.kis_client import KisClient
+from utils.kis_tr.rate_limiter import PRIORITY_INQUIRY, PRIORITY_ORDER, is_rate_limited
+from utils.log_print import log_print
+from utils.metrics import KIS_ERRORS, KIS_RETRIES, kis_tr_id, observe_kis_response
+
+
+class AsyncKisClient(KisClient):
+    """
+    한국투자증권 OpenAPI 비동기(asyncio) HTTP 클라이언트
+
+    헤더 생성/타임아웃/재시도 정책은 KisClient 와 같고, 요청만 aiohttp 로 보냅니다.
+    여러 종목/계좌의 주문을 asyncio.gather 로 동시에 전송할 때 사용합니다.
+    aiohttp 세션은 실행 중인 이벤트 루프에 묶이므로 루프마다 close() 로 정리해야 합니다.
+
+    사용 예시:
+        async with AsyncKisClient(appkey, appsecret) as client:
+            data = await client.get(PATH, "CTRP6504R", params=params)
+    """
+    # 동시에 열어둘 최대 커넥션 수
+    CONNECTION_LIMIT = 20
+    RETRY_COUNT = 3
+    RETRY_BACKOFF = 0.2
+
+    def __init__(self, appkey, appsecret, access_token=None, custtype="P", base_url=None):
+        super().__init__(appkey, appsecret, access_token, custtype, base_url)
+        self._aio_session = None
+
+    async def _get_aio_session(self):
+        if self._aio_session is None or self._aio_session.closed:
+            connect_timeout, read_timeout = self.TIMEOUT
+            self._aio_session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.CONNECTION_LIMIT, keepalive_timeout=60),
+                timeout=aiohttp.ClientTimeout(connect=connect_timeout, sock_read=read_timeout),
+            )
+        return self._aio_session
+
+    async def close(self):
+        """aiohttp 세션 종료"""
+        if self._aio_session is not None and not self._aio_session.closed:
+            await self._aio_session.close()
+        self._aio_session = None
+
+    async def __aenter__(self):
+        await self._get_aio_session()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def _request(self, method, path, headers, priority, retry_on_status, **kwargs):
+        """
+        요청 1건 실행 -> (HTTP 상태코드, JSON 본문, 응답 헤더 tr_cont)
+
+        요청마다 RateLimiter 토큰을 받은 뒤 전송합니다.
+        연결 실패와 초당 거래건수 초과(EGW00201)는 항상 재시도, 502~504 응답은 retry_on_status 일 때(조회)만 재시도합니다.
+        게이트웨이 오류 페이지처럼 본문이 JSON 이 아니면 JSON 본문은 None 입니다. (예외 대신 (상태코드, None))
+        """
+        session = await self._get_aio_session()
+        tr_id = kis_tr_id(headers, path)
+        for attempt in range(self.RETRY_COUNT + 1):
+            await self.rate_limiter.acquire_async(priority)
+            try:
+                started = time.perf_counter()
+                async with session.request(method, self.base_url + path, headers=headers, **kwargs) as response:
+                    # 502~504 는 본문(HTML 등)을 읽기 전에 재시도 여부부터 판단
+                    retry_status = retry_on_status and response.status in (502, 503, 504) and attempt < self.RETRY_COUNT
+                    data = None if retry_status else await self._read_json(response)
+                    elapsed = time.perf_counter() - started
+                    observe_kis_response(tr_id, method, elapsed, response.status, data=data)
+                    log_print(
+                        f"{method} {path} {response.status}", level="debug",
+                        tr_id=tr_id, status=response.status, attempt=attempt, latency_ms=round(elapsed * 1000, 2),
+                    )
+                    if retry_status:
+                        KIS_RETRIES.inc(tr_id, f"http_{response.status}")
+                        await asyncio.sleep(self.RETRY_BACKOFF * (2 ** attempt))
+                        continue
+                    if attempt < self.RETRY_COUNT and is_rate_limited(data):
+                        KIS_RETRIES.inc(tr_id, "rate_limited")
+                        self.rate_limiter.report_rejected()
+                        await asyncio.sleep(1 / self.rate_limiter.rate)
+                        continue
+                    return response.status, data, response.headers.get("tr_cont", "")
+            except aiohttp.ClientConnectorError:
+                KIS_ERRORS.inc(tr_id, "", "connection")
+                if attempt >= self.RETRY_COUNT:
+                    raise
+                KIS_RETRIES.inc(tr_id, "connection")
+                await asyncio.sleep(self.RETRY_BACKOFF * (2 ** attempt))
+
+    @staticmethod
+    async def _read_json(response):
+        """응답 JSON 본문 (JSON 이 아니면 None)"""
+        try:
+            return await response.json(content_type=None)
+        except (ValueError, aiohttp.ContentTypeError):
+            return None
+
+    async def get(self, path, tr_id, params=None, tr_cont=""):
+        """조회 TR 호출 -> (HTTP 상태코드, JSON 본문)"""
+        status, data, _ = await self.get_page(path, tr_id, params, tr_cont)
+        return status, data
+
+    async def get_page(self, path, tr_id, params=None, tr_cont=""):
+        """연속조회용 조회 TR 호출 -> (HTTP 상태코드, JSON 본문, 응답 헤더 tr_cont)"""
+        return await self._request("GET", path, self.make_headers(tr_id, tr_cont), PRIORITY_INQUIRY, True, params=params)
+
+    async def post(self, path, tr_id, body=None):
+        """주문 TR 호출 -> (HTTP 상태코드, JSON 본문)"""
+        status, data, _ = await self._request("POST", path, self.make_headers(tr_id), PRIORITY_ORDER, False, json=body)
+        return status, data
+
+    async def issue_token(self):
+        """접근 토큰 발급 요청 -> (HTTP 상태코드, JSON 본문)"""
+        body = {
+            "grant_type": "client_credentials",
+            "appkey": self.appkey,
+            "appsecret": self.appsecret,
+        }
+        headers = {"content-type": "application/json"}
+        status, data, _ = await self._request("POST", self.TOKEN_PATH, headers, PRIORITY_ORDER, False, json=body)
+        return status, data
+
+    async def issue_approval_key(self):
+        """웹소켓 접속키 발급 (/oauth2/Approval) -> approval_key (실패 시 RuntimeError)"""
+        body = {
+            "grant_type": "client_credentials",
+            "appkey": self.appkey,
+            "secretkey": self.appsecret,
+        }
+        headers = {"content-type": "application/json; utf-8"}
+        status, data, _ = await self._request("POST", self.APPROVAL_PATH, headers, PRIORITY_ORDER, False, json=body)
+        approval_key = data.get("approval_key") if isinstance(data, dict) else None
+        if status != 200 or not approval_key:
+            raise RuntimeError(f"웹소켓 접속키 발급 실패: {status} {data}")
+        return approval_key
@@ -0,0 +1,126 @@
+import threading
+import time
+from utils.kis_tr.해외주식_주문 import OverseasStockOrder
+from utils.kis_tr.models import HoldingsSnapshot
+from utils.kis_tr.해외주식_체결기준현재잔고 import merge_pages
+
+
+class HoldingsCache:
+    """
+    해외주식 체결기준현재잔고 TTL 캐시
+
+    - ttl 초 안에는 마지막 스냅샷을 그대로 돌려주므로 전략 루프에서 여러 번 조회해도 API 호출은 1번입니다.
+    - 같은 계좌로 주문이 나가면 (OverseasStockOrder 주문 콜백) 자동으로 무효화되어 다음 조회 때 새로 받습니다.
+    - 새로 받을 때마다 직전 스냅샷과 비교해 수량/평단이 바뀐 종목만 last_changes 에 기록합니다.
+    - 콘솔 표 출력 없이 조회만 합니다.
+
+    사용 예시:
+        cache = HoldingsCache(OverseasHoldings(appkey, appsecret, None, account), ttl=30)
+        position = cache.get_position("AMEX", "SOXL")
+        print(cache.last_changes)
+    """
+
+    def __init__(self, holdings, ttl=30, watch_orders=True):
+        """
+        Args:
+            holdings (OverseasHoldings): 잔고 조회 래퍼
+            ttl (float): 스냅샷 유효 시간(초)
+            watch_orders (bool): 같은 계좌 주문 시 자동 무효화 여부
+        """
+        self.holdings = holdings
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._positions = {}
+        self._summary = None
+        self._fetched_at = None
+        # 무효화 세대: invalidate() 마다 1 증가, 스냅샷은 조회를 시작할 때의 세대를 기록
+        self._generation_lock = threading.Lock()
+        self._generation = 0
+        self._snapshot_generation = -1
+        self.last_changes = {"added": [], "removed": [], "changed": []}
+        self.hits = 0
+        self.misses = 0
+        if watch_orders:
+            OverseasStockOrder.add_order_listener(self._on_order)
+
+    def close(self):
+        """주문 콜백 해제"""
+        OverseasStockOrder.remove_order_listener(self._on_order)
+
+    def _on_order(self, account, side, body, result):
+        if account == self.holdings.account:
+            self.invalidate()
+
+    def invalidate(self):
+        """
+        다음 조회 때 새로 받도록 스냅샷 무효화
+
+        조회 중(_lock 보유)에도 막히지 않고 세대만 올립니다. 주문 전에 시작한 조회가 끝나도
+        시작 세대가 현재 세대와 달라 그 스냅샷은 유효로 표시되지 않습니다.
+        """
+        with self._generation_lock:
+            self._generation += 1
+
+    @property
+    def age(self):
+        """스냅샷 경과 시간(초), 없으면 None"""
+        return None if self._fetched_at is None else time.monotonic() - self._fetched_at
+
+    def _is_fresh(self):
+        return (
+            self._snapshot_generation == self._generation
+            and self._fetched_at is not None
+            and time.monotonic() - self._fetched_at < self.ttl
+        )
+
+    def get_positions(self, force=False):
+        """
+        보유종목 스냅샷 반환 {(ovrs_excg_cd, pdno): Position}
+
+        Args:
+            force (bool): TTL 과 상관없이 새로 조회
+        """
+        with self._lock:
+            if not force and self._is_fresh():
+                self.hits += 1
+                return self._positions
+            self.misses += 1
+            self._refresh()
+            return self._positions
+
+    def get_position(self, ovrs_excg_cd, symbol):
+        """종목 1개 보유정보 (없으면 None)"""
+        return self.get_positions().get((ovrs_excg_cd, symbol))
+
+    def get_summary(self):
+        """마지막 스냅샷 (HoldingsSnapshot - currencies: output2 통화별, summary: output3 계좌 전체)"""
+        self.get_positions()
+        return self._summary
+
+    def _refresh(self):
+        generation = self._generation
+        snapshot = HoldingsSnapshot.from_response(merge_pages(self.holdings.iter_pages()))
+        positions = snapshot.positions
+
+        self.last_changes = self._diff(self._positions, positions) if self._fetched_at is not None else {
+            "added": list(positions.values()), "removed": [], "changed": [],
+        }
+        self._positions = positions
+        self._summary = snapshot
+        self._fetched_at = time.monotonic()
+        self._snapshot_generation = generation
+
+    @staticmethod
+    def _diff(old, new):
+        """수량/평단 기준 변경 종목 계산 (현재가 변동은 무시)"""
+        changes = {"added": [], "removed": [], "changed": []}
+        for key, position in new.items():
+            before = old.get(key)
+            if before is None:
+                changes["added"].append(position)
+            elif before.qty != position.qty or before.avg_price != position.avg_price:
+                changes["changed"].append(position)
+        for key, position in old.items():
+            if key not in new:
+                changes["removed"].append(position)
+        return changes
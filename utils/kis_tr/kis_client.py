@@ -0,0 +1,191 @@
+import os
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from utils.token.token_manager import token_manager
+from utils.kis_tr.rate_limiter import PRIORITY_INQUIRY, PRIORITY_ORDER, get_rate_limiter, is_rate_limited
+from utils.log_print import log_print
+from utils.metrics import KIS_ERRORS, KIS_RETRIES, kis_tr_id, observe_kis_response
+
+
+class KisClient:
+    """
+    한국투자증권 OpenAPI 공용 HTTP 클라이언트
+
+    모든 TR 래퍼는 이 클래스를 통해 요청합니다.
+    - 프로세스 전체가 하나의 requests.Session(keep-alive 커넥션 풀)을 공유하므로
+      주문마다 TCP+TLS 핸드셰이크를 다시 하지 않습니다.
+    - appkey/appsecret/tr_id/custtype 헤더 생성, 타임아웃, 재시도 정책을 한 곳에서 관리합니다.
+
+    사용 예시:
+        client = KisClient(appkey, appsecret)
+        response = client.get(PATH, "CTRP6504R", params=params)
+        response = client.post(ORDER_PATH, "TTTT1002U", body=body)
+
+    재시도 정책:
+        - 연결 실패는 모든 메서드에서 재시도 (요청이 전송되지 않았으므로 안전)
+        - 읽기 실패/502~504 응답은 조회(GET)만 재시도, 주문(POST)은 중복 주문 방지를 위해 재시도하지 않음
+        - 초당 거래건수 초과(EGW00201)는 KIS 가 처리 전에 거절한 것이므로 주문도 재시도
+
+    모든 요청은 앱키별 RateLimiter 를 거치며 주문이 조회보다 먼저 나갑니다.
+    """
+    BASE_URL = "https://openapi.koreainvestment.com:9443"
+    # 설정하면 BASE_URL 대신 이 서버로 요청 (예: 목 서버 http://127.0.0.1:8090)
+    BASE_URL_ENV = "KIS_BASE_URL"
+    TOKEN_PATH = "/oauth2/tokenP"
+    # 웹소켓 접속키 발급
+    APPROVAL_PATH = "/oauth2/Approval"
+
+    # (연결 타임아웃, 읽기 타임아웃) 초
+    TIMEOUT = (3.05, 10)
+    POOL_MAXSIZE = 20
+    RETRY = Retry(
+        total=3,
+        connect=3,
+        read=2,
+        status=2,
+        backoff_factor=0.2,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset({"GET"}),
+        raise_on_status=False,
+    )
+
+    # 초당 거래건수 초과 시 재시도 횟수
+    RATE_LIMIT_RETRY = 3
+
+    _session = None
+    _session_lock = threading.Lock()
+
+    def __init__(self, appkey, appsecret, access_token=None, custtype="P", base_url=None):
+        """
+        Args:
+            appkey (str): OpenAPI 앱키
+            appsecret (str): OpenAPI 앱시크릿
+            access_token (str, optional): 접근 토큰 ('Bearer ' 제외). 없으면 token_manager 의 현재 토큰 사용
+            custtype (str): 고객타입 (P: 개인, B: 법인)
+            base_url (str, optional): 요청 서버 주소. 없으면 KIS_BASE_URL 환경변수 > BASE_URL 순
+        """
+        self.base_url = (base_url or self.get_base_url()).rstrip("/")
+        self.appkey = appkey
+        self.appsecret = appsecret
+        self._access_token = access_token
+        self.custtype = custtype
+        self.rate_limiter = get_rate_limiter(appkey)
+
+    @classmethod
+    def get_base_url(cls):
+        """현재 요청 서버 주소 (KIS_BASE_URL 환경변수 > BASE_URL)"""
+        return os.getenv(cls.BASE_URL_ENV) or cls.BASE_URL
+
+    @property
+    def session(self):
+        """프로세스 공용 Session (최초 요청 시 생성)"""
+        return self.get_session()
+
+    @classmethod
+    def get_session(cls):
+        """프로세스 공용 Session 반환 (최초 호출 시 생성)"""
+        if cls._session is None:
+            with cls._session_lock:
+                if cls._session is None:
+                    adapter = HTTPAdapter(
+                        pool_connections=1,
+                        pool_maxsize=cls.POOL_MAXSIZE,
+                        max_retries=cls.RETRY,
+                    )
+                    session = requests.Session()
+                    session.mount("https://", adapter)
+                    session.mount("http://", adapter)
+                    cls._session = session
+        return cls._session
+
+    @property
+    def access_token(self):
+        """현재 접근 토큰 (생성자 지정값 > token_manager 순)"""
+        return self._access_token or token_manager.get_token()
+
+    @access_token.setter
+    def access_token(self, value):
+        self._access_token = value
+
+    def make_headers(self, tr_id, tr_cont=""):
+        """TR 공통 헤더 생성"""
+        headers = {
+            "content-type": "application/json; charset=utf-8",
+            "authorization": f"Bearer {self.access_token}",
+            "appkey": self.appkey,
+            "appsecret": self.appsecret,
+            "tr_id": tr_id,
+            "custtype": self.custtype,
+        }
+        if tr_cont:
+            headers["tr_cont"] = tr_cont
+        return headers
+
+    def _send(self, method, url, priority, **kwargs):
+        """RateLimiter 를 거쳐 요청 전송 (초당 거래건수 초과 응답은 재시도)"""
+        path = url.removeprefix(self.base_url)
+        tr_id = kis_tr_id(kwargs.get("headers"), path)
+        for attempt in range(self.RATE_LIMIT_RETRY + 1):
+            self.rate_limiter.acquire(priority)
+            started = time.perf_counter()
+            try:
+                response = self.session.request(method, url, timeout=self.TIMEOUT, **kwargs)
+            except requests.RequestException:
+                KIS_ERRORS.inc(tr_id, "", "connection")
+                raise
+            elapsed = time.perf_counter() - started
+            observe_kis_response(tr_id, method, elapsed, response.status_code, content=response.content)
+            log_print(
+                f"{method} {path} {response.status_code}", level="debug",
+                tr_id=tr_id, status=response.status_code, attempt=attempt, latency_ms=round(elapsed * 1000, 2),
+            )
+            if response.ok or attempt >= self.RATE_LIMIT_RETRY:
+                return response
+            try:
+                data = response.json()
+            except ValueError:
+                return response
+            if not is_rate_limited(data):
+                return response
+            KIS_RETRIES.inc(tr_id, "rate_limited")
+            self.rate_limiter.report_rejected()
+            time.sleep(1 / self.rate_limiter.rate)
+        return response
+
+    def get(self, path, tr_id, params=None, tr_cont=""):
+        """조회 TR 호출 (requests.Response 반환)"""
+        return self._send(
+            "GET",
+            self.base_url + path,
+            PRIORITY_INQUIRY,
+            headers=self.make_headers(tr_id, tr_cont),
+            params=params,
+        )
+
+    def post(self, path, tr_id, body=None):
+        """주문 TR 호출 (requests.Response 반환)"""
+        return self._send(
+            "POST",
+            self.base_url + path,
+            PRIORITY_ORDER,
+            headers=self.make_headers(tr_id),
+            json=body,
+        )
+
+    def issue_token(self):
+        """접근 토큰 발급 요청 (/oauth2/tokenP, requests.Response 반환)"""
+        body = {
+            "grant_type": "client_credentials",
+            "appkey": self.appkey,
+            "appsecret": self.appsecret,
+        }
+        return self._send(
+            "POST",
+            self.base_url + self.TOKEN_PATH,
+            PRIORITY_ORDER,
+            headers={"content-type": "application/json"},
+            json=body,
+        )
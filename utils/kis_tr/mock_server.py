@@ -0,0 +1,676 @@
+import argparse
+import asyncio
+import json
+import random
+import secrets
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from aiohttp import web
+from utils.kis_tr.rate_limiter import RATE_LIMIT_MSG_CD
+from utils.log_print import log_print
+from utils.market_calendar import exchange_date
+
+# 한국투자증권 OpenAPI 로컬 대역 서버 (부하/지연/실패 경로 테스트용)
+# 실서버와 같은 경로/헤더/응답 형식으로 토큰 발급, 해외주식 주문, 체결기준현재잔고(CTRP6504R), 주문체결내역(TTTS3035R),
+# 현재체결가, 실시간지연체결가 웹소켓(HDFSCNT0)과 한국수출입은행 환율 API 를 흉내 냅니다.
+# 봇 전체를 붙이려면 .env 에 아래를 설정하세요.
+#   KIS_BASE_URL=http://127.0.0.1:8090
+#   KIS_WS_URL=ws://127.0.0.1:8090
+#   KOREXIM_BASE_URL=http://127.0.0.1:8090
+#   KIS_RATE_LIMIT=500        (클라이언트 RateLimiter 를 풀어서 초당 수백 건까지 보낼 때)
+
+TOKEN_PATH = "/oauth2/tokenP"
+APPROVAL_PATH = "/oauth2/Approval"
+WS_PATH = "/tryitout/HDFSCNT0"
+ORDER_PATH = "/uapi/overseas-stock/v1/trading/order"
+BALANCE_PATH = "/uapi/overseas-stock/v1/trading/inquire-present-balance"
+CCNL_PATH = "/uapi/overseas-stock/v1/trading/inquire-ccnl"
+PRICE_PATH = "/uapi/overseas-price/v1/quotations/price"
+EXCHANGE_RATE_PATH = "/site/program/financial/exchangeJSON"
+
+ORDER_TR_IDS = {
+    "TTTT1002U": "buy", "TTTT1006U": "sell",
+    "TTTS0308U": "buy", "TTTS0307U": "sell",
+    "TTTS1002U": "buy", "TTTS1001U": "sell",
+}
+BALANCE_TR_ID = "CTRP6504R"
+CCNL_TR_ID = "TTTS3035R"
+PRICE_TR_ID = "HHDFS00000300"
+REALTIME_TR_ID = "HDFSCNT0"
+
+# 시세용 거래소코드 -> 주문용 해외거래소코드
+EXCG_BY_EXCD = {"NAS": "NASD", "NYS": "NYSE", "AMS": "AMEX", "HKS": "SEHK", "TSE": "TKSE"}
+MARKET_NAMES = {"NASD": "나스닥", "NYSE": "뉴욕", "AMEX": "아멕스", "SEHK": "홍콩", "TKSE": "도쿄"}
+
+# (해외거래소코드, 종목코드, 종목명, 기준가)
+DEFAULT_SYMBOLS = (
+    ("AMEX", "SOXL", "DIREXION DAILY SEMICONDUCTOR BULL 3X", 28.5),
+    ("NASD", "TQQQ", "PROSHARES ULTRAPRO QQQ", 78.2),
+    ("AMEX", "TECL", "DIREXION DAILY TECHNOLOGY BULL 3X", 92.4),
+    ("AMEX", "FNGU", "MICROSECTORS FANG+ INDEX 3X", 410.0),
+    ("NASD", "AAPL", "APPLE INC", 228.0),
+    ("NASD", "NVDA", "NVIDIA CORP", 132.0),
+)
+
+# rt_cd 실패 시 돌려줄 주문 거절 메시지 (msg_cd, msg1)
+ORDER_REJECTS = (
+    ("APBK0918", "주문가능금액을 초과 했습니다"),
+    ("APBK1664", "주문가능시간이 아닙니다."),
+    ("APBK0656", "해당종목정보가 없습니다."),
+)
+
+
+class MockKisServer:
+    """
+    KIS OpenAPI 목 서버 (aiohttp)
+
+    - latency_ms/jitter_ms: 모든 응답에 넣을 지연 (평균 ± 균등분포)
+    - rate_limit: 앱키별 초당 허용 건수, 넘으면 실서버처럼 HTTP 500 + EGW00201 (0 이면 무제한)
+    - fail_rate: 주문/조회를 rt_cd "1" 로 거절할 확률
+    - error_rate: HTTP 502 를 돌려줄 확률 (게이트웨이 장애 흉내, 조회 재시도 확인용)
+    - page_size: 잔고/주문체결내역 조회 1페이지 건수 (넘으면 tr_cont="M" + ctx_area_fk200/nk200 연속조회)
+    - strict_token: True 면 이 서버가 발급한 토큰만 허용 (그 외 EGW00123)
+    - 주문은 즉시 전량 체결된 것으로 보고 계좌별 잔고에 반영합니다. (시장가 MOC 는 현재가로 체결)
+    - partial_fill_rate: 주문이 절반만 먼저 체결될 확률 (나머지는 주문체결내역을 두 번째 조회할 때 현재가로 체결)
+    - 웹소켓: 구독한 종목 시세를 quote_interval_ms 마다 한 메시지에 모아 보내고, 10초마다 PINGPONG 을 보냅니다.
+      POST /mock/disconnect 로 모든 웹소켓을 끊어 재접속을 시험할 수 있습니다.
+
+    사용 예시:
+        server = MockKisServer(latency_ms=30, rate_limit=20, fail_rate=0.01)
+        url = server.serve_in_background(port=8090)   # 테스트/벤치마크용 (백그라운드 스레드)
+        ...
+        server.shutdown()
+    """
+
+    def __init__(
+        self,
+        latency_ms=20.0,
+        jitter_ms=10.0,
+        rate_limit=20,
+        fail_rate=0.0,
+        error_rate=0.0,
+        page_size=20,
+        partial_fill_rate=0.0,
+        positions=2,
+        cash=100000.0,
+        strict_token=False,
+        quote_interval_ms=100.0,
+        seed=None,
+    ):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.rate_limit = rate_limit
+        self.fail_rate = fail_rate
+        self.error_rate = error_rate
+        self.page_size = page_size
+        self.partial_fill_rate = partial_fill_rate
+        self.positions = positions
+        self.cash = cash
+        self.strict_token = strict_token
+        self.quote_interval_ms = quote_interval_ms
+        self.random = random.Random(seed)
+
+        self.tokens = set()
+        self.prices = {(excg, symbol): price for excg, symbol, _, price in DEFAULT_SYMBOLS}
+        self.names = {(excg, symbol): name for excg, symbol, name, _ in DEFAULT_SYMBOLS}
+        self.accounts = {}
+        self._windows = {}
+        self._order_seq = 0
+        self.approval_keys = set()
+        self._sockets = set()
+        self.stats = {"requests": {}, "rate_limited": 0, "failed": 0, "errors": 0, "orders": 0, "ws_messages": 0}
+
+        self._runner = None
+        self._loop = None
+        self._thread = None
+
+    # ------------------------------------------------------------------ 앱 구성
+
+    def make_app(self):
+        app = web.Application(middlewares=[self._middleware])
+        app.router.add_post(TOKEN_PATH, self.handle_token)
+        app.router.add_post(APPROVAL_PATH, self.handle_approval)
+        app.router.add_get(WS_PATH, self.handle_websocket)
+        app.router.add_post(ORDER_PATH, self.handle_order)
+        app.router.add_get(BALANCE_PATH, self.handle_balance)
+        app.router.add_get(CCNL_PATH, self.handle_ccnl)
+        app.router.add_get(PRICE_PATH, self.handle_price)
+        app.router.add_get(EXCHANGE_RATE_PATH, self.handle_exchange_rate)
+        app.router.add_get("/mock/stats", self.handle_stats)
+        app.router.add_post("/mock/config", self.handle_config)
+        app.router.add_post("/mock/disconnect", self.handle_disconnect)
+        return app
+
+    @web.middleware
+    async def _middleware(self, request, handler):
+        """공통 처리: 통계, 지연, 초당 건수 제한, 게이트웨이 오류, 토큰 확인"""
+        path = request.path
+        self.stats["requests"][path] = self.stats["requests"].get(path, 0) + 1
+        if path.startswith("/mock/"):
+            return await handler(request)
+
+        delay = self.latency_ms + self.random.uniform(-self.jitter_ms, self.jitter_ms)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+
+        if self.error_rate and self.random.random() < self.error_rate:
+            self.stats["errors"] += 1
+            return web.Response(status=502, text="Bad Gateway")
+
+        appkey = request.headers.get("appkey", "")
+        if path in (TOKEN_PATH, APPROVAL_PATH, WS_PATH, EXCHANGE_RATE_PATH):
+            return await handler(request)
+        if self._is_rate_limited(appkey):
+            self.stats["rate_limited"] += 1
+            return self._error(500, RATE_LIMIT_MSG_CD, "초당 거래건수를 초과하였습니다.")
+
+        token = request.headers.get("authorization", "").removeprefix("Bearer ").strip()
+        if not token or (self.strict_token and token not in self.tokens):
+            return self._error(500, "EGW00123", "기간이 만료된 token 입니다.")
+        return await handler(request)
+
+    def _is_rate_limited(self, appkey):
+        """앱키별 최근 1초 요청 수가 rate_limit 를 넘으면 True"""
+        if not self.rate_limit:
+            return False
+        now = time.monotonic()
+        window = self._windows.setdefault(appkey, deque())
+        while window and now - window[0] >= 1.0:
+            window.popleft()
+        if len(window) >= self.rate_limit:
+            return True
+        window.append(now)
+        return False
+
+    def _should_fail(self):
+        if self.fail_rate and self.random.random() < self.fail_rate:
+            self.stats["failed"] += 1
+            return True
+        return False
+
+    @staticmethod
+    def _error(status, msg_cd, msg1):
+        return web.json_response({"rt_cd": "1", "msg_cd": msg_cd, "msg1": msg1}, status=status)
+
+    # ------------------------------------------------------------------ 계좌 상태
+
+    def _account(self, cano, acnt_prdt_cd):
+        """계좌 상태 (처음 조회 시 기본 종목 positions 개를 보유한 상태로 생성)"""
+        key = f"{cano}-{acnt_prdt_cd}"
+        account = self.accounts.get(key)
+        if account is None:
+            holdings = {}
+            for excg, symbol, _, price in DEFAULT_SYMBOLS[: self.positions]:
+                qty = self.random.randint(10, 200)
+                holdings[(excg, symbol)] = {"qty": qty, "avg_price": round(price * self.random.uniform(0.9, 1.05), 4)}
+            for i in range(len(DEFAULT_SYMBOLS), self.positions):
+                symbol = f"MOCK{i:03d}"
+                self.prices[("NASD", symbol)] = round(self.random.uniform(10, 300), 2)
+                holdings[("NASD", symbol)] = {"qty": self.random.randint(1, 100), "avg_price": self.prices[("NASD", symbol)]}
+            account = self.accounts[key] = {"cash": self.cash, "holdings": holdings, "orders": []}
+        return account
+
+    def _price(self, excg, symbol):
+        """현재가 (조회할 때마다 ±0.5% 랜덤워크)"""
+        price = self.prices.get((excg, symbol))
+        if price is None:
+            price = self.prices[(excg, symbol)] = round(self.random.uniform(10, 300), 2)
+        price = round(max(0.01, price * (1 + self.random.uniform(-0.005, 0.005))), 2)
+        self.prices[(excg, symbol)] = price
+        return price
+
+    def _fill(self, account, side, excg, symbol, qty, price):
+        """주문 즉시 체결 -> 실패 시 (msg_cd, msg1), 성공 시 None"""
+        holdings = account["holdings"]
+        held = holdings.get((excg, symbol), {"qty": 0, "avg_price": 0.0})
+        if side == "buy":
+            if qty * price > account["cash"]:
+                return ORDER_REJECTS[0]
+            new_qty = held["qty"] + qty
+            held["avg_price"] = round((held["qty"] * held["avg_price"] + qty * price) / new_qty, 4)
+            held["qty"] = new_qty
+            account["cash"] -= qty * price
+            holdings[(excg, symbol)] = held
+        else:
+            if qty > held["qty"]:
+                return "APBK0986", "주문가능수량을 초과하였습니다."
+            held["qty"] -= qty
+            account["cash"] += qty * price
+            if held["qty"] == 0:
+                holdings.pop((excg, symbol), None)
+        return None
+
+    def _position_item(self, excg, symbol, held):
+        now_price = self.prices.get((excg, symbol), held["avg_price"])
+        pchs = held["qty"] * held["avg_price"]
+        evlu = held["qty"] * now_price
+        return {
+            "prdt_name": self.names.get((excg, symbol), symbol),
+            "cblc_qty13": f"{held['qty']}",
+            "thdt_buy_ccld_qty1": "0",
+            "thdt_sll_ccld_qty1": "0",
+            "ccld_qty_smtl1": f"{held['qty']}",
+            "ord_psbl_qty1": f"{held['qty']}",
+            "frcr_pchs_amt": f"{pchs:.4f}",
+            "frcr_evlu_amt2": f"{evlu:.4f}",
+            "evlu_pfls_amt2": f"{evlu - pchs:.4f}",
+            "evlu_pfls_rt1": f"{(evlu / pchs - 1) * 100 if pchs else 0:.4f}",
+            "pdno": symbol,
+            "bass_exrt": "1380.00000000",
+            "buy_crcy_cd": "USD",
+            "ovrs_now_pric1": f"{now_price:.8f}",
+            "avg_unpr3": f"{held['avg_price']:.8f}",
+            "tr_mket_name": MARKET_NAMES.get(excg, excg),
+            "natn_kor_name": "미국",
+            "pchs_rmnd_wcrc_amt": f"{pchs * 1380:.0f}",
+            "thdt_buy_ccld_frcr_amt": "0",
+            "thdt_sll_ccld_frcr_amt": "0",
+            "unit_amt": "1",
+            "std_pdno": symbol,
+            "prdt_type_cd": "529" if excg == "AMEX" else "512",
+            "scts_dvsn_name": "",
+            "loan_rmnd": "0",
+            "loan_dt": "",
+            "loan_expd_dt": "",
+            "ovrs_excg_cd": excg,
+            "item_lnkg_excg_cd": "",
+        }
+
+    # ------------------------------------------------------------------ 핸들러
+
+    async def handle_token(self, request):
+        body = await request.json()
+        if body.get("grant_type") != "client_credentials" or not body.get("appkey") or not body.get("appsecret"):
+            return web.json_response({"error_description": "유효하지 않은 AppKey입니다.", "error_code": "EGW00103"}, status=403)
+        token = secrets.token_urlsafe(48)
+        self.tokens.add(token)
+        expired_at = datetime.now() + timedelta(hours=24)
+        return web.json_response({
+            "access_token": token,
+            "access_token_token_expired": expired_at.strftime("%Y-%m-%d %H:%M:%S"),
+            "token_type": "Bearer",
+            "expires_in": 86400,
+        })
+
+    async def handle_approval(self, request):
+        body = await request.json()
+        if body.get("grant_type") != "client_credentials" or not body.get("appkey") or not body.get("secretkey"):
+            return web.json_response({"error_description": "유효하지 않은 AppKey입니다.", "error_code": "EGW00103"}, status=403)
+        approval_key = secrets.token_hex(18)
+        self.approval_keys.add(approval_key)
+        return web.json_response({"approval_key": approval_key})
+
+    def _quote_record(self, tr_key):
+        """실시간지연체결가 레코드 1건 ('^' 구분 26개 필드)"""
+        excg = EXCG_BY_EXCD.get(tr_key[1:4], tr_key[1:4])
+        symbol = tr_key[4:]
+        price = self._price(excg, symbol)
+        now = datetime.now()
+        return "^".join((
+            tr_key, symbol, "4", now.strftime("%Y%m%d"), now.strftime("%Y%m%d"), now.strftime("%H%M%S"),
+            now.strftime("%Y%m%d"), now.strftime("%H%M%S"),
+            f"{price:.4f}", f"{price * 1.01:.4f}", f"{price * 0.99:.4f}", f"{price:.4f}",
+            "2", "0.0000", "0.00", f"{price - 0.01:.4f}", f"{price + 0.01:.4f}", "100", "100",
+            "1", "1000", f"{price * 1000:.0f}", "0", "0", "100.00", "1",
+        ))
+
+    async def handle_websocket(self, request):
+        """실시간지연체결가 웹소켓: 구독/해제 요청 처리 + 시세/PINGPONG 전송"""
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self._sockets.add(ws)
+        subscribed = []
+
+        async def _stream():
+            last_ping = time.monotonic()
+            while not ws.closed:
+                await asyncio.sleep(self.quote_interval_ms / 1000)
+                if subscribed:
+                    records = [self._quote_record(tr_key) for tr_key in list(subscribed)]
+                    await ws.send_str(f"0|{REALTIME_TR_ID}|{len(records):03d}|" + "^".join(records))
+                    self.stats["ws_messages"] += 1
+                if time.monotonic() - last_ping >= 10:
+                    last_ping = time.monotonic()
+                    await ws.send_str(json.dumps({"header": {"tr_id": "PINGPONG", "datetime": datetime.now().strftime("%Y%m%d%H%M%S")}}))
+
+        streamer = asyncio.ensure_future(_stream())
+        try:
+            async for message in ws:
+                if message.type != web.WSMsgType.TEXT:
+                    continue
+                try:
+                    request_data = json.loads(message.data)
+                    header = request_data["header"]
+                    tr_key = request_data["body"]["input"]["tr_key"]
+                except (ValueError, KeyError):
+                    continue
+                if header.get("tr_id") == "PINGPONG" or "approval_key" not in header:
+                    continue
+                if header["approval_key"] not in self.approval_keys:
+                    body = {"rt_cd": "1", "msg_cd": "OPSP8996", "msg1": "invalid approval : NOT FOUND"}
+                elif header.get("tr_type") == "2":
+                    if tr_key in subscribed:
+                        subscribed.remove(tr_key)
+                    body = {"rt_cd": "0", "msg_cd": "OPSP0001", "msg1": "UNSUBSCRIBE SUCCESS"}
+                elif len(subscribed) >= 41:
+                    body = {"rt_cd": "1", "msg_cd": "OPSP0008", "msg1": "MAX SUBSCRIBE OVER"}
+                else:
+                    if tr_key not in subscribed:
+                        subscribed.append(tr_key)
+                    body = {"rt_cd": "0", "msg_cd": "OPSP0000", "msg1": "SUBSCRIBE SUCCESS"}
+                await ws.send_str(json.dumps({
+                    "header": {"tr_id": REALTIME_TR_ID, "tr_key": tr_key, "encrypt": "N"},
+                    "body": body,
+                }, ensure_ascii=False))
+        finally:
+            streamer.cancel()
+            self._sockets.discard(ws)
+        return ws
+
+    async def handle_disconnect(self, request):
+        """열린 웹소켓 모두 끊기 (재접속 시험용)"""
+        sockets = list(self._sockets)
+        for ws in sockets:
+            await ws.close()
+        return web.json_response({"closed": len(sockets)})
+
+    async def handle_order(self, request):
+        side = ORDER_TR_IDS.get(request.headers.get("tr_id", ""))
+        if side is None:
+            return self._error(500, "EGW00205", "tr_id 가 올바르지 않습니다.")
+        body = await request.json()
+        try:
+            qty = int(body["ORD_QTY"])
+            price = float(body["OVRS_ORD_UNPR"])
+            excg = body["OVRS_EXCG_CD"]
+            symbol = body["PDNO"]
+            account = self._account(body["CANO"], body["ACNT_PRDT_CD"])
+        except (KeyError, ValueError):
+            return web.json_response({"rt_cd": "2", "msg_cd": "OPSQ2002", "msg1": "필수 입력값이 누락되었습니다."})
+        if qty <= 0:
+            return web.json_response({"rt_cd": "1", "msg_cd": "APBK0507", "msg1": "주문수량을 확인하세요."})
+        if self._should_fail():
+            msg_cd, msg1 = self.random.choice(ORDER_REJECTS)
+            return web.json_response({"rt_cd": "1", "msg_cd": msg_cd, "msg1": msg1})
+
+        order_price = price
+        if body.get("ORD_DVSN") == "33" or price <= 0:
+            price = self._price(excg, symbol)
+        fill_qty = qty // 2 if qty >= 2 and self.random.random() < self.partial_fill_rate else qty
+        rejected = self._fill(account, side, excg, symbol, fill_qty, price)
+        if rejected:
+            return web.json_response({"rt_cd": "1", "msg_cd": rejected[0], "msg1": rejected[1]})
+
+        self._order_seq += 1
+        self.stats["orders"] += 1
+        now = datetime.now()
+        odno = f"{self._order_seq:010d}"
+        account["orders"].append({
+            "ord_dt": exchange_date(excg), "ord_tmd": now.strftime("%H%M%S"), "odno": odno, "side": side,
+            "excg": excg, "symbol": symbol, "qty": qty, "price": order_price,
+            "filled": fill_qty, "amount": fill_qty * price, "polls": 0,
+        })
+        return web.json_response({
+            "rt_cd": "0",
+            "msg_cd": "APBK0013",
+            "msg1": "주문 전송 완료 되었습니다.",
+            "output": {
+                "KRX_FWDG_ORD_ORGNO": "01790",
+                "ODNO": odno,
+                "ORD_TMD": now.strftime("%H%M%S"),
+            },
+        })
+
+    def _ccnl_item(self, order):
+        filled, qty = order["filled"], order["qty"]
+        avg = order["amount"] / filled if filled else 0.0
+        return {
+            "ord_dt": order["ord_dt"],
+            "ord_gno_brno": "01790",
+            "odno": order["odno"],
+            "orgn_odno": "",
+            "sll_buy_dvsn_cd": "02" if order["side"] == "buy" else "01",
+            "sll_buy_dvsn_cd_name": "매수" if order["side"] == "buy" else "매도",
+            "rvse_cncl_dvsn": "00",
+            "rvse_cncl_dvsn_name": "",
+            "pdno": order["symbol"],
+            "prdt_name": self.names.get((order["excg"], order["symbol"]), order["symbol"]),
+            "ft_ord_qty": str(qty),
+            "ft_ord_unpr3": f"{order['price']:.8f}",
+            "ft_ccld_qty": str(filled),
+            "ft_ccld_unpr3": f"{avg:.8f}",
+            "ft_ccld_amt3": f"{order['amount']:.5f}",
+            "nccs_qty": str(qty - filled),
+            "prcs_stat_name": "완료" if filled == qty else "접수",
+            "rjct_rson": "",
+            "rjct_rson_name": "",
+            "ord_tmd": order["ord_tmd"],
+            "tr_mket_name": MARKET_NAMES.get(order["excg"], ""),
+            "tr_crcy_cd": "USD",
+            "ovrs_excg_cd": order["excg"],
+        }
+
+    async def handle_ccnl(self, request):
+        if request.headers.get("tr_id") != CCNL_TR_ID:
+            return self._error(500, "EGW00205", "tr_id 가 올바르지 않습니다.")
+        query = request.query
+        if len(query.get("CANO", "")) != 8 or len(query.get("ACNT_PRDT_CD", "")) != 2:
+            return web.json_response({"rt_cd": "2", "msg_cd": "OPSQ2002", "msg1": "계좌번호를 확인하세요."})
+        if self._should_fail():
+            return web.json_response({"rt_cd": "1", "msg_cd": "EGW00001", "msg1": "일시적인 오류가 발생했습니다."})
+
+        account = self._account(query["CANO"], query["ACNT_PRDT_CD"])
+        start, end = query.get("ORD_STRT_DT", ""), query.get("ORD_END_DT", "99999999")
+        offset = int(query.get("CTX_AREA_NK200") or 0) if request.headers.get("tr_cont") == "N" else 0
+        if offset == 0:
+            # 부분체결 주문은 두 번째 조회 때 나머지를 현재가로 체결
+            for order in account["orders"]:
+                if order["filled"] < order["qty"]:
+                    order["polls"] += 1
+                    if order["polls"] >= 2:
+                        rest = order["qty"] - order["filled"]
+                        price = self._price(order["excg"], order["symbol"])
+                        if not self._fill(account, order["side"], order["excg"], order["symbol"], rest, price):
+                            order["filled"] += rest
+                            order["amount"] += rest * price
+        items = [self._ccnl_item(order) for order in account["orders"] if start <= order["ord_dt"] <= end]
+        page = items[offset: offset + self.page_size]
+        has_next = offset + self.page_size < len(items)
+        return web.json_response({
+            "ctx_area_fk200": f"{query['CANO']}^{query['ACNT_PRDT_CD']}^" if has_next else "",
+            "ctx_area_nk200": str(offset + self.page_size) if has_next else "",
+            "output": page,
+            "rt_cd": "0",
+            "msg_cd": "KIOK0510" if has_next else "KIOK0460",
+            "msg1": "조회가 계속됩니다..다음버튼을 Click 하십시오." if has_next else "조회 되었습니다. (마지막 자료)",
+        }, headers={"tr_cont": "M" if has_next else "D"})
+
+    async def handle_balance(self, request):
+        if request.headers.get("tr_id") != BALANCE_TR_ID:
+            return self._error(500, "EGW00205", "tr_id 가 올바르지 않습니다.")
+        query = request.query
+        if len(query.get("CANO", "")) != 8 or len(query.get("ACNT_PRDT_CD", "")) != 2:
+            return web.json_response({"rt_cd": "2", "msg_cd": "OPSQ2002", "msg1": "계좌번호를 확인하세요."})
+        if self._should_fail():
+            return web.json_response({"rt_cd": "1", "msg_cd": "EGW00001", "msg1": "일시적인 오류가 발생했습니다."})
+
+        account = self._account(query["CANO"], query["ACNT_PRDT_CD"])
+        items = [self._position_item(excg, symbol, held) for (excg, symbol), held in sorted(account["holdings"].items())]
+        offset = int(query.get("CTX_AREA_NK200") or 0) if request.headers.get("tr_cont") == "N" else 0
+        page = items[offset: offset + self.page_size]
+        has_next = offset + self.page_size < len(items)
+
+        pchs = sum(float(item["frcr_pchs_amt"]) for item in items)
+        evlu = sum(float(item["frcr_evlu_amt2"]) for item in items)
+        data = {
+            "ctx_area_fk200": f"{query['CANO']}^{query['ACNT_PRDT_CD']}^" if has_next else "",
+            "ctx_area_nk200": str(offset + self.page_size) if has_next else "",
+            "output1": page,
+            "output2": [{
+                "crcy_cd": "USD",
+                "crcy_cd_name": "미국 달러",
+                "frcr_buy_amt_smtl": f"{pchs:.2f}",
+                "frcr_sll_amt_smtl": "0.00",
+                "frcr_dncl_amt_2": f"{account['cash']:.2f}",
+                "frst_bltn_exrt": "1380.00000000",
+                "frcr_drwg_psbl_amt_1": f"{account['cash']:.2f}",
+                "frcr_evlu_amt2": f"{evlu:.2f}",
+            }],
+            "output3": {
+                "pchs_amt_smtl": f"{pchs * 1380:.0f}",
+                "evlu_amt_smtl": f"{evlu * 1380:.0f}",
+                "evlu_pfls_amt_smtl": f"{(evlu - pchs) * 1380:.0f}",
+                "tot_asst_amt": f"{(evlu + account['cash']) * 1380:.0f}",
+                "evlu_erng_rt1": f"{(evlu / pchs - 1) * 100 if pchs else 0:.8f}",
+                "tot_evlu_pfls_amt": f"{(evlu - pchs) * 1380:.8f}",
+                "wdrw_psbl_tot_amt": f"{account['cash'] * 1380:.0f}",
+                "frcr_use_psbl_amt": f"{account['cash']:.8f}",
+            },
+            "rt_cd": "0",
+            "msg_cd": "KIOK0510" if has_next else "KIOK0460",
+            "msg1": "조회가 계속됩니다..다음버튼을 Click 하십시오." if has_next else "조회 되었습니다. (마지막 자료)",
+        }
+        return web.json_response(data, headers={"tr_cont": "M" if has_next else "D"})
+
+    async def handle_price(self, request):
+        if request.headers.get("tr_id") != PRICE_TR_ID:
+            return self._error(500, "EGW00205", "tr_id 가 올바르지 않습니다.")
+        excd = request.query.get("EXCD", "")
+        symbol = request.query.get("SYMB", "")
+        if self._should_fail():
+            return web.json_response({"rt_cd": "1", "msg_cd": "EGW00001", "msg1": "일시적인 오류가 발생했습니다."})
+        price = self._price(EXCG_BY_EXCD.get(excd, excd), symbol)
+        return web.json_response({
+            "output": {"rsym": f"D{excd}{symbol}", "zdiv": "4", "base": f"{price:.4f}", "pvol": "0", "last": f"{price:.4f}",
+                       "sign": "3", "diff": "0.0000", "rate": "0.00", "tvol": "0", "tamt": "0", "ordy": "매도불가"},
+            "rt_cd": "0",
+            "msg_cd": "MCA00000",
+            "msg1": "정상처리 되었습니다.",
+        })
+
+    async def handle_exchange_rate(self, request):
+        """한국수출입은행 현재환율 (주말은 빈 목록, 날짜마다 고정된 난수 환율)"""
+        searchdate = request.query.get("searchdate", "")
+        if not request.query.get("authkey"):
+            return web.json_response([{"result": 3}])
+        try:
+            day = datetime.strptime(searchdate, "%Y%m%d")
+        except ValueError:
+            return web.json_response([{"result": 2}])
+        if day.weekday() >= 5:
+            return web.json_response([])
+        rng = random.Random(searchdate)
+        items = []
+        for cur_unit, cur_nm, base in (("USD", "미국 달러", 1380.0), ("JPY(100)", "일본 옌", 920.0), ("HKD", "홍콩 달러", 176.0)):
+            rate = base * rng.uniform(0.95, 1.05)
+            items.append({
+                "result": 1, "cur_unit": cur_unit, "cur_nm": cur_nm,
+                "ttb": f"{rate * 0.99:,.2f}", "tts": f"{rate * 1.01:,.2f}", "deal_bas_r": f"{rate:,.2f}",
+                "bkpr": f"{rate:,.0f}", "yy_efee_r": "0", "ten_dd_efee_r": "0", "kftc_bkpr": f"{rate:,.0f}", "kftc_deal_bas_r": f"{rate:,.2f}",
+            })
+        return web.json_response(items)
+
+    async def handle_stats(self, request):
+        return web.json_response(dict(self.stats, tokens=len(self.tokens), accounts=len(self.accounts)))
+
+    async def handle_config(self, request):
+        """실행 중 설정 변경 (예: {"latency_ms": 100, "fail_rate": 0.1})"""
+        body = await request.json()
+        for key in ("latency_ms", "jitter_ms", "rate_limit", "fail_rate", "error_rate", "page_size", "partial_fill_rate", "strict_token", "quote_interval_ms"):
+            if key in body:
+                setattr(self, key, body[key])
+        return web.json_response({"ok": True})
+
+    # ------------------------------------------------------------------ 실행
+
+    async def start(self, host="127.0.0.1", port=8090):
+        """현재 이벤트 루프에서 서버 시작 -> base URL"""
+        self._runner = web.AppRunner(self.make_app(), access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        return f"http://{host}:{port}"
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def serve_in_background(self, host="127.0.0.1", port=0):
+        """백그라운드 스레드 이벤트 루프에서 서버 시작 -> base URL (port=0 이면 빈 포트 자동 선택)"""
+        started = threading.Event()
+        result = {}
+
+        def _run():
+            self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self._loop)
+            result["url"] = self._loop.run_until_complete(self.start(host, port))
+            started.set()
+            self._loop.run_forever()
+            self._loop.run_until_complete(self.stop())
+            self._loop.close()
+
+        self._thread = threading.Thread(target=_run, daemon=True)
+        self._thread.start()
+        started.wait()
+        return result["url"]
+
+    def shutdown(self):
+        """serve_in_background 로 시작한 서버 종료"""
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=5)
+            self._loop = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="KIS OpenAPI 목 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency", type=float, default=20.0, help="평균 응답 지연(ms)")
+    parser.add_argument("--jitter", type=float, default=10.0, help="지연 편차(ms)")
+    parser.add_argument("--rate-limit", type=int, default=20, help="앱키별 초당 허용 건수 (0: 무제한)")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="rt_cd 실패 확률")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="HTTP 502 확률")
+    parser.add_argument("--page-size", type=int, default=20, help="잔고/주문체결내역 조회 페이지당 건수")
+    parser.add_argument("--partial-fill-rate", type=float, default=0.0, help="주문이 절반만 먼저 체결될 확률")
+    parser.add_argument("--positions", type=int, default=2, help="계좌별 초기 보유 종목 수")
+    parser.add_argument("--strict-token", action="store_true", help="이 서버가 발급한 토큰만 허용")
+    parser.add_argument("--quote-interval", type=float, default=100.0, help="웹소켓 시세 전송 간격(ms)")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    server = MockKisServer(
+        latency_ms=args.latency,
+        jitter_ms=args.jitter,
+        rate_limit=args.rate_limit,
+        fail_rate=args.fail_rate,
+        error_rate=args.error_rate,
+        page_size=args.page_size,
+        partial_fill_rate=args.partial_fill_rate,
+        positions=args.positions,
+        strict_token=args.strict_token,
+        quote_interval_ms=args.quote_interval,
+        seed=args.seed,
+    )
+
+    async def _serve():
+        url = await server.start(args.host, args.port)
+        log_print(f"[bold cyan]🧪 KIS 목 서버 시작: {url}[/bold cyan]")
+        log_print(f"\t.env 에 [bold]KIS_BASE_URL={url}[/bold], [bold]KIS_WS_URL={url.replace('http', 'ws', 1)}[/bold] 를 설정하면 봇이 이 서버로 요청합니다.")
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await server.stop()
+
+    try:
+        asyncio.run(_serve())
+    except KeyboardInterrupt:
+        log_print(f"[bold cyan]🧪 KIS 목 서버 종료[/bold cyan] {server.stats}")
+
+
+if __name__ == "__main__":
+    main()
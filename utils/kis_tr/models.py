@@ -0,0 +1,245 @@
+from decimal import Decimal, InvalidOperation
+
+# KIS 응답 레코드 (응답을 받을 때 한 번만 숫자로 변환)
+# KIS 는 숫자를 모두 문자열로 주므로 소비하는 곳마다 float(...) 하지 않도록 여기서 변환해 둡니다.
+# 가격/금액은 문자열 그대로 Decimal 로 바꿔 반올림 오차 없이 보관하고, 전략 계산에 넣을 때만 float() 합니다.
+# 레코드는 __slots__ 클래스라 dict 보다 작고 속성 접근이 빠릅니다.
+
+ZERO = Decimal(0)
+
+
+def to_decimal(value):
+    """'12.3400' -> Decimal('12.3400') (빈 값/형식 오류는 0)"""
+    if not value:
+        return ZERO
+    try:
+        return Decimal(value)
+    except (InvalidOperation, TypeError, ValueError):
+        return ZERO
+
+
+def to_int(value):
+    """'10.00000000' -> 10 (빈 값/형식 오류는 0)"""
+    if not value:
+        return 0
+    try:
+        return int(value)
+    except ValueError:
+        return int(to_decimal(value))
+
+
+class Position:
+    """output1 보유종목 1건"""
+
+    __slots__ = (
+        "pdno", "prdt_name", "ovrs_excg_cd", "qty", "avg_price", "now_price",
+        "evlu_pfls_amt", "evlu_pfls_rt", "tr_mket_name",
+    )
+
+    def __init__(self, pdno, prdt_name, ovrs_excg_cd, qty, avg_price, now_price, evlu_pfls_amt, evlu_pfls_rt, tr_mket_name):
+        self.pdno = pdno
+        self.prdt_name = prdt_name
+        self.ovrs_excg_cd = ovrs_excg_cd
+        self.qty = qty
+        self.avg_price = avg_price
+        self.now_price = now_price
+        self.evlu_pfls_amt = evlu_pfls_amt
+        self.evlu_pfls_rt = evlu_pfls_rt
+        self.tr_mket_name = tr_mket_name
+
+    @classmethod
+    def from_item(cls, item):
+        get = item.get
+        return cls(
+            get("pdno", ""),
+            get("prdt_name", ""),
+            get("ovrs_excg_cd", ""),
+            to_int(get("ccld_qty_smtl1")),
+            to_decimal(get("avg_unpr3")),
+            to_decimal(get("ovrs_now_pric1")),
+            to_decimal(get("evlu_pfls_amt2")),
+            to_decimal(get("evlu_pfls_rt1")),
+            get("tr_mket_name", ""),
+        )
+
+    @property
+    def key(self):
+        """(ovrs_excg_cd, pdno)"""
+        return self.ovrs_excg_cd, self.pdno
+
+    def __repr__(self):
+        return f"Position({self.ovrs_excg_cd}:{self.pdno} qty={self.qty} avg={self.avg_price} now={self.now_price})"
+
+
+class CurrencyBalance:
+    """output2 통화별 잔고 1건"""
+
+    __slots__ = ("crcy_cd", "crcy_cd_name", "dncl_amt", "drwg_psbl_amt", "evlu_amt", "frst_bltn_exrt")
+
+    def __init__(self, crcy_cd, crcy_cd_name, dncl_amt, drwg_psbl_amt, evlu_amt, frst_bltn_exrt):
+        self.crcy_cd = crcy_cd
+        self.crcy_cd_name = crcy_cd_name
+        self.dncl_amt = dncl_amt                # 외화예수금
+        self.drwg_psbl_amt = drwg_psbl_amt      # 출금가능금액
+        self.evlu_amt = evlu_amt                # 평가금액
+        self.frst_bltn_exrt = frst_bltn_exrt    # 최초고시환율
+
+    @classmethod
+    def from_item(cls, item):
+        get = item.get
+        return cls(
+            get("crcy_cd", ""),
+            get("crcy_cd_name", ""),
+            to_decimal(get("frcr_dncl_amt_2")),
+            to_decimal(get("frcr_drwg_psbl_amt_1")),
+            to_decimal(get("frcr_evlu_amt2")),
+            to_decimal(get("frst_bltn_exrt")),
+        )
+
+
+class AccountSummary:
+    """output3 계좌 전체 요약 (원화 금액)"""
+
+    __slots__ = (
+        "pchs_amt_smtl", "evlu_amt_smtl", "evlu_pfls_amt_smtl", "tot_asst_amt",
+        "evlu_erng_rt1", "tot_evlu_pfls_amt", "wdrw_psbl_tot_amt", "frcr_use_psbl_amt",
+    )
+
+    def __init__(self, **values):
+        for name in self.__slots__:
+            setattr(self, name, values.get(name, ZERO))
+
+    @classmethod
+    def from_item(cls, item):
+        return cls(**{name: to_decimal(item.get(name)) for name in cls.__slots__})
+
+
+class HoldingsSnapshot:
+    """
+    체결기준현재잔고 응답 1개 (연속조회 병합 후)
+
+    positions 는 (ovrs_excg_cd, pdno) -> Position 입니다.
+    """
+
+    __slots__ = ("positions", "currencies", "summary", "ctx_area_fk200", "ctx_area_nk200", "tr_cont")
+
+    def __init__(self, positions, currencies, summary, ctx_area_fk200="", ctx_area_nk200="", tr_cont=""):
+        self.positions = positions
+        self.currencies = currencies
+        self.summary = summary
+        self.ctx_area_fk200 = ctx_area_fk200
+        self.ctx_area_nk200 = ctx_area_nk200
+        self.tr_cont = tr_cont
+
+    @classmethod
+    def from_response(cls, data):
+        positions = {}
+        for item in data.get("output1", []):
+            position = Position.from_item(item)
+            positions[position.ovrs_excg_cd, position.pdno] = position
+        output3 = data.get("output3")
+        return cls(
+            positions,
+            [CurrencyBalance.from_item(item) for item in data.get("output2", [])],
+            AccountSummary.from_item(output3) if output3 else None,
+            data.get("ctx_area_fk200", ""),
+            data.get("ctx_area_nk200", ""),
+            data.get("tr_cont", ""),
+        )
+
+    def get(self, ovrs_excg_cd, pdno):
+        """종목 1개 보유정보 (없으면 None)"""
+        return self.positions.get((ovrs_excg_cd, pdno))
+
+
+class OrderResult:
+    """해외주식 주문 응답"""
+
+    __slots__ = ("rt_cd", "msg_cd", "msg1", "odno", "ord_tmd", "krx_fwdg_ord_orgno")
+
+    def __init__(self, rt_cd, msg_cd, msg1, odno="", ord_tmd="", krx_fwdg_ord_orgno=""):
+        self.rt_cd = rt_cd
+        self.msg_cd = msg_cd
+        self.msg1 = msg1
+        self.odno = odno                                # 주문번호
+        self.ord_tmd = ord_tmd                          # 주문시각 (HHMMSS)
+        self.krx_fwdg_ord_orgno = krx_fwdg_ord_orgno    # 주문 조직번호 (정정/취소 시 필요)
+
+    @classmethod
+    def from_response(cls, data):
+        data = data or {}
+        output = data.get("output") or {}
+        return cls(
+            data.get("rt_cd", ""),
+            data.get("msg_cd", ""),
+            data.get("msg1", ""),
+            output.get("ODNO", ""),
+            output.get("ORD_TMD", ""),
+            output.get("KRX_FWDG_ORD_ORGNO", ""),
+        )
+
+    @property
+    def ok(self):
+        """KIS 가 주문을 접수했는지 (rt_cd == '0')"""
+        return self.rt_cd == "0"
+
+    def __repr__(self):
+        return f"OrderResult(rt_cd={self.rt_cd!r}, msg_cd={self.msg_cd!r}, odno={self.odno!r})"
+
+
+class Execution:
+    """주문체결내역 1건 (주문 1건의 누적 체결 상태)"""
+
+    __slots__ = (
+        "ord_dt", "odno", "orgn_odno", "side", "pdno", "ovrs_excg_cd", "ord_qty", "ord_price",
+        "ccld_qty", "ccld_price", "nccs_qty", "status_name", "rvse_cncl_dvsn", "rjct_rson_name", "ord_tmd",
+    )
+
+    # sll_buy_dvsn_cd -> side
+    SIDES = {"01": "sell", "02": "buy"}
+
+    def __init__(self, ord_dt, odno, orgn_odno, side, pdno, ovrs_excg_cd, ord_qty, ord_price,
+                 ccld_qty, ccld_price, nccs_qty, status_name, rvse_cncl_dvsn, rjct_rson_name, ord_tmd):
+        self.ord_dt = ord_dt
+        self.odno = odno
+        self.orgn_odno = orgn_odno              # 정정/취소 주문이면 원주문번호
+        self.side = side
+        self.pdno = pdno
+        self.ovrs_excg_cd = ovrs_excg_cd
+        self.ord_qty = ord_qty
+        self.ord_price = ord_price
+        self.ccld_qty = ccld_qty                # 누적 체결수량
+        self.ccld_price = ccld_price            # 체결 평균단가
+        self.nccs_qty = nccs_qty                # 미체결수량
+        self.status_name = status_name          # 처리상태명 (접수/완료/거부 ...)
+        self.rvse_cncl_dvsn = rvse_cncl_dvsn    # 정정취소구분 (00 원주문, 01 정정, 02 취소)
+        self.rjct_rson_name = rjct_rson_name
+        self.ord_tmd = ord_tmd
+
+    @classmethod
+    def from_item(cls, item):
+        get = item.get
+        return cls(
+            get("ord_dt", ""),
+            get("odno", ""),
+            get("orgn_odno", ""),
+            cls.SIDES.get(get("sll_buy_dvsn_cd", ""), ""),
+            get("pdno", ""),
+            get("ovrs_excg_cd", ""),
+            to_int(get("ft_ord_qty")),
+            to_decimal(get("ft_ord_unpr3")),
+            to_int(get("ft_ccld_qty")),
+            to_decimal(get("ft_ccld_unpr3")),
+            to_int(get("nccs_qty")),
+            get("prcs_stat_name", ""),
+            get("rvse_cncl_dvsn", "") or "00",
+            get("rjct_rson_name", ""),
+            get("ord_tmd", ""),
+        )
+
+    @property
+    def rejected(self):
+        return "거부" in self.status_name
+
+    def __repr__(self):
+        return f"Execution({self.odno} {self.side} {self.pdno} {self.ccld_qty}/{self.ord_qty} @ {self.ccld_price} {self.status_name})"
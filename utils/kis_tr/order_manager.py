@@ -0,0 +1,343 @@
+import asyncio
+import threading
+from datetime import datetime, timedelta
+from decimal import Decimal
+from utils import database
+from utils.kis_tr.models import ZERO, OrderResult, to_decimal
+from utils.kis_tr.해외주식_주문 import OverseasStockOrder
+from utils.log_print import log_print
+from utils.market_calendar import SEOUL, exchange_date
+from utils.metrics import STRATEGY_STEP_SECONDS
+
+# 주문 상태
+SUBMITTED = "submitted"    # 접수 (미체결)
+PARTIAL = "partial"        # 일부 체결
+FILLED = "filled"          # 전량 체결
+REJECTED = "rejected"      # 주문 거절 (전송 시 rt_cd != 0 또는 체결내역 처리상태 '거부')
+CANCELLED = "cancelled"    # 취소 주문 확인 (체결된 수량은 그대로 반영)
+EXPIRED = "expired"        # 유효기간이 지나도 다 체결되지 않음
+OPEN_STATUSES = (SUBMITTED, PARTIAL)
+
+# 평균단가 저장 자릿수 (avg_unpr3 와 같은 소수 8자리)
+PRICE_EXP = Decimal("0.00000001")
+
+ORDER_COLUMNS = (
+    "id", "account", "ord_dt", "odno", "side", "ovrs_excg_cd", "symbol", "qty", "price",
+    "ord_dvsn", "status", "filled_qty", "avg_fill_price",
+)
+
+
+class TrackedOrder:
+    """orders 테이블 1행 (가격은 Decimal)"""
+
+    __slots__ = ORDER_COLUMNS
+
+    def __init__(self, *values):
+        for name, value in zip(self.__slots__, values):
+            setattr(self, name, value)
+
+    @classmethod
+    def from_row(cls, row):
+        values = list(row)
+        values[8] = to_decimal(values[8])
+        values[12] = to_decimal(values[12])
+        return cls(*values)
+
+    @property
+    def key(self):
+        """(ovrs_excg_cd, symbol)"""
+        return self.ovrs_excg_cd, self.symbol
+
+    @property
+    def order_key(self):
+        """(ord_dt, odno) - ODNO 는 하루 단위 일련번호라 날짜와 함께 써야 주문 1건이 정해짐"""
+        return self.ord_dt, self.odno
+
+    def __repr__(self):
+        return f"TrackedOrder({self.odno} {self.side} {self.symbol} {self.filled_qty}/{self.qty} {self.status})"
+
+
+class OrderManager:
+    """
+    주문 생애주기 추적 + 체결 일괄 대사
+
+    - 같은 계좌로 나간 주문은 (OverseasStockOrder 주문 콜백) 주문번호/매매구분/수량/단가/주문구분과 함께 orders 테이블에 기록됩니다.
+    - reconcile() 은 열린 주문이 있을 때만 주문체결내역(TTTS3035R)을 1번(연속조회 포함) 조회해서 모든 열린 주문을 한꺼번에 맞춥니다.
+      주문마다 상태를 따로 묻지 않으므로 열린 주문 수와 상관없이 주기당 조회 1번입니다.
+    - 직전 대사 이후 늘어난 체결수량(delta)만큼 보유수량/평균단가(position_state)를 갱신합니다. (잔고를 다시 받지 않음)
+    - 반영한 체결 delta 는 fills 테이블에 쌓여 전략 상태 체크포인트가 그 뒤 체결만 이어서 반영합니다.
+    - 상태: submitted -> partial -> filled / rejected / cancelled / expired
+    - ODNO 는 하루 단위 일련번호이므로 주문은 (주문일자, ODNO) 로 구분하고, 주문일자는 KIS 조회와 같은 거래소 현지 날짜입니다.
+
+    사용 예시:
+        manager = OrderManager(OverseasOrderHistory(appkey, appsecret, None, account))
+        manager.seed_positions(holdings.get_snapshot())   # 최초 1번 (position_state 가 비어 있을 때)
+        ...주문...
+        updates = manager.reconcile()
+        qty, avg_price = manager.get_position("AMEX", "SOXL")
+    """
+
+    # 해외주식 주문은 당일 유효 - 현지/한국 날짜 차이를 감안해 이 일수가 지나도 열려 있으면 만료 처리
+    EXPIRE_DAYS = 3
+
+    def __init__(self, history, watch_orders=True):
+        """
+        Args:
+            history (OverseasOrderHistory): 주문체결내역 조회 래퍼
+            watch_orders (bool): 같은 계좌 주문을 자동 기록할지 여부
+        """
+        self.history = history
+        self.account = history.account
+        self._lock = threading.Lock()
+        self.open_orders = {}   # (ord_dt, odno) -> TrackedOrder
+        self.positions = {}     # (ovrs_excg_cd, symbol) -> (qty, avg_price)
+        self.inquiries = 0
+        self._load()
+        if watch_orders:
+            OverseasStockOrder.add_order_listener(self._on_order)
+
+    def close(self):
+        """주문 콜백 해제"""
+        OverseasStockOrder.remove_order_listener(self._on_order)
+
+    def _load(self):
+        """재시작 시 DB 에서 열린 주문/보유 상태 복원"""
+        rows = database.fetchall(
+            f"SELECT {', '.join(ORDER_COLUMNS)} FROM orders WHERE account = ? AND status IN (?, ?) ORDER BY id",
+            (self.account, *OPEN_STATUSES),
+        )
+        self.open_orders = {(row[2], row[3]): TrackedOrder.from_row(row) for row in rows}
+        rows = database.fetchall(
+            "SELECT ovrs_excg_cd, symbol, qty, avg_price FROM position_state WHERE account = ?", (self.account,),
+        )
+        self.positions = {(excg, symbol): (qty, to_decimal(avg_price)) for excg, symbol, qty, avg_price in rows}
+        self.seeded = bool(rows)
+
+    # ------------------------------------------------------------------ 주문 기록
+
+    def _on_order(self, account, side, body, result):
+        if account == self.account:
+            self.record(side, body, result)
+
+    def record(self, side, body, result):
+        """
+        전송한 주문 1건 기록 -> TrackedOrder
+
+        Args:
+            side (str): 'buy' / 'sell'
+            body (dict): 주문 요청 본문 (PDNO, OVRS_EXCG_CD, ORD_QTY, OVRS_ORD_UNPR, ORD_DVSN)
+            result (dict | OrderResult): 주문 응답
+        """
+        if not isinstance(result, OrderResult):
+            result = OrderResult.from_response(result)
+        status = SUBMITTED if result.ok and result.odno else REJECTED
+        order = TrackedOrder(
+            None, self.account, exchange_date(body["OVRS_EXCG_CD"]), result.odno or None, side,
+            body["OVRS_EXCG_CD"], body["PDNO"], int(body["ORD_QTY"]), to_decimal(body["OVRS_ORD_UNPR"]),
+            body.get("ORD_DVSN", "00"), status, 0, ZERO,
+        )
+        with database.transaction() as conn:
+            order.id = conn.execute(
+                "INSERT INTO orders (account, ord_dt, odno, side, ovrs_excg_cd, symbol, qty, price, ord_dvsn, status, msg) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (order.account, order.ord_dt, order.odno, side, order.ovrs_excg_cd, order.symbol, order.qty,
+                 str(order.price), order.ord_dvsn, status, result.msg1),
+            ).lastrowid
+        if status == SUBMITTED:
+            with self._lock:
+                self.open_orders[order.order_key] = order
+        return order
+
+    # ------------------------------------------------------------------ 보유 상태
+
+    def get_position(self, ovrs_excg_cd, symbol):
+        """체결 반영 보유수량/평균단가 -> (qty, avg_price Decimal)"""
+        return self.positions.get((ovrs_excg_cd, symbol), (0, ZERO))
+
+    def seed_positions(self, snapshot):
+        """
+        잔고 스냅샷으로 보유 상태 초기화 (이후에는 체결 delta 로만 갱신)
+
+        Args:
+            snapshot (HoldingsSnapshot): 체결기준현재잔고 스냅샷
+        """
+        positions = {key: (position.qty, position.avg_price) for key, position in snapshot.positions.items() if position.qty}
+        with self._lock, database.transaction() as conn:
+            conn.execute("DELETE FROM position_state WHERE account = ?", (self.account,))
+            conn.executemany(
+                "INSERT INTO position_state (account, ovrs_excg_cd, symbol, qty, avg_price) VALUES (?, ?, ?, ?, ?)",
+                [(self.account, excg, symbol, qty, str(avg)) for (excg, symbol), (qty, avg) in positions.items()],
+            )
+            self.positions = positions
+            self.seeded = True
+
+    def _apply_fill(self, order, qty, price):
+        """체결 delta 1건을 보유수량/평균단가에 반영 -> 새 (qty, avg_price)"""
+        held, avg = self.positions.get(order.key, (0, ZERO))
+        if order.side == "buy":
+            total = held + qty
+            avg = ((held * avg + qty * price) / total).quantize(PRICE_EXP)
+            held = total
+        else:
+            held = max(held - qty, 0)
+            if held == 0:
+                avg = ZERO
+        if held:
+            self.positions[order.key] = (held, avg)
+        else:
+            self.positions.pop(order.key, None)
+        return held, avg
+
+    # ------------------------------------------------------------------ 대사
+
+    def _inquiry_range(self):
+        """열린 주문을 모두 포함하는 조회 기간 (주문일자는 거래소 현지 날짜, 끝은 그보다 늦지 않은 한국 날짜)"""
+        first = min(order.ord_dt for order in self.open_orders.values())
+        start = datetime.strptime(first, "%Y%m%d") - timedelta(days=1)
+        return start.strftime("%Y%m%d"), datetime.now(SEOUL).strftime("%Y%m%d")
+
+    def _status_of(self, order, execution, cancelled, expire_at):
+        if execution is not None and execution.rejected:
+            return REJECTED
+        if order.filled_qty >= order.qty:
+            return FILLED
+        if cancelled:
+            return CANCELLED
+        if order.ord_dt < exchange_date(order.ovrs_excg_cd, expire_at):
+            return EXPIRED
+        return PARTIAL if order.filled_qty else SUBMITTED
+
+    def _apply(self, executions):
+        """
+        주문체결내역을 열린 주문에 맞춤 -> 상태/체결수량이 바뀐 TrackedOrder 목록
+
+        체결수량은 누적값이라 직전 대사 값과의 차이만 보유 상태에 더하고,
+        delta 의 체결단가는 (새 누적금액 - 이전 누적금액) / delta 로 구합니다.
+        """
+        by_key = {(execution.ord_dt, execution.odno): execution for execution in executions}
+        cancelled = {
+            (execution.ord_dt, execution.orgn_odno) for execution in executions
+            if execution.rvse_cncl_dvsn == "02" and execution.orgn_odno and not execution.rejected
+        }
+        # 이 시각 기준 거래소 현지 날짜보다 이전에 낸 주문이 아직 열려 있으면 만료
+        expire_at = datetime.now(SEOUL) - timedelta(days=self.EXPIRE_DAYS)
+        updates = []
+        fills = []
+        touched = {}
+        with self._lock:
+            for key, order in list(self.open_orders.items()):
+                execution = by_key.get(key)
+                before = (order.status, order.filled_qty)
+                if execution is not None and execution.ccld_qty > order.filled_qty:
+                    delta = execution.ccld_qty - order.filled_qty
+                    price = (execution.ccld_qty * execution.ccld_price - order.filled_qty * order.avg_fill_price) / delta
+                    touched[order.key] = self._apply_fill(order, delta, price)
+                    fills.append((order, delta, price))
+                    order.filled_qty = execution.ccld_qty
+                    order.avg_fill_price = execution.ccld_price
+                order.status = self._status_of(order, execution, key in cancelled, expire_at)
+                if (order.status, order.filled_qty) != before:
+                    updates.append(order)
+                if order.status not in OPEN_STATUSES:
+                    del self.open_orders[key]
+        if not updates:
+            return updates
+
+        now = datetime.now().isoformat(sep=" ", timespec="seconds")
+        with database.transaction() as conn:
+            conn.executemany(
+                "UPDATE orders SET status = ?, filled_qty = ?, avg_fill_price = ?, updated_at = ? WHERE id = ?",
+                [(order.status, order.filled_qty, str(order.avg_fill_price), now, order.id) for order in updates],
+            )
+            conn.executemany(
+                "INSERT INTO fills (account, order_id, odno, side, ovrs_excg_cd, symbol, qty, price, filled_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (self.account, order.id, order.odno, order.side, order.ovrs_excg_cd, order.symbol, qty,
+                     str(price.quantize(PRICE_EXP)), now)
+                    for order, qty, price in fills
+                ],
+            )
+            for (excg, symbol), (qty, avg) in touched.items():
+                if qty:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO position_state (account, ovrs_excg_cd, symbol, qty, avg_price, updated_at) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        (self.account, excg, symbol, qty, str(avg), now),
+                    )
+                else:
+                    conn.execute(
+                        "DELETE FROM position_state WHERE account = ? AND ovrs_excg_cd = ? AND symbol = ?",
+                        (self.account, excg, symbol),
+                    )
+        for order in updates:
+            log_print(
+                f"주문 {order.odno} {order.side} {order.symbol} {order.filled_qty}/{order.qty} -> {order.status}",
+                level="debug", account=self.account, odno=order.odno, symbol=order.symbol, side=order.side,
+                status=order.status, filled_qty=order.filled_qty, avg_fill_price=str(order.avg_fill_price),
+            )
+        return updates
+
+    def reconcile(self):
+        """
+        열린 주문 체결 대사 (열린 주문이 없으면 조회하지 않음)
+
+        Returns:
+            list[TrackedOrder]: 상태/체결수량이 바뀐 주문
+        """
+        if not self.open_orders:
+            return []
+        start, end = self._inquiry_range()
+        with STRATEGY_STEP_SECONDS.time("reconcile_orders"):
+            executions = self.history.get_executions(start, end)
+            self.inquiries += 1
+            return self._apply(executions)
+
+
+class AsyncOrderManager(OrderManager):
+    """
+    주문 생애주기 추적 비동기 버전 (history: AsyncOverseasOrderHistory)
+
+    이벤트 루프 안에서 나간 주문의 기록(record)과 대사 결과 저장(_apply)은 SQLite 트랜잭션이므로
+    기본 스레드 풀(run_in_executor)로 넘겨 루프를 막지 않습니다. reconcile() 은 넘겨 둔 기록이 끝난 뒤 조회합니다.
+
+    사용 예시:
+        manager = AsyncOrderManager(AsyncOverseasOrderHistory(appkey, appsecret, None, account, client=client))
+        updates = await manager.reconcile()
+    """
+
+    def __init__(self, history, watch_orders=True):
+        self._pending = set()   # 스레드 풀에서 진행 중인 record Future
+        super().__init__(history, watch_orders)
+
+    def _on_order(self, account, side, body, result):
+        if account != self.account:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.record(side, body, result)
+            return
+        future = loop.run_in_executor(None, self.record, side, body, result)
+        self._pending.add(future)
+        future.add_done_callback(self._recorded)
+
+    def _recorded(self, future):
+        self._pending.discard(future)
+        if not future.cancelled() and future.exception() is not None:
+            log_print(f"[bold red]Error:[/bold red] {self.account} 주문 기록 실패: {future.exception()}")
+
+    async def drain(self):
+        """스레드 풀로 넘긴 주문 기록이 모두 끝날 때까지 대기"""
+        while self._pending:
+            await asyncio.gather(*list(self._pending), return_exceptions=True)
+
+    async def reconcile(self):
+        await self.drain()
+        if not self.open_orders:
+            return []
+        start, end = self._inquiry_range()
+        with STRATEGY_STEP_SECONDS.time("reconcile_orders"):
+            executions = await self.history.get_executions(start, end)
+            self.inquiries += 1
+            return await asyncio.get_running_loop().run_in_executor(None, self._apply, executions)
@@ -0,0 +1,163 @@
+import asyncio
+import heapq
+import itertools
+import os
+import threading
+import time
+
+# 요청 우선순위 (숫자가 작을수록 먼저 나감)
+PRIORITY_ORDER = 0     # 주문/토큰 발급
+PRIORITY_INQUIRY = 1   # 잔고/체결 조회 (CTRP6504R 등)
+
+# KIS 초당 거래건수 초과 응답 코드
+RATE_LIMIT_MSG_CD = "EGW00201"
+
+# 초당 요청 수/버스트 덮어쓰기 환경변수 (목 서버 부하 테스트용, 실서버에서는 설정하지 마세요)
+RATE_ENV = "KIS_RATE_LIMIT"
+BURST_ENV = "KIS_RATE_BURST"
+
+
+class RateLimiter:
+    """
+    KIS 초당 TR 제한을 지키기 위한 토큰 버킷 + 우선순위 대기열
+
+    - 초당 rate 개의 토큰이 채워지고 최대 burst 개까지 쌓입니다.
+      (임의의 1초 구간 요청 수 <= rate + burst 이므로 두 값의 합을 KIS 한도 이하로 설정)
+    - 토큰이 없으면 요청은 대기열에 들어가고, 주문(PRIORITY_ORDER)이 조회보다 먼저 나갑니다.
+      같은 우선순위는 들어온 순서대로 나갑니다.
+    - 스레드(acquire)와 asyncio 태스크(acquire_async)가 같은 버킷/대기열을 공유합니다.
+
+    사용 예시:
+        limiter = get_rate_limiter(appkey)
+        limiter.acquire(PRIORITY_ORDER)
+        print(limiter.stats())
+    """
+    # 실전계좌 기준 초당 20건 제한에 여유를 둔 기본값
+    DEFAULT_RATE = 18
+    DEFAULT_BURST = 2
+
+    def __init__(self, rate=DEFAULT_RATE, burst=DEFAULT_BURST):
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._queue = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+
+        # 통계
+        self._granted = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._last_wait = 0.0
+        self._rejected = 0
+
+    def _refill(self, now):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _try_take(self, entry):
+        """대기열 맨 앞이 entry 이고 토큰이 있으면 가져감 -> 0, 아니면 다시 확인할 때까지 대기할 초"""
+        now = time.monotonic()
+        self._refill(now)
+        if self._queue[0] is not entry:
+            return None
+        if self._tokens >= 1:
+            self._tokens -= 1
+            heapq.heappop(self._queue)
+            return 0.0
+        return (1 - self._tokens) / self.rate
+
+    def _record(self, waited):
+        self._granted += 1
+        self._total_wait += waited
+        self._last_wait = waited
+        if waited > self._max_wait:
+            self._max_wait = waited
+
+    def acquire(self, priority=PRIORITY_INQUIRY):
+        """토큰 1개 획득 (필요하면 블로킹 대기) -> 대기한 초"""
+        started = time.monotonic()
+        with self._cond:
+            entry = [priority, next(self._seq)]
+            heapq.heappush(self._queue, entry)
+            while True:
+                delay = self._try_take(entry)
+                if delay == 0.0:
+                    waited = time.monotonic() - started
+                    self._record(waited)
+                    self._cond.notify_all()
+                    return waited
+                self._cond.wait(timeout=delay)
+
+    async def acquire_async(self, priority=PRIORITY_INQUIRY):
+        """토큰 1개 획득 (asyncio 버전, 이벤트 루프를 막지 않음) -> 대기한 초"""
+        started = time.monotonic()
+        with self._cond:
+            entry = [priority, next(self._seq)]
+            heapq.heappush(self._queue, entry)
+        try:
+            while True:
+                with self._cond:
+                    delay = self._try_take(entry)
+                    if delay == 0.0:
+                        waited = time.monotonic() - started
+                        self._record(waited)
+                        self._cond.notify_all()
+                        return waited
+                # 앞 순서 요청이 있으면 토큰 1개 주기만큼 쉬고 다시 확인
+                await asyncio.sleep(delay if delay is not None else 1 / self.rate)
+        except asyncio.CancelledError:
+            with self._cond:
+                if entry in self._queue:
+                    self._queue.remove(entry)
+                    heapq.heapify(self._queue)
+                    self._cond.notify_all()
+            raise
+
+    def report_rejected(self):
+        """KIS 가 초당 거래건수 초과(EGW00201)로 거절한 요청 기록 + 버킷 비우기"""
+        with self._cond:
+            self._rejected += 1
+            self._tokens = 0.0
+            self._updated = time.monotonic()
+
+    def stats(self):
+        """대기열 깊이와 대기 시간 통계 (dict)"""
+        with self._cond:
+            by_priority = {}
+            for priority, _ in self._queue:
+                by_priority[priority] = by_priority.get(priority, 0) + 1
+            return {
+                "rate": self.rate,
+                "burst": self.burst,
+                "queue_depth": len(self._queue),
+                "queue_depth_by_priority": by_priority,
+                "granted": self._granted,
+                "rejected": self._rejected,
+                "avg_wait_ms": (self._total_wait / self._granted * 1000) if self._granted else 0.0,
+                "max_wait_ms": self._max_wait * 1000,
+                "last_wait_ms": self._last_wait * 1000,
+            }
+
+
+# 앱키별 RateLimiter (KIS 제한은 앱키 단위)
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(appkey):
+    """앱키별 공용 RateLimiter 반환 (최초 호출 시 생성, KIS_RATE_LIMIT/KIS_RATE_BURST 가 있으면 그 값 사용)"""
+    with _limiters_lock:
+        limiter = _limiters.get(appkey)
+        if limiter is None:
+            limiter = _limiters[appkey] = RateLimiter(
+                rate=float(os.getenv(RATE_ENV) or RateLimiter.DEFAULT_RATE),
+                burst=float(os.getenv(BURST_ENV) or RateLimiter.DEFAULT_BURST),
+            )
+        return limiter
+
+
+def is_rate_limited(data):
+    """응답 JSON 이 초당 거래건수 초과 오류인지 확인"""
+    return isinstance(data, dict) and data.get("msg_cd") == RATE_LIMIT_MSG_CD
@@ -0,0 +1,258 @@
+import asyncio
+import inspect
+import json
+import os
+import time
+import aiohttp
+from utils.kis_tr.async_kis_client import AsyncKisClient
+from utils.kis_tr.해외주식_현재체결가 import OverseasPrice
+from utils.log_print import log_print
+
+
+class OverseasRealtimeQuote:
+    """
+    해외주식 실시간지연체결가 웹소켓 구독 (HDFSCNT0)
+
+    - 웹소켓 1개로 여러 종목을 구독합니다. (KIS 세션당 최대 MAX_SUBSCRIPTIONS 개)
+    - 연결이 끊기면 RECONNECT_DELAY 부터 2배씩 늘려 가며 재접속하고, 구독 중인 종목을 다시 등록합니다.
+    - 수신 루프는 종목별 최신 시세만 덮어쓰고 바로 다음 메시지를 읽습니다. 리스너는 별도 태스크에서
+      종목별 최신 시세로 호출되므로, 리스너가 느려도 대기열이 쌓이지 않고 중간 시세만 건너뜁니다. (conflated)
+    - PINGPONG 메시지는 그대로 돌려보냅니다.
+
+    사용 예시:
+        feed = OverseasRealtimeQuote(appkey, appsecret)
+        feed.add_listener(on_quote)           # on_quote(quote) - 일반 함수/코루틴 모두 가능
+        await feed.subscribe("AMEX", "SOXL")
+        await feed.run()                      # stop() 호출까지 실행
+    """
+    WS_URL = "ws://ops.koreainvestment.com:21000"
+    # 설정하면 WS_URL 대신 이 서버로 접속 (예: 목 서버 ws://127.0.0.1:8090)
+    WS_URL_ENV = "KIS_WS_URL"
+    WS_PATH = "/tryitout/HDFSCNT0"
+    TR_ID = "HDFSCNT0"
+
+    MAX_SUBSCRIPTIONS = 41
+    RECONNECT_DELAY = 1.0
+    RECONNECT_MAX_DELAY = 30.0
+
+    # 실시간지연체결가 응답 필드 순서 ('^' 구분)
+    FIELDS = (
+        "RSYM", "SYMB", "ZDIV", "TYMD", "XYMD", "XHMS", "KYMD", "KHMS",
+        "OPEN", "HIGH", "LOW", "LAST", "SIGN", "DIFF", "RATE", "PBID",
+        "PASK", "VBID", "VASK", "EVOL", "TVOL", "TAMT", "BIVL", "ASVL",
+        "STRN", "MTYP",
+    )
+    _I_RSYM = FIELDS.index("RSYM")
+    _I_HIGH = FIELDS.index("HIGH")
+    _I_LOW = FIELDS.index("LOW")
+    _I_LAST = FIELDS.index("LAST")
+    _I_TVOL = FIELDS.index("TVOL")
+    _I_XHMS = FIELDS.index("XHMS")
+
+    def __init__(self, appkey, appsecret, client=None, ws_url=None, custtype="P"):
+        self.client = client or AsyncKisClient(appkey, appsecret)
+        self.ws_url = (ws_url or os.getenv(self.WS_URL_ENV) or self.WS_URL).rstrip("/")
+        self.custtype = custtype
+        self.approval_key = None
+        self.listeners = []
+
+        self._subscriptions = {}    # tr_key -> (ovrs_excg_cd, symbol)
+        self._latest = {}           # (ovrs_excg_cd, symbol) -> quote dict
+        self._pending = {}          # 리스너에 아직 전달하지 않은 종목 (삽입 순서 유지)
+        self._wakeup = None
+        self._ws = None
+        self._stopped = False
+        self.connected = False
+        self.stats = {"messages": 0, "quotes": 0, "dispatched": 0, "conflated": 0, "reconnects": 0, "errors": 0}
+
+    @staticmethod
+    def tr_key(ovrs_excg_cd, symbol):
+        """구독키 (지연시세 'D' + 시세용 거래소코드 + 종목코드, 예: DAMSSOXL)"""
+        return "D" + OverseasPrice.EXCD_MAP.get(ovrs_excg_cd, ovrs_excg_cd) + symbol
+
+    def add_listener(self, callback):
+        """시세 콜백 등록 (callback(quote), 코루틴 함수 가능)"""
+        self.listeners.append(callback)
+
+    def latest(self, ovrs_excg_cd, symbol):
+        """종목 최신 시세 dict (아직 없으면 None)"""
+        return self._latest.get((ovrs_excg_cd, symbol))
+
+    def _make_request(self, tr_type, tr_key):
+        return json.dumps({
+            "header": {
+                "approval_key": self.approval_key,
+                "custtype": self.custtype,
+                "tr_type": tr_type,
+                "content-type": "utf-8",
+            },
+            "body": {"input": {"tr_id": self.TR_ID, "tr_key": tr_key}},
+        })
+
+    async def subscribe(self, ovrs_excg_cd, symbol):
+        """종목 구독 (연결 중이면 바로 등록, 아니면 접속 시 등록)"""
+        tr_key = self.tr_key(ovrs_excg_cd, symbol)
+        if tr_key in self._subscriptions:
+            return
+        if len(self._subscriptions) >= self.MAX_SUBSCRIPTIONS:
+            raise ValueError(f"웹소켓 1개당 최대 {self.MAX_SUBSCRIPTIONS}종목까지 구독할 수 있습니다.")
+        self._subscriptions[tr_key] = (ovrs_excg_cd, symbol)
+        if self._ws is not None and not self._ws.closed:
+            await self._ws.send_str(self._make_request("1", tr_key))
+
+    async def unsubscribe(self, ovrs_excg_cd, symbol):
+        """종목 구독 해제"""
+        tr_key = self.tr_key(ovrs_excg_cd, symbol)
+        if self._subscriptions.pop(tr_key, None) is None:
+            return
+        if self._ws is not None and not self._ws.closed:
+            await self._ws.send_str(self._make_request("2", tr_key))
+
+    def stop(self):
+        """run() 종료 요청"""
+        self._stopped = True
+        if self._wakeup is not None:
+            self._wakeup.set()
+        if self._ws is not None and not self._ws.closed:
+            asyncio.ensure_future(self._ws.close())
+
+    async def run(self):
+        """연결 유지 루프 (끊기면 재접속 + 재구독, stop() 까지)"""
+        self._stopped = False
+        self._wakeup = asyncio.Event()
+        dispatcher = asyncio.ensure_future(self._dispatch())
+        delay = self.RECONNECT_DELAY
+        try:
+            while not self._stopped:
+                try:
+                    if self.approval_key is None:
+                        self.approval_key = await self.client.issue_approval_key()
+                    session = await self.client._get_aio_session()
+                    async with session.ws_connect(self.ws_url + self.WS_PATH, autoping=True) as ws:
+                        self._ws = ws
+                        if self._stopped:
+                            # 접속 중에 stop() 이 호출됨 (그때는 닫을 소켓이 없었음)
+                            break
+                        self.connected = True
+                        delay = self.RECONNECT_DELAY
+                        for tr_key in list(self._subscriptions):
+                            await ws.send_str(self._make_request("1", tr_key))
+                        async for message in ws:
+                            if message.type == aiohttp.WSMsgType.TEXT:
+                                await self._on_message(ws, message.data)
+                            elif message.type in (aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR):
+                                break
+                except (aiohttp.ClientError, asyncio.TimeoutError, OSError, RuntimeError) as e:
+                    self.stats["errors"] += 1
+                    log_print(f"[bold yellow]Warning:[/bold yellow] 실시간 시세 연결 오류: {e}")
+                finally:
+                    self._ws = None
+                    self.connected = False
+                if self._stopped:
+                    break
+                self.stats["reconnects"] += 1
+                log_print(f"[bold yellow]실시간 시세 재접속 대기 {delay:.1f}초[/bold yellow]")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.RECONNECT_MAX_DELAY)
+        finally:
+            self._stopped = True
+            self._wakeup.set()
+            await dispatcher
+
+    async def _on_message(self, ws, data):
+        """수신 메시지 처리: 시세('0|...')는 최신값 갱신, JSON 은 PINGPONG/구독 응답"""
+        self.stats["messages"] += 1
+        if not data:
+            return
+        if data[0] in "01":
+            self._on_quotes(data)
+            return
+        try:
+            message = json.loads(data)
+        except ValueError:
+            return
+        header = message.get("header", {})
+        if header.get("tr_id") == "PINGPONG":
+            await ws.send_str(data)
+            return
+        body = message.get("body", {})
+        if body.get("rt_cd") not in (None, "0"):
+            log_print(f"[bold red]Error:[/bold red] 실시간 구독 실패 {header.get('tr_key', '')}: {body.get('msg1', '')}")
+
+    def _on_quotes(self, data):
+        """'암호화여부|TR_ID|건수|필드^필드^...' -> 종목별 최신 시세 갱신 (건수만큼 레코드가 이어짐)"""
+        parts = data.split("|", 3)
+        if len(parts) < 4 or parts[1] != self.TR_ID:
+            return
+        if parts[0] == "1":
+            # HDFSCNT0 는 평문으로만 오므로 암호화 메시지는 무시
+            return
+        try:
+            count = int(parts[2])
+        except ValueError:
+            self._bad_frame(f"건수 {parts[2]!r}")
+            return
+        values = parts[3].split("^")
+        width = len(self.FIELDS)
+        received_at = time.monotonic()
+        for offset in range(0, count * width, width):
+            record = values[offset: offset + width]
+            if len(record) < width:
+                self._bad_frame(f"레코드 {offset // width + 1}/{count} 잘림")
+                break
+            key = self._subscriptions.get(record[self._I_RSYM])
+            if key is None:
+                continue
+            try:
+                quote = {
+                    "ovrs_excg_cd": key[0],
+                    "symbol": key[1],
+                    "price": float(record[self._I_LAST]),
+                    "high": float(record[self._I_HIGH]),
+                    "low": float(record[self._I_LOW]),
+                    "volume": float(record[self._I_TVOL] or 0),
+                    "time": record[self._I_XHMS],
+                    "received_at": received_at,
+                }
+            except ValueError:
+                self._bad_frame(f"{key[1]} 가격 {record[self._I_LAST]!r}")
+                continue
+            self._latest[key] = quote
+            self.stats["quotes"] += 1
+            if key in self._pending:
+                self.stats["conflated"] += 1
+            else:
+                self._pending[key] = True
+        if self._pending:
+            self._wakeup.set()
+
+    def _bad_frame(self, reason):
+        """형식이 깨진 시세 레코드는 건너뛰고 기록만 함 (연결은 유지)"""
+        self.stats["errors"] += 1
+        log_print(f"[bold yellow]Warning:[/bold yellow] 실시간 시세 형식 오류로 건너뜀: {reason}", level="warning")
+
+    async def _dispatch(self):
+        """리스너 호출 태스크 (종목별 최신 시세만 전달)"""
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            if self._stopped and not self._pending:
+                return
+            pending, self._pending = self._pending, {}
+            for key in pending:
+                quote = self._latest[key]
+                self.stats["dispatched"] += 1
+                for callback in list(self.listeners):
+                    try:
+                        result = callback(quote)
+                        if inspect.isawaitable(result):
+                            await result
+                    except Exception as e:
+                        log_print(f"[bold red]Error:[/bold red] 실시간 시세 처리 실패 {key}: {e}")
+            if self._stopped:
+                return
+
+    async def close(self):
+        """구독 종료 + 세션 정리"""
+        self.stop()
+        await self.client.close()
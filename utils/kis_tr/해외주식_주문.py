@@ -1,4 +1,8 @@
-import requests
+import asyncio
+import time
+from utils.kis_tr.kis_client import KisClient
+from utils.kis_tr.models import OrderResult
+from utils.log_print import log_print
 
 class OverseasStockOrder:
     """
@@ -6,7 +10,7 @@ class OverseasStockOrder:
 
     사용 예시:
     >>> order = OverseasStockOrder(
-    ...     appkey='...', appsecret='...', access_token='Bearer ...',
+    ...     appkey='...', appsecret='...', access_token='...',
     ...     account_no='12345678', account_product_code='01'
     ... )
     >>> # 미국 나스닥, AAPL 1주, 180달러 지정가 매수
@@ -23,7 +27,8 @@ class OverseasStockOrder:
     파라미터 설명:
     - appkey: OpenAPI 앱키
     - appsecret: OpenAPI 앱시크릿
-    - access_token: 'Bearer ...' 형식의 접근 토큰
+    - access_token: 접근 토큰 ('Bearer ' 제외)
+    - client: 공용 KisClient (생략 시 appkey/appsecret/access_token 으로 생성, 커넥션 풀은 프로세스 공용)
     - account_no: 계좌 앞 8자리
     - account_product_code: 계좌 뒤 2자리
     - exchange: 'US'(미국), 'JP'(일본), 'HK'(홍콩) 등 (TR_ID 자동 결정)
@@ -33,7 +38,6 @@ class OverseasStockOrder:
     - price: 주문단가(지정가)
     - ord_type: 주문구분(00: 지정가, 31/32/33/34 등은 API 문서 참고)
     """
-    BASE_URL = "https://openapi.koreainvestment.com:9443"
     ORDER_PATH = "/uapi/overseas-stock/v1/trading/order"
 
     # 거래소별 TR_ID 매핑 (실전)
@@ -44,35 +48,19 @@ class OverseasStockOrder:
         # 필요시 추가
     }
 
-    def __init__(self, appkey, appsecret, access_token, account_no, account_product_code):
+    # 주문 전송 후 호출할 콜백 목록 (callback(account, side, body, result)) - 잔고 캐시 무효화 등
+    order_listeners = []
+
+    def __init__(self, appkey, appsecret, access_token, account_no, account_product_code, client=None):
         self.appkey = appkey
         self.appsecret = appsecret
         self.account_no = account_no
         self.account_product_code = account_product_code
-        self.access_token = access_token
-
-    def _make_headers(self, tr_id):
-        return {
-            "Content-Type": "application/json",
-            "authorization": 'Bearer ' + self.access_token,  # self.access_token은 'Bearer ...' 형태로 전달
-            "appKey": self.appkey,
-            "appSecret": self.appsecret,
-            "tr_id": tr_id,
-            "custtype": "P",
-        }
+        self.client = client or KisClient(appkey, appsecret, access_token)
 
 
-    def _order(self, side, exchange, ovrs_excg_cd, symbol, qty, price, ord_type="00"):
-        """
-        내부 주문 실행 함수 (직접 호출하지 마세요)
-        side: 'buy' or 'sell'
-        exchange: 'US', 'JP', 'HK' 등 (TR_ID 자동 결정)
-        ovrs_excg_cd: 해외거래소코드 (예: 'NASD', 'NYSE', 'SEHK', 'TKSE' 등)
-        symbol: 종목코드 (12자리)
-        qty: 주문수량 (정수)
-        price: 주문단가 (float, 지정가)
-        ord_type: 주문구분 (00: 지정가, 31/32/33/34 등은 API 문서 참고)
-        """
+    def _make_order(self, side, exchange, ovrs_excg_cd, symbol, qty, price, ord_type="00"):
+        """주문 TR_ID 와 요청 본문 생성 -> (tr_id, body)"""
         tr_info = self.TR_ID_MAP[exchange]
         tr_id = tr_info[side]
         body = {
@@ -85,10 +73,56 @@ class OverseasStockOrder:
             "ORD_SVR_DVSN_CD": "0",
             "ORD_DVSN": ord_type,
         }
-        headers = self._make_headers(tr_id)
-        url = self.BASE_URL + self.ORDER_PATH
-        response = requests.post(url, headers=headers, json=body)
-        return response.json()
+        return tr_id, body
+
+    @classmethod
+    def add_order_listener(cls, callback):
+        """주문 전송 후 callback(account, side, body, result) 호출 등록"""
+        cls.order_listeners.append(callback)
+
+    @classmethod
+    def remove_order_listener(cls, callback):
+        if callback in cls.order_listeners:
+            cls.order_listeners.remove(callback)
+
+    def _notify_order(self, side, body, result, tr_id=None, latency_ms=None):
+        account = f"{self.account_no}-{self.account_product_code}"
+        rt_cd = (result or {}).get("rt_cd")
+        # 주문 1건 기록 (정상은 파일에만, 거절은 콘솔에도) - 큐에 넣기만 하므로 주문 경로를 막지 않음
+        log_print(
+            f"주문 {side} {body['PDNO']} {body['ORD_QTY']} @ {body['OVRS_ORD_UNPR']} : {(result or {}).get('msg1', '')}",
+            level="debug" if rt_cd == "0" else "warning",
+            tr_id=tr_id, account=account, symbol=body["PDNO"], ovrs_excg_cd=body["OVRS_EXCG_CD"], side=side,
+            qty=body["ORD_QTY"], price=body["OVRS_ORD_UNPR"], ord_dvsn=body["ORD_DVSN"],
+            rt_cd=rt_cd, msg_cd=(result or {}).get("msg_cd"), latency_ms=latency_ms,
+        )
+        # 주문은 이미 접수됐으므로 콜백 오류가 주문 결과를 가리지 않도록 기록만 하고 넘어감
+        for callback in list(self.order_listeners):
+            try:
+                callback(account, side, body, result)
+            except Exception as e:
+                log_print(
+                    f"[bold red]Error:[/bold red] 주문 콜백 {getattr(callback, '__qualname__', callback)} 실패: {e}",
+                    level="error", account=account, symbol=body["PDNO"], side=side,
+                )
+
+    def _order(self, side, exchange, ovrs_excg_cd, symbol, qty, price, ord_type="00"):
+        """
+        내부 주문 실행 함수 (직접 호출하지 마세요)
+        side: 'buy' or 'sell'
+        exchange: 'US', 'JP', 'HK' 등 (TR_ID 자동 결정)
+        ovrs_excg_cd: 해외거래소코드 (예: 'NASD', 'NYSE', 'SEHK', 'TKSE' 등)
+        symbol: 종목코드 (12자리)
+        qty: 주문수량 (정수)
+        price: 주문단가 (float, 지정가)
+        ord_type: 주문구분 (00: 지정가, 31/32/33/34 등은 API 문서 참고)
+        """
+        tr_id, body = self._make_order(side, exchange, ovrs_excg_cd, symbol, qty, price, ord_type)
+        started = time.perf_counter()
+        response = self.client.post(self.ORDER_PATH, tr_id, body=body)
+        result = response.json()
+        self._notify_order(side, body, result, tr_id, round((time.perf_counter() - started) * 1000, 2))
+        return result
 
     def buy(self, exchange, ovrs_excg_cd, symbol, qty, price, ord_type="00"):
         """
@@ -114,4 +148,73 @@ class OverseasStockOrder:
         :param ord_type: 주문구분(00: 지정가, 31/32/33/34 등)
         :return: 주문 결과(JSON)
         """
-        return self._order("sell", exchange, ovrs_excg_cd, symbol, qty, price, ord_type)
\ No newline at end of file
+        return self._order("sell", exchange, ovrs_excg_cd, symbol, qty, price, ord_type)
+
+
+class AsyncOverseasStockOrder(OverseasStockOrder):
+    """
+    해외주식 주문 API 비동기 버전 (asyncio)
+
+    주문 본문/TR_ID 는 OverseasStockOrder 와 동일하고 전송만 AsyncKisClient 로 합니다.
+    여러 종목/계좌의 장마감 LOC/MOC 주문은 submit_orders() 로 한 번에 동시 전송하세요.
+
+    사용 예시:
+    >>> order = AsyncOverseasStockOrder(appkey, appsecret, access_token, '12345678', '01')
+    >>> result = await order.buy(exchange='US', ovrs_excg_cd='AMEX', symbol='SOXL', qty=1, price=30.0, ord_type='34')
+    >>> await order.client.close()
+    """
+
+    def __init__(self, appkey, appsecret, access_token, account_no, account_product_code, client=None):
+        if client is None:
+            from utils.kis_tr.async_kis_client import AsyncKisClient
+            client = AsyncKisClient(appkey, appsecret, access_token)
+        super().__init__(appkey, appsecret, access_token, account_no, account_product_code, client)
+
+    async def _order(self, side, exchange, ovrs_excg_cd, symbol, qty, price, ord_type="00"):
+        """내부 주문 실행 함수 (비동기, 주문 결과 JSON 반환)"""
+        tr_id, body = self._make_order(side, exchange, ovrs_excg_cd, symbol, qty, price, ord_type)
+        started = time.perf_counter()
+        _, data = await self.client.post(self.ORDER_PATH, tr_id, body=body)
+        self._notify_order(side, body, data, tr_id, round((time.perf_counter() - started) * 1000, 2))
+        return data
+
+    async def buy(self, exchange, ovrs_excg_cd, symbol, qty, price, ord_type="00"):
+        """해외주식 매수 주문 (비동기) - 파라미터는 OverseasStockOrder.buy 와 동일"""
+        return await self._order("buy", exchange, ovrs_excg_cd, symbol, qty, price, ord_type)
+
+    async def sell(self, exchange, ovrs_excg_cd, symbol, qty, price, ord_type="00"):
+        """해외주식 매도 주문 (비동기) - 파라미터는 OverseasStockOrder.sell 과 동일"""
+        return await self._order("sell", exchange, ovrs_excg_cd, symbol, qty, price, ord_type)
+
+
+async def submit_orders(orders):
+    """
+    여러 주문을 동시에 전송하고 모두 끝날 때까지 기다림
+
+    Args:
+        orders (list[tuple]): (AsyncOverseasStockOrder, 주문 dict) 목록
+            주문 dict 키: side('buy'/'sell'), exchange, ovrs_excg_cd, symbol, qty, price, ord_type(생략 시 '00')
+
+    Returns:
+        list[dict]: 입력 순서대로 주문 dict + account, result(OrderResult 또는 None), error(예외 메시지 또는 None)
+            KIS 가 거절한 주문은 result.ok 가 False 입니다. (rt_cd != "0")
+    """
+    async def _submit(order, spec):
+        kwargs = {key: value for key, value in spec.items() if key != "side"}
+        if spec["side"] == "buy":
+            return await order.buy(**kwargs)
+        return await order.sell(**kwargs)
+
+    results = await asyncio.gather(
+        *(_submit(order, spec) for order, spec in orders),
+        return_exceptions=True,
+    )
+    collected = []
+    for (order, spec), result in zip(orders, results):
+        row = dict(spec, account=f"{order.account_no}-{order.account_product_code}")
+        if isinstance(result, Exception):
+            row.update(result=None, error=str(result) or type(result).__name__)
+        else:
+            row.update(result=OrderResult.from_response(result), error=None)
+        collected.append(row)
+    return collected
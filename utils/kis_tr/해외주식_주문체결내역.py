@@ -0,0 +1,121 @@
+from utils.kis_tr.kis_client import KisClient
+from utils.kis_tr.models import Execution
+from utils.log_print import log_print
+
+
+class OverseasOrderHistory:
+    """
+    해외주식 주문체결내역 조회 (v1_해외주식-007, TTTS3035R)
+
+    기간 안의 모든 주문(체결/미체결/거부/정정·취소)을 연속조회로 끝까지 받아 Execution 목록으로 돌려줍니다.
+    주문마다 상태를 따로 묻지 않고 이 조회 1번(페이지 수만큼 요청)으로 여러 주문의 체결을 한꺼번에 맞춥니다.
+
+    사용 예시:
+        history = OverseasOrderHistory(appkey, appsecret, None, "12345678-01")
+        executions = history.get_executions("20250101", "20250102")
+    """
+    API_PATH = "/uapi/overseas-stock/v1/trading/inquire-ccnl"
+    TR_ID = "TTTS3035R"  # 실전투자 TR ID
+    # 연속조회 최대 페이지 수 (무한 루프 방지)
+    MAX_PAGES = 100
+
+    def __init__(self, appkey, appsecret, access_token, account, client=None):
+        self.appkey = appkey
+        self.appsecret = appsecret
+        self.account = account
+        self.client = client or KisClient(appkey, appsecret, access_token)
+
+    def _make_params(self, start_date, end_date):
+        if len(self.account) != 11:
+            raise ValueError("계좌번호 형식이 올바르지 않습니다. (하이픈 포함 11자리)")
+        return {
+            "CANO": self.account[:8],
+            "ACNT_PRDT_CD": self.account[-2:],
+            "PDNO": "",                 # 전종목
+            "ORD_STRT_DT": start_date,  # YYYYMMDD (현지시각 기준)
+            "ORD_END_DT": end_date,
+            "SLL_BUY_DVSN": "00",       # 00 전체, 01 매도, 02 매수
+            "CCLD_NCCS_DVSN": "00",     # 00 전체, 01 체결, 02 미체결
+            "OVRS_EXCG_CD": "",         # 전체
+            "SORT_SQN": "DS",           # 정순
+            "ORD_DT": "",
+            "ORD_GNO_BRNO": "",
+            "ODNO": "",
+            "CTX_AREA_NK200": "",
+            "CTX_AREA_FK200": "",
+        }
+
+    @staticmethod
+    def _next_params(params, data):
+        return dict(
+            params,
+            CTX_AREA_FK200=data.get("ctx_area_fk200", ""),
+            CTX_AREA_NK200=data.get("ctx_area_nk200", ""),
+        )
+
+    @staticmethod
+    def _has_next(tr_cont):
+        return tr_cont in ("F", "M")
+
+    def _page_limit_error(self):
+        """MAX_PAGES 페이지를 받고도 다음 페이지가 남음 -> 결과가 잘리므로 기록 후 RuntimeError 반환"""
+        message = f"주문체결내역 연속조회가 {self.MAX_PAGES}페이지를 넘어 결과가 잘립니다."
+        log_print(f"[bold red]Error:[/bold red] {message}", level="error", tr_id=self.TR_ID, max_pages=self.MAX_PAGES)
+        return RuntimeError(message)
+
+    def iter_pages(self, start_date, end_date):
+        """연속조회를 따라가며 페이지 응답(dict)을 하나씩 반환 (API 오류는 RuntimeError)"""
+        params = self._make_params(start_date, end_date)
+        tr_cont = ""
+        for _ in range(self.MAX_PAGES):
+            response = self.client.get(self.API_PATH, self.TR_ID, params=params, tr_cont=tr_cont)
+            if not response.ok:
+                raise RuntimeError(f"API 호출 실패: {response.status_code} {response.text}")
+            data = response.json()
+            if data.get("rt_cd") != "0":
+                raise RuntimeError(data.get("msg1", "알 수 없는 오류"))
+            yield data
+            if not self._has_next(response.headers.get("tr_cont") or data.get("tr_cont", "")):
+                return
+            params = self._next_params(params, data)
+            tr_cont = "N"
+        # 마지막 페이지면 위에서 return -> 여기까지 오면 다음 페이지가 남은 채로 한도에 닿은 것
+        raise self._page_limit_error()
+
+    def get_executions(self, start_date, end_date):
+        """기간(YYYYMMDD, 양끝 포함) 주문체결내역 -> Execution 목록"""
+        return [Execution.from_item(item) for page in self.iter_pages(start_date, end_date) for item in page.get("output", [])]
+
+
+class AsyncOverseasOrderHistory(OverseasOrderHistory):
+    """
+    해외주식 주문체결내역 조회 비동기 버전 (asyncio)
+
+    사용 예시:
+        history = AsyncOverseasOrderHistory(appkey, appsecret, None, "12345678-01")
+        executions = await history.get_executions("20250101", "20250102")
+    """
+
+    def __init__(self, appkey, appsecret, access_token, account, client=None):
+        if client is None:
+            from utils.kis_tr.async_kis_client import AsyncKisClient
+            client = AsyncKisClient(appkey, appsecret, access_token)
+        super().__init__(appkey, appsecret, access_token, account, client)
+
+    async def iter_pages(self, start_date, end_date):
+        params = self._make_params(start_date, end_date)
+        tr_cont = ""
+        for _ in range(self.MAX_PAGES):
+            status, data, next_cont = await self.client.get_page(self.API_PATH, self.TR_ID, params=params, tr_cont=tr_cont)
+            if status != 200 or not data or data.get("rt_cd") != "0":
+                raise RuntimeError((data or {}).get("msg1", f"API 호출 실패: {status}"))
+            yield data
+            if not self._has_next(next_cont or data.get("tr_cont", "")):
+                return
+            params = self._next_params(params, data)
+            tr_cont = "N"
+        # 마지막 페이지면 위에서 return -> 여기까지 오면 다음 페이지가 남은 채로 한도에 닿은 것
+        raise self._page_limit_error()
+
+    async def get_executions(self, start_date, end_date):
+        return [Execution.from_item(item) async for page in self.iter_pages(start_date, end_date) for item in page.get("output", [])]
@@ -1,15 +1,21 @@
 import os
-import requests
-from utils.globals import KIS_ACCESS_TOKEN
-from utils.log_print import log_print
+from utils.token.token_manager import token_manager
+from utils.kis_tr.kis_client import KisClient
+from utils.kis_tr.models import HoldingsSnapshot, Position
+from utils.log_print import flush_logs, log_print
 from rich.table import Table
 from rich.console import Console
 import json
 
 console = Console()
 
-def get_overseas_holdings():
-    """해외주식 보유종목 조회 (해외주식 체결기준현재잔고[v1_해외주식-008])"""
+def get_overseas_holdings(quiet=False):
+    """
+    해외주식 보유종목 조회 (해외주식 체결기준현재잔고[v1_해외주식-008])
+
+    Args:
+        quiet (bool): True 면 조회 결과 표를 출력하지 않음 (빠른 시작용)
+    """
     try:
         # 환경변수 확인
         app_key = os.getenv("KIS_APP_KEY")
@@ -21,60 +27,33 @@ def get_overseas_holdings():
             return None
         
         # 토큰 확인
-        if not KIS_ACCESS_TOKEN:
+        access_token = token_manager.get_token()
+        if not access_token:
             log_print("[bold red]Error:[/bold red] KIS 토큰이 없습니다.")
             return None
         
-        # 계좌번호 분리 (8-2 형식)
+        # 계좌번호 형식 확인 (8-2 형식)
         if len(account) != 11:
             log_print("[bold red]Error:[/bold red] 계좌번호 형식이 올바르지 않습니다. (하이픈 포함 11자리)")
             return None
         
-        cano = account[:8]  # 종합계좌번호 (앞 8자리)
-        acnt_prdt_cd = account[-2:]  # 계좌상품코드 (뒤 2자리)
-        
-        # API URL - 해외주식 체결기준현재잔고[v1_해외주식-008] (실전투자)
-        url = "https://openapi.koreainvestment.com:9443/uapi/overseas-stock/v1/trading/inquire-present-balance"
-        
-        # 헤더 설정
-        headers = {
-            "Content-Type": "application/json; charset=utf-8",
-            "authorization": f"Bearer {KIS_ACCESS_TOKEN}",
-            "appkey": app_key,
-            "appsecret": app_secret,
-            "tr_id": "CTRP6504R"  # 실전투자 TR ID
-        }
-        
-        # 쿼리 파라미터 - 모든 해외주식 전체 조회
-        params = {
-            "CANO": cano,  # 종합계좌번호
-            "ACNT_PRDT_CD": acnt_prdt_cd,  # 계좌상품코드
-            "WCRC_FRCR_DVSN_CD": "02",  # 외화
-            "NATN_CD": "000",  # 전체 국가
-            "TR_MKET_CD": "00",  # 전체 거래시장
-            "INQR_DVSN_CD": "00"  # 전체
-        }
-        
-        log_print("[bold cyan]🌍 해외주식 체결기준현재잔고 조회 중...[/bold cyan]")
+        # 잔고 조회 래퍼 (공용 클라이언트/토큰 사용)
+        holdings = OverseasHoldings(app_key, app_secret, None, account)
         
-        # API 호출
-        response = requests.get(url, headers=headers, params=params)
-        
-        if not response.ok:
-            log_print(f"[bold red]Error:[/bold red] API 호출 실패: {response.status_code}")
-            log_print(f"[bold red]Response:[/bold red] {response.text}")
-            return None
+        if not quiet:
+            log_print("[bold cyan]🌍 해외주식 체결기준현재잔고 조회 중...[/bold cyan]")
         
-        data = response.json()
-        
-        # 응답 확인
-        if data.get("rt_cd") != "0":
+        # API 호출 - 해외주식 체결기준현재잔고[v1_해외주식-008] (실전투자), 연속조회 끝까지
+        try:
+            data = merge_pages(holdings.iter_pages())
+        except RuntimeError as e:
             log_print(f"[bold red]Error:[/bold red] API 응답 오류")
-            log_print(f"[bold red]메시지:[/bold red] {data.get('msg1', '알 수 없는 오류')}")
+            log_print(f"[bold red]메시지:[/bold red] {e}")
             return None
         
         # 결과 출력
-        print_all_outputs(data)
+        if not quiet:
+            print_all_outputs(data)
         
         return data
         
@@ -82,17 +61,42 @@ def get_overseas_holdings():
         log_print(f"[bold red]Error:[/bold red] 해외주식 체결기준현재잔고 조회 중 오류 발생: {e}")
         return None
 
+def parse_position(item):
+    """output1 보유종목 1건 -> Position (숫자는 한 번만 변환)"""
+    return Position.from_item(item)
+
+def merge_pages(pages):
+    """연속조회 페이지들을 응답 1개로 합침 (output1 이어붙임, output2/output3 은 첫 페이지 기준)"""
+    merged = None
+    for page in pages:
+        if merged is None:
+            merged = dict(page)
+            merged["output1"] = list(page.get("output1", []))
+        else:
+            merged["output1"].extend(page.get("output1", []))
+            for key in ("ctx_area_fk200", "ctx_area_nk200", "tr_cont"):
+                if key in page:
+                    merged[key] = page[key]
+    return merged
+
 def print_all_outputs(data):
-    """모든 output을 콘솔로 출력"""
+    """
+    모든 output을 콘솔로 출력
+
+    Args:
+        data (HoldingsSnapshot | dict): 조회 결과 (dict 이면 여기서 한 번 변환)
+    """
+    snapshot = data if isinstance(data, HoldingsSnapshot) else HoldingsSnapshot.from_response(data)
+    flush_logs()
     console.print()
     console.rule("[bold cyan]📊 해외주식 체결기준현재잔고 조회 결과[/bold cyan]", style="cyan")
     
     # output1 (보유종목 상세)
-    output1 = data.get("output1", [])
-    if output1:
+    positions = list(snapshot.positions.values())
+    if positions:
         console.print()
         console.rule("[bold green]📈 보유종목 상세[/bold green]", style="green")
-        console.print(f"[bold green]보유종목 수: {len(output1)}개[/bold green]")
+        console.print(f"[bold green]보유종목 수: {len(positions)}개[/bold green]")
         
         # 보유종목 테이블 생성
         table = Table(title="[bold green]보유종목 목록[/bold green]", show_header=True, header_style="bold green")
@@ -105,20 +109,20 @@ def print_all_outputs(data):
         table.add_column("수익률", style="red", width=10)
         table.add_column("거래시장", style="blue", width=10)
         
-        for item in output1:
+        for position in positions:
             # 수익률에 따른 색상 결정
-            evlu_pfls_rt = float(item.get("evlu_pfls_rt1", "0"))
+            evlu_pfls_rt = position.evlu_pfls_rt
             profit_color = "green" if evlu_pfls_rt > 0 else "red" if evlu_pfls_rt < 0 else "white"
             
             table.add_row(
-                item.get("pdno", ""),
-                item.get("prdt_name", ""),
-                f"{int(float(item.get('ccld_qty_smtl1', '0'))):,}",
-                f"${float(item.get('avg_unpr3', '0')):,.2f}",
-                f"${float(item.get('ovrs_now_pric1', '0')):,.2f}",
-                f"${float(item.get('evlu_pfls_amt2', '0')):,.2f}",
+                position.pdno,
+                position.prdt_name,
+                f"{position.qty:,}",
+                f"${position.avg_price:,.2f}",
+                f"${position.now_price:,.2f}",
+                f"${position.evlu_pfls_amt:,.2f}",
                 f"{evlu_pfls_rt:.2f}%",
-                item.get("tr_mket_name", "")
+                position.tr_mket_name
             )
         
         console.print(table)
@@ -127,8 +131,7 @@ def print_all_outputs(data):
         console.print("[bold yellow]📭 보유종목이 없습니다.[/bold yellow]")
     
     # output2 (통화별 요약)
-    output2 = data.get("output2", [])
-    if output2:
+    if snapshot.currencies:
         console.print()
         console.rule("[bold blue]💰 통화별 요약[/bold blue]", style="blue")
         
@@ -141,21 +144,21 @@ def print_all_outputs(data):
         table.add_column("평가금액", style="yellow", width=15)
         table.add_column("최초환율", style="blue", width=12)
         
-        for item in output2:
+        for currency in snapshot.currencies:
             table.add_row(
-                item.get("crcy_cd", ""),
-                item.get("crcy_cd_name", ""),
-                f"${float(item.get('frcr_dncl_amt_2', '0')):,.2f}",
-                f"${float(item.get('frcr_drwg_psbl_amt_1', '0')):,.2f}",
-                f"${float(item.get('frcr_evlu_amt2', '0')):,.2f}",
-                f"₩{float(item.get('frst_bltn_exrt', '0')):,.2f}"
+                currency.crcy_cd,
+                currency.crcy_cd_name,
+                f"${currency.dncl_amt:,.2f}",
+                f"${currency.drwg_psbl_amt:,.2f}",
+                f"${currency.evlu_amt:,.2f}",
+                f"₩{currency.frst_bltn_exrt:,.2f}"
             )
         
         console.print(table)
     
     # output3 (전체 요약)
-    output3 = data.get("output3", {})
-    if output3:
+    summary = snapshot.summary
+    if summary is not None:
         console.print()
         console.rule("[bold magenta]📊 전체 계좌 요약[/bold magenta]", style="magenta")
         
@@ -167,64 +170,50 @@ def print_all_outputs(data):
         table.add_column("금액", style="yellow", width=20)
         
         # 첫 번째 행
-        pchs_amt = int(output3.get("pchs_amt_smtl", "0"))
-        evlu_amt = int(output3.get("evlu_amt_smtl", "0"))
-        evlu_pfls = int(output3.get("evlu_pfls_amt_smtl", "0"))
-        tot_asst = int(output3.get("tot_asst_amt", "0"))
-        
         table.add_row(
             "매입금액합계",
-            f"₩{pchs_amt:,}",
+            f"₩{summary.pchs_amt_smtl:,.0f}",
             "평가금액합계",
-            f"₩{evlu_amt:,}"
+            f"₩{summary.evlu_amt_smtl:,.0f}"
         )
         
         # 두 번째 행
-        evlu_erng_rt = float(output3.get("evlu_erng_rt1", "0"))
-        tot_evlu_pfls = float(output3.get("tot_evlu_pfls_amt", "0"))
-        wdrw_psbl = int(output3.get("wdrw_psbl_tot_amt", "0"))
-        frcr_use_psbl = float(output3.get("frcr_use_psbl_amt", "0"))
-        
         table.add_row(
             "평가손익금액합계",
-            f"₩{evlu_pfls:,}",
+            f"₩{summary.evlu_pfls_amt_smtl:,.0f}",
             "평가수익률",
-            f"{evlu_erng_rt:.2f}%"
+            f"{summary.evlu_erng_rt1:.2f}%"
         )
         
         # 세 번째 행
         table.add_row(
             "총자산금액",
-            f"₩{tot_asst:,}",
+            f"₩{summary.tot_asst_amt:,.0f}",
             "인출가능총금액",
-            f"₩{wdrw_psbl:,}"
+            f"₩{summary.wdrw_psbl_tot_amt:,.0f}"
         )
         
         # 네 번째 행
         table.add_row(
             "총평가손익금액",
-            f"₩{tot_evlu_pfls:,.2f}",
+            f"₩{summary.tot_evlu_pfls_amt:,.2f}",
             "외화사용가능금액",
-            f"₩{frcr_use_psbl:,.2f}"
+            f"₩{summary.frcr_use_psbl_amt:,.2f}"
         )
         
         console.print(table)
     
     # 연속조회 정보
-    ctx_area_fk200 = data.get("ctx_area_fk200", "")
-    ctx_area_nk200 = data.get("ctx_area_nk200", "")
-    tr_cont = data.get("tr_cont", "")
-    
-    if ctx_area_fk200 or ctx_area_nk200:
+    if snapshot.ctx_area_fk200 or snapshot.ctx_area_nk200:
         console.print()
         console.rule("[bold magenta]🔄 연속조회 정보[/bold magenta]", style="magenta")
-        console.print(f"[bold magenta]ctx_area_fk200:[/bold magenta] {ctx_area_fk200}")
-        console.print(f"[bold magenta]ctx_area_nk200:[/bold magenta] {ctx_area_nk200}")
-        console.print(f"[bold magenta]tr_cont:[/bold magenta] {tr_cont}")
+        console.print(f"[bold magenta]ctx_area_fk200:[/bold magenta] {snapshot.ctx_area_fk200}")
+        console.print(f"[bold magenta]ctx_area_nk200:[/bold magenta] {snapshot.ctx_area_nk200}")
+        console.print(f"[bold magenta]tr_cont:[/bold magenta] {snapshot.tr_cont}")
 
-def check_overseas_holdings():
+def check_overseas_holdings(quiet=False):
     """해외주식 보유종목 체크 함수 - True/False만 반환"""
-    result = get_overseas_holdings()
+    result = get_overseas_holdings(quiet)
     return result is not None
 
 class OverseasHoldings:
@@ -235,14 +224,16 @@ class OverseasHoldings:
         data = holdings.get_holdings()
         holdings.print_outputs(data)
     """
-    API_URL = "https://openapi.koreainvestment.com:9443/uapi/overseas-stock/v1/trading/inquire-present-balance"
+    API_PATH = "/uapi/overseas-stock/v1/trading/inquire-present-balance"
     TR_ID = "CTRP6504R"  # 실전투자 TR ID
+    # 연속조회 최대 페이지 수 (무한 루프 방지)
+    MAX_PAGES = 100
 
-    def __init__(self, appkey, appsecret, access_token, account):
+    def __init__(self, appkey, appsecret, access_token, account, client=None):
         self.appkey = appkey
         self.appsecret = appsecret
-        self.access_token = access_token
         self.account = account
+        self.client = client or KisClient(appkey, appsecret, access_token)
         self.console = console
 
     def _split_account(self):
@@ -252,15 +243,6 @@ class OverseasHoldings:
         acnt_prdt_cd = self.account[-2:]
         return cano, acnt_prdt_cd
 
-    def _make_headers(self):
-        return {
-            "Content-Type": "application/json; charset=utf-8",
-            "authorization": f"Bearer {self.access_token}",
-            "appkey": self.appkey,
-            "appsecret": self.appsecret,
-            "tr_id": self.TR_ID
-        }
-
     def _make_params(self, cano, acnt_prdt_cd):
         return {
             "CANO": cano,
@@ -271,28 +253,126 @@ class OverseasHoldings:
             "INQR_DVSN_CD": "00"
         }
 
+    @staticmethod
+    def _next_params(params, data):
+        """다음 페이지 요청 파라미터 (응답의 연속조회키 반영)"""
+        return dict(
+            params,
+            CTX_AREA_FK200=data.get("ctx_area_fk200", ""),
+            CTX_AREA_NK200=data.get("ctx_area_nk200", ""),
+        )
+
+    @staticmethod
+    def _has_next(tr_cont):
+        """응답 tr_cont 가 F/M 이면 다음 페이지가 있음 (D/E 는 마지막)"""
+        return tr_cont in ("F", "M")
+
+    def _page_limit_error(self):
+        """MAX_PAGES 페이지를 받고도 다음 페이지가 남음 -> 결과가 잘리므로 기록 후 RuntimeError 반환"""
+        message = f"체결기준현재잔고 연속조회가 {self.MAX_PAGES}페이지를 넘어 결과가 잘립니다."
+        log_print(f"[bold red]Error:[/bold red] {message}", level="error", tr_id=self.TR_ID, max_pages=self.MAX_PAGES)
+        return RuntimeError(message)
+
+    def iter_pages(self):
+        """
+        연속조회(ctx_area_fk200/ctx_area_nk200/tr_cont)를 따라가며 페이지 응답(dict)을 하나씩 반환
+
+        다음 페이지는 앞 페이지를 꺼내 간 뒤에 요청하므로 호출자는 첫 페이지부터 바로 처리할 수 있습니다.
+        API 오류와 MAX_PAGES 초과(뒤 페이지가 잘림)는 RuntimeError 로 올립니다.
+        """
+        cano, acnt_prdt_cd = self._split_account()
+        params = self._make_params(cano, acnt_prdt_cd)
+        tr_cont = ""
+        for _ in range(self.MAX_PAGES):
+            response = self.client.get(self.API_PATH, self.TR_ID, params=params, tr_cont=tr_cont)
+            if not response.ok:
+                raise RuntimeError(f"API 호출 실패: {response.status_code} {response.text}")
+            data = response.json()
+            if data.get("rt_cd") != "0":
+                raise RuntimeError(data.get("msg1", "알 수 없는 오류"))
+            yield data
+            if not self._has_next(response.headers.get("tr_cont") or data.get("tr_cont", "")):
+                return
+            params = self._next_params(params, data)
+            tr_cont = "N"
+        # 마지막 페이지면 위에서 return -> 여기까지 오면 다음 페이지가 남은 채로 한도에 닿은 것
+        raise self._page_limit_error()
+
+    def iter_positions(self):
+        """보유종목을 페이지가 도착하는 대로 하나씩 반환 (Position)"""
+        for page in self.iter_pages():
+            for item in page.get("output1", []):
+                yield parse_position(item)
+
     def get_holdings(self):
-        """해외주식 보유종목 조회 (성공시 dict 반환, 실패시 None)"""
+        """해외주식 보유종목 조회 - 연속조회 전체 페이지 병합 (성공시 dict 반환, 실패시 None)"""
         """외화예수금: frcr_dncl_amt_2
         출금가능금액: frcr_drwg_psbl_amt_1
         평가금액: frcr_evlu_amt2
         최초환율: frst_bltn_exrt
         """
         try:
-            cano, acnt_prdt_cd = self._split_account()
-            headers = self._make_headers()
-            params = self._make_params(cano, acnt_prdt_cd)
             log_print("[bold cyan]🌍 (클래스) 해외주식 체결기준현재잔고 조회 시도[/bold cyan]")
-            response = requests.get(self.API_URL, headers=headers, params=params)
-            if not response.ok:
-                return None
-            data = response.json()
-            if data.get("rt_cd") != "0":
-                return None
-            return data
+            return merge_pages(self.iter_pages())
         except Exception:
             return None
 
+    def get_snapshot(self):
+        """전체 페이지 조회 후 한 번만 변환한 HoldingsSnapshot (실패시 None)"""
+        data = self.get_holdings()
+        return None if data is None else HoldingsSnapshot.from_response(data)
+
     def print_outputs(self, data):
         """조회 결과를 콘솔로 출력 (기존 print_all_outputs 재사용)"""
         print_all_outputs(data)
+
+
+class AsyncOverseasHoldings(OverseasHoldings):
+    """
+    해외주식 체결기준현재잔고 조회 비동기 버전 (asyncio)
+    사용 예시:
+        holdings = AsyncOverseasHoldings(appkey, appsecret, access_token, account)
+        data = await holdings.get_holdings()
+        await holdings.client.close()
+    """
+
+    def __init__(self, appkey, appsecret, access_token, account, client=None):
+        if client is None:
+            from utils.kis_tr.async_kis_client import AsyncKisClient
+            client = AsyncKisClient(appkey, appsecret, access_token)
+        super().__init__(appkey, appsecret, access_token, account, client)
+
+    async def iter_pages(self):
+        """연속조회를 따라가며 페이지 응답(dict)을 하나씩 반환 (비동기 제너레이터, 오류는 RuntimeError)"""
+        cano, acnt_prdt_cd = self._split_account()
+        params = self._make_params(cano, acnt_prdt_cd)
+        tr_cont = ""
+        for _ in range(self.MAX_PAGES):
+            status, data, next_cont = await self.client.get_page(self.API_PATH, self.TR_ID, params=params, tr_cont=tr_cont)
+            if status != 200 or not data or data.get("rt_cd") != "0":
+                raise RuntimeError((data or {}).get("msg1", f"API 호출 실패: {status}"))
+            yield data
+            if not self._has_next(next_cont or data.get("tr_cont", "")):
+                return
+            params = self._next_params(params, data)
+            tr_cont = "N"
+        # 마지막 페이지면 위에서 return -> 여기까지 오면 다음 페이지가 남은 채로 한도에 닿은 것
+        raise self._page_limit_error()
+
+    async def iter_positions(self):
+        """보유종목을 페이지가 도착하는 대로 하나씩 반환 (비동기 제너레이터)"""
+        async for page in self.iter_pages():
+            for item in page.get("output1", []):
+                yield parse_position(item)
+
+    async def get_holdings(self):
+        """해외주식 보유종목 조회 - 연속조회 전체 페이지 병합 (비동기, 성공시 dict 반환, 실패시 None)"""
+        try:
+            return merge_pages([page async for page in self.iter_pages()])
+        except Exception:
+            return None
+
+    async def get_snapshot(self):
+        """전체 페이지 조회 후 한 번만 변환한 HoldingsSnapshot (비동기, 실패시 None)"""
+        data = await self.get_holdings()
+        return None if data is None else HoldingsSnapshot.from_response(data)
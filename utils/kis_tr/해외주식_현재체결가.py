@@ -0,0 +1,68 @@
+from utils.kis_tr.kis_client import KisClient
+
+
+class OverseasPrice:
+    """
+    해외주식 현재체결가 조회 (해외주식 현재체결가[v1_해외주식-009])
+
+    사용 예시:
+        price = OverseasPrice(appkey, appsecret).get_price("AMEX", "SOXL")
+    """
+    API_PATH = "/uapi/overseas-price/v1/quotations/price"
+    TR_ID = "HHDFS00000300"
+
+    # 주문용 해외거래소코드 -> 시세용 거래소코드
+    EXCD_MAP = {
+        "NASD": "NAS",
+        "NYSE": "NYS",
+        "AMEX": "AMS",
+        "SEHK": "HKS",
+        "TKSE": "TSE",
+    }
+
+    def __init__(self, appkey, appsecret, access_token=None, client=None):
+        self.client = client or KisClient(appkey, appsecret, access_token)
+
+    def _make_params(self, ovrs_excg_cd, symbol):
+        return {
+            "AUTH": "",
+            "EXCD": self.EXCD_MAP.get(ovrs_excg_cd, ovrs_excg_cd),
+            "SYMB": symbol,
+        }
+
+    @staticmethod
+    def _parse(data):
+        if data.get("rt_cd") != "0":
+            return None
+        last = (data.get("output") or {}).get("last", "")
+        return float(last) if last else None
+
+    def get_price(self, ovrs_excg_cd, symbol):
+        """현재가 (float, 실패시 None)"""
+        try:
+            response = self.client.get(self.API_PATH, self.TR_ID, params=self._make_params(ovrs_excg_cd, symbol))
+            if not response.ok:
+                return None
+            return self._parse(response.json())
+        except Exception:
+            return None
+
+
+class AsyncOverseasPrice(OverseasPrice):
+    """해외주식 현재체결가 조회 비동기 버전 (asyncio)"""
+
+    def __init__(self, appkey, appsecret, access_token=None, client=None):
+        if client is None:
+            from utils.kis_tr.async_kis_client import AsyncKisClient
+            client = AsyncKisClient(appkey, appsecret, access_token)
+        super().__init__(appkey, appsecret, access_token, client)
+
+    async def get_price(self, ovrs_excg_cd, symbol):
+        """현재가 (float, 실패시 None)"""
+        try:
+            status, data = await self.client.get(self.API_PATH, self.TR_ID, params=self._make_params(ovrs_excg_cd, symbol))
+            if status != 200:
+                return None
+            return self._parse(data)
+        except Exception:
+            return None
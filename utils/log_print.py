@@ -1,7 +1,169 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import re
+import threading
 from datetime import datetime
-from rich import print
 
-def log_print(message):
-    """날짜시간과 함께 메시지를 출력하는 함수 (muted)"""
-    timestamp = datetime.now().strftime("%H:%M:%S")
-    print(f"[dim][{timestamp}][/dim] {message}")
\ No newline at end of file
+# 비동기 로그 파이프라인
+# log_print() 는 레코드를 큐에 넣기만 하고 바로 돌아옵니다. (주문 경로가 터미널 렌더링을 기다리지 않음)
+# 백그라운드 스레드(QueueListener)가 rich 콘솔 출력과 JSON Lines 회전 파일 기록을 맡습니다.
+#   LOG_FILE           JSON Lines 파일 경로 (기본: logs/ica-bot.jsonl, 빈 값이면 파일 기록 안 함)
+#   LOG_LEVEL          기록할 최소 레벨 (기본: DEBUG)
+#   LOG_CONSOLE        0 이면 콘솔 출력 안 함
+#   LOG_CONSOLE_LEVEL  콘솔에 출력할 최소 레벨 (기본: INFO)
+
+LOG_FILE = os.path.join("logs", "ica-bot.jsonl")
+LOG_MAX_BYTES = 10 * 1024 * 1024
+LOG_BACKUP_COUNT = 5
+
+LOGGER_NAME = "ica_bot"
+
+# rich 마크업 태그 ([bold red], [/bold red], [dim] ...) - 파일에는 평문으로 기록
+_MARKUP_RE = re.compile(r"\[/?[a-zA-Z#][^\[\]]*\]")
+
+_logger = logging.getLogger(LOGGER_NAME)
+_logger.propagate = False
+_queue = queue.Queue()
+_listener = None
+_listener_pid = None
+_lock = threading.RLock()
+
+
+def _level_of(message, level):
+    """명시한 레벨 또는 마크업으로 추정한 레벨 ('Error' -> ERROR, 'Warning' -> WARNING)"""
+    if level is not None:
+        return logging.getLevelName(level.upper()) if isinstance(level, str) else level
+    if "Error" in message:
+        return logging.ERROR
+    if "Warning" in message:
+        return logging.WARNING
+    return logging.INFO
+
+
+def plain_text(message):
+    """rich 마크업 제거"""
+    return _MARKUP_RE.sub("", message)
+
+
+class RichConsoleHandler(logging.Handler):
+    """기존 log_print 와 같은 형식으로 콘솔 출력 (백그라운드 스레드에서만 호출됨)"""
+
+    def emit(self, record):
+        from rich import print
+
+        try:
+            timestamp = datetime.fromtimestamp(record.created).strftime("%H:%M:%S")
+            message = record.getMessage()
+            fields = getattr(record, "fields", None)
+            if fields:
+                message += " [dim]" + " ".join(f"{key}={value}" for key, value in fields.items()) + "[/dim]"
+            print(f"[dim][{timestamp}][/dim] {message}")
+        except Exception:
+            self.handleError(record)
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """레코드 -> JSON 1줄 (ts, level, thread, msg + fields)"""
+
+    def format(self, record):
+        data = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "thread": record.threadName,
+            "msg": plain_text(record.getMessage()),
+        }
+        fields = getattr(record, "fields", None)
+        if fields:
+            data.update(fields)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+def configure_logging(file_path=None, console=None, level=None, console_level=None):
+    """
+    로그 파이프라인 시작 (이미 시작했으면 다시 구성)
+
+    인자를 생략하면 환경변수, 그다음 기본값을 씁니다. log_print() 첫 호출 시 자동으로 실행됩니다.
+
+    Args:
+        file_path (str, optional): JSON Lines 파일 경로 ("" 이면 파일 기록 안 함)
+        console (bool, optional): 콘솔 출력 여부
+        level (str, optional): 기록할 최소 레벨
+        console_level (str, optional): 콘솔 최소 레벨
+    """
+    global _listener, _listener_pid, _queue
+    with _lock:
+        if _listener is not None and _listener_pid == os.getpid():
+            _listener.stop()
+        elif _listener_pid != os.getpid():
+            # fork 된 자식 프로세스는 부모 큐에 남은 레코드를 다시 쓰지 않도록 새 큐 사용
+            _queue = queue.Queue()
+        _listener = None
+
+        file_path = file_path if file_path is not None else os.getenv("LOG_FILE", LOG_FILE)
+        console = console if console is not None else os.getenv("LOG_CONSOLE", "1") != "0"
+        level = level or os.getenv("LOG_LEVEL", "DEBUG")
+        console_level = console_level or os.getenv("LOG_CONSOLE_LEVEL", "INFO")
+
+        handlers = []
+        if console:
+            handler = RichConsoleHandler()
+            handler.setLevel(console_level.upper())
+            handlers.append(handler)
+        if file_path:
+            directory = os.path.dirname(file_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            handler = logging.handlers.RotatingFileHandler(
+                file_path, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, encoding="utf-8", delay=True,
+            )
+            handler.setFormatter(JsonLinesFormatter())
+            handlers.append(handler)
+
+        _logger.setLevel(level.upper())
+        _listener = logging.handlers.QueueListener(_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        _listener_pid = os.getpid()
+
+
+def flush_logs():
+    """큐에 쌓인 로그가 모두 출력/기록될 때까지 대기 (rich 표를 직접 출력하기 전 순서 맞춤용)"""
+    if _listener is not None and _listener_pid == os.getpid():
+        _queue.join()
+
+
+def shutdown_logging():
+    """남은 로그를 모두 기록하고 백그라운드 스레드 종료"""
+    global _listener
+    with _lock:
+        if _listener is not None and _listener_pid == os.getpid():
+            _listener.stop()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
+
+
+def log_print(message, level=None, **fields):
+    """
+    로그 1건 기록 (큐에 넣고 바로 반환)
+
+    Args:
+        message (str): rich 마크업 메시지 (파일에는 마크업을 뺀 평문으로 기록)
+        level (str | int, optional): 'debug'/'info'/'warning'/'error' (생략 시 마크업으로 추정)
+        **fields: JSON 에 함께 남길 값 (예: tr_id="TTTT1002U", symbol="SOXL", latency_ms=12.3)
+    """
+    if _listener is None or _listener_pid != os.getpid():
+        # 최초 호출 또는 fork 된 자식 프로세스 (부모의 백그라운드 스레드는 따라오지 않음)
+        with _lock:
+            if _listener is None or _listener_pid != os.getpid():
+                configure_logging()
+    level = _level_of(message, level)
+    if _logger.isEnabledFor(level):
+        # Logger.log 의 호출 위치 탐색(findCaller)/레코드 복사를 건너뛰고 레코드를 바로 큐에 넣음
+        record = logging.LogRecord(LOGGER_NAME, level, "", 0, message, None, None)
+        record.fields = fields
+        _queue.put_nowait(record)
@@ -0,0 +1,213 @@
+from datetime import date, datetime, time, timedelta
+from zoneinfo import ZoneInfo
+
+# 미국 주식시장 거래일/세션 달력 (America/New_York, 서머타임은 zoneinfo 가 처리)
+# NYSE 규칙으로 휴장일과 조기폐장일(13:00)을 계산합니다. 임시 휴장(국장일 등)은 extra_holidays 로 넣으세요.
+
+NEW_YORK = ZoneInfo("America/New_York")
+SEOUL = ZoneInfo("Asia/Seoul")
+
+# 해외거래소코드 -> 현지 시간대 (KIS 해외주식 주문일자/조회일자는 현지 날짜 기준)
+EXCHANGE_TIMEZONES = {
+    "NASD": NEW_YORK,
+    "NYSE": NEW_YORK,
+    "AMEX": NEW_YORK,
+    "SEHK": ZoneInfo("Asia/Hong_Kong"),
+    "SHAA": ZoneInfo("Asia/Shanghai"),
+    "SZAA": ZoneInfo("Asia/Shanghai"),
+    "TKSE": ZoneInfo("Asia/Tokyo"),
+    "HASE": ZoneInfo("Asia/Ho_Chi_Minh"),
+    "VNSE": ZoneInfo("Asia/Ho_Chi_Minh"),
+}
+
+PRE_OPEN = time(4, 0)       # 프리마켓 시작
+OPEN = time(9, 30)          # 정규장 시작
+CLOSE = time(16, 0)         # 정규장 마감
+EARLY_CLOSE = time(13, 0)   # 조기폐장 마감
+POST_CLOSE = time(20, 0)    # 애프터마켓 종료
+
+# 세션 시점 이름 -> MarketSession 속성
+EVENTS = ("pre_open", "open", "close", "post_close")
+
+# 장 구분
+CLOSED = "closed"
+PRE = "pre"
+REGULAR = "regular"
+POST = "post"
+
+
+def exchange_date(ovrs_excg_cd, now=None):
+    """거래소 현지 날짜 'YYYYMMDD' (모르는 거래소는 미국 동부)"""
+    now = now or datetime.now(SEOUL)
+    if now.tzinfo is None:
+        now = now.astimezone()
+    return now.astimezone(EXCHANGE_TIMEZONES.get(ovrs_excg_cd, NEW_YORK)).strftime("%Y%m%d")
+
+
+def _easter(year):
+    """부활절 (그레고리력, 익명 알고리즘)"""
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+def _nth_weekday(year, month, weekday, n):
+    """month 의 n 번째 weekday (n=-1 이면 마지막)"""
+    if n > 0:
+        first = date(year, month, 1)
+        return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+    last = date(year + month // 12, month % 12 + 1, 1) - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def _observed(day):
+    """토요일 -> 금요일, 일요일 -> 월요일"""
+    if day.weekday() == 5:
+        return day - timedelta(days=1)
+    if day.weekday() == 6:
+        return day + timedelta(days=1)
+    return day
+
+
+def us_holidays(year):
+    """NYSE 휴장일 set"""
+    holidays = {
+        _nth_weekday(year, 1, 0, 3),        # Martin Luther King Jr. Day
+        _nth_weekday(year, 2, 0, 3),        # Washington's Birthday
+        _easter(year) - timedelta(days=2),  # Good Friday
+        _nth_weekday(year, 5, 0, -1),       # Memorial Day
+        _observed(date(year, 7, 4)),        # Independence Day
+        _nth_weekday(year, 9, 0, 1),        # Labor Day
+        _nth_weekday(year, 11, 3, 4),       # Thanksgiving Day
+        _observed(date(year, 12, 25)),      # Christmas Day
+    }
+    # 새해 첫날이 토요일이면 전년 12/31 에 대체 휴장하지 않음
+    new_year = date(year, 1, 1)
+    if new_year.weekday() != 5:
+        holidays.add(_observed(new_year))
+    if year >= 2022:
+        holidays.add(_observed(date(year, 6, 19)))  # Juneteenth
+    return holidays
+
+
+def us_early_closes(year):
+    """NYSE 13:00 조기폐장일 set (독립기념일 전날, 추수감사절 다음날, 크리스마스 이브)"""
+    days = {_nth_weekday(year, 11, 3, 4) + timedelta(days=1)}
+    for day in (date(year, 7, 3), date(year, 12, 24)):
+        # 월~목이면 조기폐장 (금요일이면 다음날 휴일이 당겨져 휴장)
+        if day.weekday() < 4:
+            days.add(day)
+    return days
+
+
+class MarketSession:
+    """거래일 1일의 세션 시점 (모두 America/New_York aware datetime)"""
+
+    __slots__ = ("date", "pre_open", "open", "close", "post_close", "early_close")
+
+    def __init__(self, day, early_close=False):
+        self.date = day
+        self.early_close = early_close
+        self.pre_open = datetime.combine(day, PRE_OPEN, NEW_YORK)
+        self.open = datetime.combine(day, OPEN, NEW_YORK)
+        self.close = datetime.combine(day, EARLY_CLOSE if early_close else CLOSE, NEW_YORK)
+        # 조기폐장일 애프터마켓은 17:00 까지
+        self.post_close = datetime.combine(day, time(17, 0) if early_close else POST_CLOSE, NEW_YORK)
+
+    def __repr__(self):
+        return f"MarketSession({self.date} {self.open:%H:%M}-{self.close:%H:%M} ET)"
+
+
+class USMarketCalendar:
+    """
+    미국 주식시장 달력
+
+    사용 예시:
+        calendar = USMarketCalendar()
+        calendar.phase()                                  # 'pre' / 'regular' / 'post' / 'closed'
+        session = calendar.next_session()                 # 오늘(아직 안 끝났으면) 또는 다음 거래일
+        calendar.next_event("close", timedelta(minutes=-10))   # 다음 정규장 마감 10분 전
+    """
+
+    def __init__(self, extra_holidays=()):
+        self.extra_holidays = {date.fromisoformat(day) if isinstance(day, str) else day for day in extra_holidays}
+        self._years = {}
+
+    def _year(self, year):
+        cached = self._years.get(year)
+        if cached is None:
+            cached = self._years[year] = (us_holidays(year), us_early_closes(year))
+        return cached
+
+    def is_trading_day(self, day):
+        holidays, _ = self._year(day.year)
+        return day.weekday() < 5 and day not in holidays and day not in self.extra_holidays
+
+    def session(self, day):
+        """거래일 세션 (휴장일이면 None)"""
+        if not self.is_trading_day(day):
+            return None
+        return MarketSession(day, day in self._year(day.year)[1])
+
+    def _now(self, now):
+        if now is None:
+            return datetime.now(NEW_YORK)
+        return now.astimezone(NEW_YORK) if now.tzinfo else now.replace(tzinfo=NEW_YORK)
+
+    def sessions(self, start, days=14):
+        """start(날짜)부터 days 일 안의 거래일 세션"""
+        for offset in range(days):
+            session = self.session(start + timedelta(days=offset))
+            if session is not None:
+                yield session
+
+    def next_session(self, now=None):
+        """아직 애프터마켓이 끝나지 않은 가장 가까운 세션"""
+        now = self._now(now)
+        for session in self.sessions(now.date()):
+            if session.post_close > now:
+                return session
+        return None
+
+    def phase(self, now=None):
+        """현재 장 구분 (pre / regular / post / closed)"""
+        now = self._now(now)
+        session = self.session(now.date())
+        if session is None or now < session.pre_open or now >= session.post_close:
+            return CLOSED
+        if now < session.open:
+            return PRE
+        if now < session.close:
+            return REGULAR
+        return POST
+
+    def next_event(self, event, offset=timedelta(0), after=None):
+        """
+        after 이후 처음 오는 세션 시점 + offset (aware datetime)
+
+        Args:
+            event (str): 'pre_open' / 'open' / 'close' / 'post_close'
+            offset (timedelta): 시점 기준 이동 (예: 마감 10분 전은 -10분)
+            after (datetime, optional): 기준 시각 (기본: 지금)
+        """
+        if event not in EVENTS:
+            raise ValueError(f"알 수 없는 세션 시점: {event}")
+        after = self._now(after)
+        # offset 이 하루를 넘지 않으면 전날부터 보면 충분
+        for session in self.sessions(after.date() - timedelta(days=1), days=16):
+            at = getattr(session, event) + offset
+            if at > after:
+                return at
+        return None
+
+
+# 전역 달력 인스턴스
+us_market = USMarketCalendar()
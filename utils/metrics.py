@@ -0,0 +1,241 @@
+import bisect
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 프로세스 내부 지표 (Prometheus text format 0.0.4)
+# KIS 호출(tr_id 별 지연/응답/rt_cd 오류/재시도), DB 작업, 전략 단계 소요 시간을 메모리에 모아 두고
+# start_metrics_server() 로 띄운 /metrics 엔드포인트에서 읽어 갑니다. (외부 라이브러리 없음)
+#   METRICS_PORT  설정하면 runner 실행 시 자동으로 엔드포인트 시작 (예: 9108)
+
+METRICS_PORT_ENV = "METRICS_PORT"
+METRICS_PATH = "/metrics"
+
+# 초 단위 버킷 (KIS 응답은 수십~수백 ms, DB 는 ms 이하)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# 응답 본문에서 rt_cd/msg_cd 만 빠르게 찾기 (동기 클라이언트는 호출자가 JSON 을 다시 파싱하므로)
+_RT_CD_RE = re.compile(rb'"rt_cd"\s*:\s*"([^"]*)"')
+_MSG_CD_RE = re.compile(rb'"msg_cd"\s*:\s*"([^"]*)"')
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    """누적 카운터 (라벨 값 순서는 labels 와 동일)"""
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def value(self, *label_values):
+        return self._values.get(label_values, 0)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for label_values, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labels, label_values)} {value}")
+        return lines
+
+
+class Histogram:
+    """누적 버킷 히스토그램 (관측값 단위: 초)"""
+
+    def __init__(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        # 라벨 값 -> [버킷별 개수(+Inf 포함), 합계, 개수]
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, seconds, *label_values):
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += seconds
+            series[2] += 1
+
+    @contextmanager
+    def time(self, *label_values):
+        """with 블록 소요 시간 기록 (예외가 나도 기록)"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *label_values)
+
+    def count(self, *label_values):
+        series = self._series.get(label_values)
+        return series[2] if series else 0
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((key, (list(series[0]), series[1], series[2])) for key, series in self._series.items())
+        for label_values, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                labels = _format_labels(self.labels, label_values, 'le="' + le + '"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, label_values)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, label_values)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """지표 모음 + Prometheus text 출력"""
+
+    def __init__(self):
+        self.metrics = []
+
+    def counter(self, name, help_text, labels=()):
+        metric = Counter(name, help_text, labels)
+        self.metrics.append(metric)
+        return metric
+
+    def histogram(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        metric = Histogram(name, help_text, labels, buckets)
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+KIS_REQUEST_SECONDS = registry.histogram(
+    "kis_request_duration_seconds", "KIS OpenAPI 요청 지연 (재시도 1회마다 1건)", ("tr_id", "method"),
+)
+KIS_RESPONSES = registry.counter(
+    "kis_responses_total", "KIS OpenAPI HTTP 응답 수", ("tr_id", "status"),
+)
+KIS_ERRORS = registry.counter(
+    "kis_errors_total", "KIS OpenAPI 오류 응답 수 (rt_cd != 0, 연결 실패는 msg_cd=connection)", ("tr_id", "rt_cd", "msg_cd"),
+)
+KIS_RETRIES = registry.counter(
+    "kis_retries_total", "KIS OpenAPI 재시도 수", ("tr_id", "reason"),
+)
+DB_SECONDS = registry.histogram(
+    "db_operation_duration_seconds", "SQLite 작업 소요 시간", ("operation",),
+)
+STRATEGY_STEP_SECONDS = registry.histogram(
+    "strategy_step_duration_seconds", "전략 실행 단계별 소요 시간", ("step",),
+)
+SCHEDULER_JOB_SECONDS = registry.histogram(
+    "scheduler_job_duration_seconds", "예약 작업 실행 시간", ("job",),
+)
+SCHEDULER_LATENESS_SECONDS = registry.histogram(
+    "scheduler_job_lateness_seconds", "예약 시각 대비 실제 시작 지연", ("job",),
+)
+SCHEDULER_MISSED = registry.counter(
+    "scheduler_missed_total", "허용 지연을 넘겨 건너뛴 예약 실행 수", ("job",),
+)
+
+
+def kis_tr_id(headers, path):
+    """지표 라벨용 tr_id (토큰/접속키 발급처럼 tr_id 헤더가 없으면 경로 끝, 예: tokenP)"""
+    tr_id = (headers or {}).get("tr_id")
+    return tr_id or path.rsplit("/", 1)[-1]
+
+
+def observe_kis_response(tr_id, method, seconds, status, data=None, content=None):
+    """
+    KIS 응답 1건 기록
+
+    Args:
+        data (dict, optional): 파싱된 본문 (비동기 클라이언트)
+        content (bytes, optional): 원본 본문 (동기 클라이언트 - rt_cd/msg_cd 만 정규식으로 찾음)
+    """
+    KIS_REQUEST_SECONDS.observe(seconds, tr_id, method)
+    KIS_RESPONSES.inc(tr_id, str(status))
+    if isinstance(data, dict):
+        rt_cd, msg_cd = data.get("rt_cd"), data.get("msg_cd", "")
+    elif content is not None:
+        match = _RT_CD_RE.search(content)
+        rt_cd = match.group(1).decode() if match else None
+        match = _MSG_CD_RE.search(content) if rt_cd not in (None, "0") else None
+        msg_cd = match.group(1).decode() if match else ""
+    else:
+        rt_cd, msg_cd = None, ""
+    if rt_cd not in (None, "0"):
+        KIS_ERRORS.inc(tr_id, rt_cd, msg_cd)
+    elif rt_cd is None and status >= 400:
+        KIS_ERRORS.inc(tr_id, "", f"http_{status}")
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != METRICS_PATH:
+            self.send_error(404)
+            return
+        body = registry.render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # 스크레이프마다 stderr 에 접근 로그를 남기지 않음
+        pass
+
+
+_server = None
+
+
+def start_metrics_server(port=None, host="127.0.0.1"):
+    """
+    /metrics 엔드포인트를 백그라운드 스레드로 시작 -> URL (이미 시작했으면 기존 URL)
+
+    Args:
+        port (int, optional): 포트 (생략 시 METRICS_PORT, 0 이면 빈 포트 자동 선택)
+    """
+    global _server
+    if _server is None:
+        if port is None:
+            port = int(os.getenv(METRICS_PORT_ENV, "0"))
+        _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+        _server.daemon_threads = True
+        threading.Thread(target=_server.serve_forever, name="metrics", daemon=True).start()
+    host, port = _server.server_address[:2]
+    return f"http://{host}:{port}{METRICS_PATH}"
+
+
+def stop_metrics_server():
+    global _server
+    if _server is not None:
+        _server.shutdown()
+        _server.server_close()
+        _server = None
@@ -0,0 +1,199 @@
+import argparse
+import os
+import threading
+import time
+import numpy as np
+from utils.log_print import log_print
+
+# 컬럼형 가격 저장소 (database/prices)
+# 종목/주기마다 디렉토리 1개, 컬럼마다 헤더 없는 바이너리 파일 1개(리틀엔디언 8바이트 배열)를 둡니다.
+#   database/prices/1d/AMEX_SOXL/time.bin   <- 시각 (int64, 1d 는 일 단위 / 그 외는 초 단위 epoch)
+#   database/prices/1d/AMEX_SOXL/open.bin   <- float64 (high/low/close/volume 동일)
+# - 읽기: np.memmap 으로 매핑해 복사 없이 NumPy 배열로 사용 (OS 페이지 캐시를 여러 프로세스가 공유)
+# - 추가: 파일 끝에 이어 쓰기만 하므로 기존 데이터를 다시 쓰지 않음
+# - 날짜 색인: time 컬럼이 오름차순이므로 searchsorted 로 기간 슬라이스
+# - 쓰기는 종목당 프로세스 1개만 한다고 가정합니다. (time 컬럼을 마지막에 써서 중간에 죽어도 읽기는 일관됨)
+
+PRICE_DIR = os.path.join("database", "prices")
+
+PRICE_COLUMNS = ("open", "high", "low", "close", "volume")
+TIME_COLUMN = "time"
+ITEM_SIZE = 8
+
+
+def time_unit(interval):
+    """주기별 시각 단위 (일봉 'D', 분봉/틱 's')"""
+    return "D" if interval.endswith("d") else "s"
+
+
+class PriceStore:
+    """
+    종목별 OHLCV 컬럼형 저장소
+
+    사용 예시:
+        store = PriceStore()
+        store.append("SOXL", "AMEX", load_bars_csv("SOXL.csv"))
+        bars = store.load("SOXL", "AMEX", start="2020-01-01")   # date/open/high/low/close/volume (memmap 뷰)
+        result = run_backtest(bars["high"], bars["close"], settings)
+    """
+
+    def __init__(self, root=PRICE_DIR):
+        self.root = root
+        self._maps = {}     # 파일 경로 -> (행 수, memmap)
+        self._lock = threading.Lock()
+
+    def _dir(self, symbol, ovrs_excg_cd, interval):
+        return os.path.join(self.root, interval, f"{ovrs_excg_cd}_{symbol}")
+
+    @staticmethod
+    def _path(directory, column):
+        return os.path.join(directory, f"{column}.bin")
+
+    def _length(self, directory):
+        """모든 컬럼에 온전히 기록된 행 수 (디렉토리가 없으면 0)"""
+        lengths = []
+        for column in (TIME_COLUMN,) + PRICE_COLUMNS:
+            path = self._path(directory, column)
+            if not os.path.exists(path):
+                return 0
+            lengths.append(os.path.getsize(path) // ITEM_SIZE)
+        return min(lengths)
+
+    def _map(self, directory, column, length, dtype):
+        """컬럼 파일을 length 행만큼 매핑 (같은 길이면 이전 매핑 재사용)"""
+        path = self._path(directory, column)
+        with self._lock:
+            cached = self._maps.get(path)
+            if cached is not None and cached[0] == length:
+                return cached[1]
+            array = np.memmap(path, dtype=dtype, mode="r", shape=(length,)) if length else np.empty(0, dtype=dtype)
+            self._maps[path] = (length, array)
+            return array
+
+    def _to_ticks(self, values, interval):
+        unit = time_unit(interval)
+        return np.asarray(values).astype(f"datetime64[{unit}]").view(np.int64)
+
+    def length(self, symbol, ovrs_excg_cd, interval="1d"):
+        """저장된 봉 개수"""
+        return self._length(self._dir(symbol, ovrs_excg_cd, interval))
+
+    def last_time(self, symbol, ovrs_excg_cd, interval="1d"):
+        """마지막 봉 시각 (datetime64, 없으면 None)"""
+        directory = self._dir(symbol, ovrs_excg_cd, interval)
+        length = self._length(directory)
+        if not length:
+            return None
+        ticks = self._map(directory, TIME_COLUMN, length, np.int64)
+        return ticks[-1:].view(f"datetime64[{time_unit(interval)}]")[0]
+
+    def append(self, symbol, ovrs_excg_cd, bars, interval="1d"):
+        """
+        새 봉 추가 (마지막 저장 시각 이후 봉만 이어 씀)
+
+        Args:
+            bars (dict): date(시각 배열) + open/high/low/close/volume 배열 (load_bars_csv 결과 형식)
+
+        Returns:
+            int: 추가한 봉 수
+        """
+        directory = self._dir(symbol, ovrs_excg_cd, interval)
+        os.makedirs(directory, exist_ok=True)
+        ticks = self._to_ticks(bars["date"], interval)
+
+        # 시각순 정렬 + 같은 시각은 마지막 값만 사용
+        order = np.argsort(ticks, kind="stable")
+        ticks = ticks[order]
+        keep = np.ones(len(ticks), dtype=bool)
+        keep[:-1] = ticks[1:] != ticks[:-1]
+
+        length = self._truncate(directory)
+        if length:
+            last = self._map(directory, TIME_COLUMN, length, np.int64)[-1]
+            keep &= ticks > last
+        if not keep.any():
+            return 0
+
+        # 가격 컬럼을 먼저 쓰고 time 을 마지막에 써서 읽는 쪽은 항상 완성된 행만 보게 함
+        for column in PRICE_COLUMNS:
+            values = np.asarray(bars[column], dtype="<f8")[order][keep]
+            with open(self._path(directory, column), "ab") as f:
+                f.write(values.tobytes())
+        with open(self._path(directory, TIME_COLUMN), "ab") as f:
+            f.write(ticks[keep].astype("<i8").tobytes())
+        return int(keep.sum())
+
+    def _truncate(self, directory):
+        """중간에 끊긴 쓰기로 길이가 다른 컬럼을 온전한 행 수에 맞춰 자름 -> 행 수"""
+        length = self._length(directory)
+        for column in (TIME_COLUMN,) + PRICE_COLUMNS:
+            path = self._path(directory, column)
+            if not os.path.exists(path):
+                open(path, "wb").close()
+            elif os.path.getsize(path) != length * ITEM_SIZE:
+                with self._lock:
+                    self._maps.pop(path, None)
+                os.truncate(path, length * ITEM_SIZE)
+        return length
+
+    def load(self, symbol, ovrs_excg_cd, interval="1d", start=None, end=None):
+        """
+        기간 봉 조회 (복사 없는 memmap 뷰)
+
+        Args:
+            start/end (str | datetime64, optional): 포함 범위 (예: "2020-01-01")
+
+        Returns:
+            dict: date(datetime64 배열), open/high/low/close/volume(float64 배열) - 저장된 봉이 없으면 길이 0
+        """
+        directory = self._dir(symbol, ovrs_excg_cd, interval)
+        length = self._length(directory)
+        ticks = self._map(directory, TIME_COLUMN, length, np.int64) if length else np.empty(0, dtype=np.int64)
+        lo = 0 if start is None else int(np.searchsorted(ticks, self._to_ticks(np.datetime64(start), interval), "left"))
+        hi = length if end is None else int(np.searchsorted(ticks, self._to_ticks(np.datetime64(end), interval), "right"))
+
+        bars = {"date": ticks[lo:hi].view(f"datetime64[{time_unit(interval)}]")}
+        for column in PRICE_COLUMNS:
+            array = self._map(directory, column, length, np.float64) if length else np.empty(0)
+            bars[column] = array[lo:hi]
+        return bars
+
+    def symbols(self, interval="1d"):
+        """저장된 (ovrs_excg_cd, symbol) 목록"""
+        directory = os.path.join(self.root, interval)
+        if not os.path.isdir(directory):
+            return []
+        return sorted(tuple(name.split("_", 1)) for name in os.listdir(directory) if "_" in name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="컬럼형 가격 저장소")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    imp = sub.add_parser("import", help="CSV 봉 데이터 추가 (Date,Open,High,Low,Close,Volume)")
+    imp.add_argument("symbol")
+    imp.add_argument("ovrs_excg_cd")
+    imp.add_argument("csv")
+    imp.add_argument("--interval", default="1d")
+
+    info = sub.add_parser("info", help="저장된 종목/봉 수 출력")
+    info.add_argument("--interval", default="1d")
+    args = parser.parse_args()
+
+    store = PriceStore()
+    if args.command == "import":
+        from utils.strategy.backtest import load_bars_csv
+        added = store.append(args.symbol, args.ovrs_excg_cd, load_bars_csv(args.csv), args.interval)
+        log_print(f"[bold green]{args.ovrs_excg_cd}:{args.symbol} {args.interval} 봉 {added}개 추가 (총 {store.length(args.symbol, args.ovrs_excg_cd, args.interval)}개)[/bold green]")
+        return
+
+    for ovrs_excg_cd, symbol in store.symbols(args.interval):
+        started = time.perf_counter()
+        bars = store.load(symbol, ovrs_excg_cd, args.interval)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if len(bars["date"]):
+            log_print(f"[bold cyan]{ovrs_excg_cd}:{symbol}[/bold cyan] {len(bars['date'])}개 {bars['date'][0]} ~ {bars['date'][-1]} ({elapsed_ms:.2f}ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,321 @@
+import asyncio
+import heapq
+import inspect
+import itertools
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from utils import database
+from utils.log_print import log_print
+from utils.market_calendar import us_market
+from utils.metrics import SCHEDULER_JOB_SECONDS, SCHEDULER_LATENESS_SECONDS, SCHEDULER_MISSED
+
+# 중앙 예약 작업 스케줄러
+# 작업마다 다음 실행 시각을 힙(heapq)에 넣고, 스레드 1개가 가장 이른 시각까지 Condition.wait 로 잠들었다가 깨어납니다.
+# 정해진 간격으로 폴링하지 않으므로 장 마감 직전처럼 정확한 시각에 ms 단위로 맞춰 실행합니다.
+# 시계 변경/절전 복귀를 놓치지 않도록 최대 MAX_WAIT 초마다 한 번은 깨어나 벽시계를 다시 확인합니다.
+# 작업은 스레드 풀에서 실행되고, 코루틴 함수는 스케줄러 전용 이벤트 루프 1개에서 실행됩니다. (aiohttp 세션 공유 가능)
+
+MAX_WAIT = 30.0
+
+
+def _now():
+    """현재 시각 (로컬 aware datetime)"""
+    return datetime.now().astimezone()
+
+
+class DateTrigger:
+    """지정 시각 1번"""
+
+    def __init__(self, at):
+        self.at = at if at.tzinfo else at.astimezone()
+
+    def next_after(self, after):
+        return self.at if self.at > after else None
+
+    def __repr__(self):
+        return f"DateTrigger({self.at:%Y-%m-%d %H:%M:%S})"
+
+
+class IntervalTrigger:
+    """seconds 초마다 (직전 예약 시각 기준이라 실행 시간만큼 밀리지 않음)"""
+
+    def __init__(self, seconds):
+        self.interval = timedelta(seconds=seconds)
+
+    def next_after(self, after):
+        return after + self.interval
+
+    def __repr__(self):
+        return f"IntervalTrigger({self.interval.total_seconds():g}s)"
+
+
+class MarketTrigger:
+    """
+    미국 거래일 세션 시점 + offset (휴장일/조기폐장/서머타임 반영)
+
+    예: MarketTrigger("close", timedelta(minutes=-10)) -> 매 거래일 정규장 마감 10분 전
+    """
+
+    def __init__(self, event, offset=timedelta(0), calendar=us_market):
+        self.event = event
+        self.offset = offset
+        self.calendar = calendar
+
+    def next_after(self, after):
+        return self.calendar.next_event(self.event, self.offset, after)
+
+    def __repr__(self):
+        minutes = self.offset.total_seconds() / 60
+        return f"MarketTrigger({self.event} {minutes:+g}m)"
+
+
+class Job:
+    """예약 작업 1개"""
+
+    __slots__ = (
+        "name", "func", "trigger", "jitter", "misfire_grace", "catch_up",
+        "due", "next_run_at", "last_run_at", "running", "runs", "missed", "version",
+    )
+
+    def __init__(self, name, func, trigger, jitter, misfire_grace, catch_up):
+        self.name = name
+        self.func = func
+        self.trigger = trigger
+        self.jitter = jitter
+        self.misfire_grace = misfire_grace
+        self.catch_up = catch_up
+        self.due = None             # 트리거가 정한 예약 시각
+        self.next_run_at = None     # due + jitter (실제로 깨어날 시각)
+        self.last_run_at = None
+        self.running = False
+        self.runs = 0
+        self.missed = 0
+        self.version = 0
+
+    def __repr__(self):
+        next_text = self.next_run_at.strftime("%Y-%m-%d %H:%M:%S") if self.next_run_at else "-"
+        return f"Job({self.name} {self.trigger!r} next={next_text})"
+
+
+class Scheduler:
+    """
+    힙 기반 예약 작업 스케줄러
+
+    - add_job(name, func, trigger) 로 등록하면 트리거가 정한 시각에 정확히 1번씩 실행합니다.
+    - jitter: 여러 프로세스가 같은 시각에 몰리지 않도록 예약 시각에 0~jitter 초 무작위 지연 (마감 직전 작업은 0)
+    - misfire_grace: 절전/과부하로 예약 시각보다 이만큼 늦게 깨어나면 그 실행은 건너뛰고 다음 시각으로 넘어감
+    - catch_up: 마지막 실행 시각을 DB(scheduler_job)에 남겨 두고, 재시작했을 때 그 사이 놓친 실행이
+      catch_up 초 안이면 바로 1번 실행 (여러 번 놓쳤어도 1번만)
+    - 같은 작업이 아직 실행 중이면 겹쳐 실행하지 않고 건너뜁니다.
+
+    사용 예시:
+        scheduler.add_job("post_close_reconcile", reconcile, MarketTrigger("close", timedelta(minutes=15)), catch_up=6 * 3600)
+        scheduler.start()
+    """
+
+    def __init__(self, max_workers=4):
+        self.max_workers = max_workers
+        self._jobs = {}
+        self._heap = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stopped = False
+        self._executor = None
+        self._loop = None
+        self._loop_lock = threading.Lock()
+
+    # ------------------------------------------------------------------ 작업 등록
+
+    def add_job(self, name, func, trigger, jitter=0.0, misfire_grace=60.0, catch_up=0.0):
+        """
+        작업 등록 (같은 이름이 있으면 교체) -> Job
+
+        Args:
+            name (str): 작업 이름 (지표 라벨/실행 기록 키)
+            func (callable): 인자 없는 함수 또는 코루틴 함수
+            trigger: next_after(datetime) -> 다음 실행 시각 (없으면 None, 작업 종료)
+            jitter (float): 예약 시각에 더할 무작위 지연 최대값(초)
+            misfire_grace (float | None): 허용 지연(초), None 이면 늦어도 항상 실행
+            catch_up (float): 재시작 시 놓친 실행을 따라잡을 최대 경과 시간(초), 0 이면 따라잡지 않음
+        """
+        job = Job(name, func, trigger, jitter, misfire_grace, catch_up)
+        now = _now()
+        due = trigger.next_after(now)
+        catching_up = False
+        if catch_up:
+            job.last_run_at = self._load_last_run(name)
+            missed = trigger.next_after(job.last_run_at) if job.last_run_at else None
+            if missed is not None and missed <= now:
+                if (now - missed).total_seconds() <= catch_up:
+                    log_print(f"[bold yellow]Warning:[/bold yellow] 예약 작업 {name} 놓친 실행({missed:%Y-%m-%d %H:%M}) 따라잡기", job=name)
+                    due, catching_up = now, True
+                else:
+                    log_print(f"[bold yellow]Warning:[/bold yellow] 예약 작업 {name} 놓친 실행({missed:%Y-%m-%d %H:%M})이 너무 오래되어 건너뜀", job=name)
+        with self._cond:
+            self._jobs[name] = job
+            self._push(job, due, jitter=not catching_up)
+        return job
+
+    def remove_job(self, name):
+        with self._cond:
+            job = self._jobs.pop(name, None)
+            if job is not None:
+                job.version += 1
+                self._cond.notify()
+        return job
+
+    def get_job(self, name):
+        return self._jobs.get(name)
+
+    def jobs(self):
+        """등록된 작업 (다음 실행 시각 순)"""
+        return sorted(self._jobs.values(), key=lambda job: job.next_run_at.timestamp() if job.next_run_at else float("inf"))
+
+    def _push(self, job, due, jitter=True):
+        """다음 실행 예약 (due 가 None 이면 작업 제거) - self._cond 안에서 호출"""
+        job.version += 1
+        if due is None:
+            if self._jobs.get(job.name) is job:
+                del self._jobs[job.name]
+            job.due = job.next_run_at = None
+            return
+        job.due = due
+        job.next_run_at = due + timedelta(seconds=random.uniform(0, job.jitter)) if jitter and job.jitter else due
+        heapq.heappush(self._heap, (job.next_run_at.timestamp(), next(self._seq), job, job.version))
+        self._cond.notify()
+
+    # ------------------------------------------------------------------ 실행 기록
+
+    @staticmethod
+    def _load_last_run(name):
+        try:
+            row = database.fetchone("SELECT last_run_at FROM scheduler_job WHERE name = ?", (name,))
+        except Exception as e:
+            log_print(f"[bold yellow]Warning:[/bold yellow] 예약 작업 {name} 실행 기록 조회 실패: {e}")
+            return None
+        return datetime.fromisoformat(row[0]) if row else None
+
+    @staticmethod
+    def _save_last_run(job, status, error):
+        try:
+            with database.transaction() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO scheduler_job (name, last_run_at, last_status, last_error, updated_at) "
+                    "VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)",
+                    (job.name, job.last_run_at.isoformat(), status, error),
+                )
+        except Exception as e:
+            log_print(f"[bold yellow]Warning:[/bold yellow] 예약 작업 {job.name} 실행 기록 저장 실패: {e}")
+
+    # ------------------------------------------------------------------ 실행
+
+    def _run(self):
+        with self._cond:
+            while not self._stopped:
+                if not self._heap:
+                    self._cond.wait(MAX_WAIT)
+                    continue
+                at, _, job, version = self._heap[0]
+                if self._jobs.get(job.name) is not job or job.version != version:
+                    heapq.heappop(self._heap)
+                    continue
+                delay = at - time.time()
+                if delay > 0:
+                    self._cond.wait(min(delay, MAX_WAIT))
+                    continue
+                heapq.heappop(self._heap)
+                self._fire(job, -delay)
+
+    def _fire(self, job, late):
+        """예약 시각 도달 - 다음 실행을 먼저 예약한 뒤 스레드 풀에 넘김 (self._cond 안에서 호출)"""
+        now = _now()
+        next_due = job.trigger.next_after(job.due)
+        if next_due is not None and next_due <= now:
+            # 여러 번 놓쳤으면 지난 실행은 모두 합쳐 이번 1번으로 처리
+            next_due = job.trigger.next_after(now)
+        self._push(job, next_due)
+
+        if job.misfire_grace is not None and late > job.misfire_grace:
+            job.missed += 1
+            SCHEDULER_MISSED.inc(job.name)
+            log_print(f"[bold yellow]Warning:[/bold yellow] 예약 작업 {job.name} {late:.1f}초 늦어 건너뜀", job=job.name, late_ms=round(late * 1000, 1))
+            return
+        if job.running:
+            job.missed += 1
+            SCHEDULER_MISSED.inc(job.name)
+            log_print(f"[bold yellow]Warning:[/bold yellow] 예약 작업 {job.name} 이전 실행이 끝나지 않아 건너뜀", job=job.name)
+            return
+        job.running = True
+        self._executor.submit(self._execute, job, late)
+
+    def _execute(self, job, late):
+        SCHEDULER_LATENESS_SECONDS.observe(late, job.name)
+        log_print(f"예약 작업 {job.name} 시작", level="debug", job=job.name, late_ms=round(late * 1000, 2))
+        job.last_run_at = _now()
+        status, error = "ok", None
+        try:
+            with SCHEDULER_JOB_SECONDS.time(job.name):
+                if inspect.iscoroutinefunction(job.func):
+                    self.run_coroutine(job.func())
+                else:
+                    job.func()
+        except Exception as e:
+            status, error = "error", str(e) or type(e).__name__
+            log_print(f"[bold red]Error:[/bold red] 예약 작업 {job.name} 실패: {error}", job=job.name)
+        finally:
+            job.running = False
+            job.runs += 1
+        if job.catch_up:
+            self._save_last_run(job, status, error)
+
+    def run_coroutine(self, coro):
+        """스케줄러 이벤트 루프에서 코루틴 실행 후 결과 반환 (다른 스레드에서 호출)"""
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="scheduler-loop", daemon=True).start()
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """스케줄러 스레드 시작 (이미 실행 중이면 무시)"""
+        with self._cond:
+            if self.running:
+                return
+            self._stopped = False
+            self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix="scheduler-job")
+            self._thread = threading.Thread(target=self._run, name="scheduler", daemon=True)
+            self._thread.start()
+
+    def stop(self, wait=True):
+        """스케줄러 중지 (wait 이면 실행 중인 작업이 끝날 때까지 대기)"""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+        with self._loop_lock:
+            if self._loop is not None:
+                self._loop.call_soon_threadsafe(self._loop.stop)
+                self._loop = None
+
+    def wait(self):
+        """stop() 될 때까지 대기 (Ctrl+C 는 KeyboardInterrupt 로 올라감)"""
+        thread = self._thread
+        while thread is not None and thread.is_alive():
+            thread.join(1)
+
+
+# 전역 스케줄러 인스턴스
+scheduler = Scheduler()
@@ -0,0 +1,304 @@
+import argparse
+import csv
+import time
+import numpy as np
+from utils import database
+from utils.log_print import log_print
+from utils.price_store import PriceStore
+from utils.strategy.infinite_buying import (
+    REASON_BUY_AVG,
+    REASON_BUY_STAR,
+    REASON_CYCLE_END,
+    REASON_ENTRY,
+    REASON_SELL_MOC,
+    REASON_SELL_STAR,
+    REASON_SELL_TARGET,
+    SIGNAL_BUY,
+    SIGNAL_SELL,
+    calc_star_pct,
+    calc_t,
+    calc_targets,
+    load_settings,
+    next_capital,
+    reason_text,
+    unit_amount,
+)
+from utils.strategy.rsi import wilder_rsi
+
+# strategy_result 컬럼 중 백테스트가 채우는 컬럼 (executed_at/symbol/ovrs_excg_cd 제외)
+RESULT_COLUMNS = database.STRATEGY_RESULT_VALUE_COLUMNS
+_INT_COLUMNS = ("cycle", "round", "signal", "reason")
+
+
+def load_bars_csv(path):
+    """
+    일봉 CSV 로드 (Date,Open,High,Low,Close,...,Volume 헤더 - 야후 파이낸스 형식)
+
+    Returns:
+        dict: date(datetime64[D]), open/high/low/close/volume(float64) 컬럼 배열
+    """
+    with open(path, newline="") as f:
+        rows = [row for row in csv.DictReader(f) if row.get("Close") not in (None, "", "null")]
+    bars = {"date": np.array([row["Date"][:10] for row in rows], dtype="datetime64[D]")}
+    for key in ("Open", "High", "Low", "Close", "Volume"):
+        bars[key.lower()] = np.array([float(row.get(key) or 0) for row in rows], dtype=np.float64)
+    return bars
+
+
+def load_bars(csv_path, settings):
+    """CSV 경로가 있으면 CSV, 없으면 가격 저장소(database/prices)의 settings 종목 일봉"""
+    if csv_path:
+        return load_bars_csv(csv_path)
+    bars = PriceStore().load(settings["symbol"], settings["ovrs_excg_cd"])
+    if not len(bars["close"]):
+        raise FileNotFoundError(f"가격 저장소에 {settings['ovrs_excg_cd']}:{settings['symbol']} 일봉이 없습니다.")
+    return bars
+
+
+def entry_rsi(close, settings):
+    """신규 진입 필터용 일별 RSI (rsi_entry_threshold 가 100 이상이면 필터가 없으므로 None)"""
+    if float(settings.get("rsi_entry_threshold", 100)) >= 100:
+        return None
+    return wilder_rsi(close, int(settings.get("rsi_period", 14)))
+
+
+def run_backtest(high, close, settings, rsi=None):
+    """
+    무한매수법 v3.0 백테스트
+
+    체결 여부가 전날 평단/T 로 정한 목표가에 달려 있어 날짜 순서대로 풀어야 하므로 벡터화 엔진이 아닙니다.
+    - 경로에 의존하는 상태(사이클/회차/T/별%/보유수량/평단/현금/목표가)는 일자별 파이썬 루프에서 스칼라로만 갱신하고
+      컬럼별로 미리 할당한 리스트에 기록합니다. (일자별 객체 생성 없음)
+    - 경로와 무관한 부분은 NumPy 배열 연산으로 처리합니다:
+      RSI 진입 허용 여부는 루프 전에 한 번에, 평가금액/고점/MDD/평단 대비 수익률/누적수익률은 루프 후 일별 현금·보유수량으로 계산합니다.
+    각 행은 해당 일 종가 체결 이후의 상태이므로 마지막 행의 목표가가 다음 날 주문 기준입니다.
+
+    일별 규칙:
+        - 보유수량 0 : 1회매수금만큼 종가 매수로 새 사이클 진입 (rsi가 주어지면 rsi <= rsi_entry_threshold 일 때만)
+        - T >= 분할수 * moc_trigger_rate : 보유수량의 (1 - profit_sell_ratio) 만큼 MOC 매도 (소진 임박 손절)
+        - 그 외
+            매도: profit_sell_ratio 만큼 목표가(평단 * sell_multiplier) 지정가, 나머지는 별% 지점가 LOC
+            매수: 전반전(T < 분할수/2) 1회매수금 절반씩 평단 LOC + 별% LOC, 후반전은 전액 별% LOC
+
+    Args:
+        high (array-like): 일별 고가
+        close (array-like): 일별 종가
+        settings (dict): setting.json 내용
+        rsi (array-like, optional): 일별 RSI (신규 진입 필터, NaN 인 초기 구간은 진입하지 않음)
+
+    Returns:
+        dict: RESULT_COLUMNS 이름별 NumPy 배열 (reason은 비트 플래그 정수)
+    """
+    high = np.asarray(high, dtype=np.float64)
+    close = np.asarray(close, dtype=np.float64)
+    highs = high.tolist()
+    closes = close.tolist()
+    n = len(closes)
+
+    initial_capital = float(settings["initial_capital"])
+    num_of_purchases = int(settings["num_of_purchases"])
+    sell_multiplier = float(settings["sell_multiplier"])
+    moc_t = num_of_purchases * float(settings["moc_trigger_rate"])
+    profit_sell_ratio = float(settings["profit_sell_ratio"])
+    rsi_entry_threshold = float(settings.get("rsi_entry_threshold", 100))
+    reinvestment_type = settings.get("reinvestment_type", "simple")
+    compound_ratio = float(settings.get("compound_ratio", 0))
+    half_t = num_of_purchases / 2
+    # 신규 진입 허용 여부 (RSI 가 NaN 인 초기 구간은 비교가 False 라 진입하지 않음)
+    if rsi is None:
+        entry_ok = [True] * n
+    else:
+        entry_ok = (np.asarray(rsi, dtype=np.float64) <= rsi_entry_threshold).tolist()
+
+    # 루프 안에서는 파이썬 리스트에 기록하고 마지막에 한 번에 NumPy 배열로 변환
+    cols = {name: [0] * n for name in RESULT_COLUMNS}
+    o_cycle, o_round, o_t, o_star = cols["cycle"], cols["round"], cols["T"], cols["star_pct"]
+    o_pos, o_avg, o_sell_tp, o_star_tp = cols["position"], cols["avg_price"], cols["sell_target_price"], cols["star_pct_target_price"]
+    o_cash, o_signal, o_reason = cols["cash"], cols["signal"], cols["reason"]
+    o_realized, o_cum_buy = cols["realized_profit_amount"], cols["cumulative_buy_amount"]
+
+    capital = initial_capital
+    cash = initial_capital
+    position = 0
+    avg_price = 0.0
+    cumulative_buy = 0.0
+    realized_total = 0.0
+    cycle_realized = 0.0
+    cycle = 1
+    round_ = 0
+    # 전일 종가 기준으로 계산해 둔 T/별%/목표가 (당일 주문 기준)
+    t = star_pct = sell_tp = star_tp = 0.0
+
+    for i in range(n):
+        h = highs[i]
+        c = closes[i]
+        unit = unit_amount(capital, num_of_purchases)
+        signal = 0
+        reason = 0
+
+        if position == 0:
+            if entry_ok[i]:
+                qty = int(min(unit, cash) // c) if c > 0 else 0
+                if qty > 0:
+                    cost = qty * c
+                    cash -= cost
+                    cumulative_buy += cost
+                    position = qty
+                    avg_price = c
+                    round_ = 1
+                    signal |= SIGNAL_BUY
+                    reason |= REASON_ENTRY
+        else:
+            round_ += 1
+            if t >= moc_t:
+                qty = position - int(position * profit_sell_ratio) or position
+                sells = ((qty, c, REASON_SELL_MOC),)
+                buys = ()
+            else:
+                qty_target = int(position * profit_sell_ratio)
+                qty_star = position - qty_target
+                sells = []
+                if qty_target > 0 and h >= sell_tp:
+                    sells.append((qty_target, sell_tp, REASON_SELL_TARGET))
+                if qty_star > 0 and c >= star_tp:
+                    sells.append((qty_star, c, REASON_SELL_STAR))
+                buy_limit = round(star_tp - 0.01, 2)
+                if t < half_t:
+                    buys = ((unit / 2, avg_price, REASON_BUY_AVG), (unit / 2, buy_limit, REASON_BUY_STAR))
+                else:
+                    buys = ((unit, buy_limit, REASON_BUY_STAR),)
+
+            for qty, price, why in sells:
+                profit = (price - avg_price) * qty
+                cash += qty * price
+                cumulative_buy -= qty * avg_price
+                realized_total += profit
+                cycle_realized += profit
+                position -= qty
+                signal |= SIGNAL_SELL
+                reason |= why
+
+            for amount, limit, why in buys:
+                if c > limit or limit <= 0:
+                    continue
+                qty = int(min(amount, cash) // limit)
+                if qty <= 0:
+                    continue
+                cost = qty * c
+                avg_price = (avg_price * position + cost) / (position + qty)
+                position += qty
+                cash -= cost
+                cumulative_buy += cost
+                signal |= SIGNAL_BUY
+                reason |= why
+
+        o_cycle[i] = cycle
+        o_round[i] = round_
+        if position == 0 and signal & SIGNAL_SELL:
+            # 전량 매도 -> 사이클 종료, 다음 사이클 원금 결정
+            reason |= REASON_CYCLE_END
+            capital = next_capital(capital, cycle_realized, reinvestment_type, compound_ratio)
+            unit = unit_amount(capital, num_of_purchases)
+            cycle += 1
+            round_ = 0
+            cycle_realized = 0.0
+            cumulative_buy = 0.0
+            avg_price = 0.0
+
+        if position:
+            t = calc_t(cumulative_buy, unit)
+            star_pct = calc_star_pct(t, num_of_purchases, sell_multiplier)
+            sell_tp, star_tp = calc_targets(avg_price, star_pct, sell_multiplier)
+        else:
+            t = star_pct = sell_tp = star_tp = 0.0
+
+        o_t[i] = t
+        o_star[i] = star_pct
+        o_pos[i] = position
+        o_avg[i] = avg_price
+        o_sell_tp[i] = sell_tp
+        o_star_tp[i] = star_tp
+        o_cash[i] = cash
+        o_signal[i] = signal
+        o_reason[i] = reason
+        o_realized[i] = realized_total
+        o_cum_buy[i] = cumulative_buy
+
+    result = {
+        name: np.array(values, dtype=np.int64 if name in _INT_COLUMNS else np.float64)
+        for name, values in cols.items()
+    }
+    # 일별 현금/보유수량이 정해지면 나머지 지표는 배열 연산 (고점은 초기 원금부터)
+    position = result["position"]
+    avg = result["avg_price"]
+    value = result["cash"] + position * close
+    peak = np.maximum.accumulate(np.maximum(value, initial_capital))
+    held = position != 0
+    result["portfolio_value"] = value
+    result["position_mdd"] = np.minimum.accumulate(np.minimum((value / peak - 1) * 100, 0.0))
+    result["position_rev_rate"] = np.where(held, (close / np.where(held, avg, 1.0) - 1) * 100, 0.0)
+    result["cumulative_return_rate"] = (value / initial_capital - 1) * 100
+    return result
+
+
+def save_backtest_result(result, dates, symbol, ovrs_excg_cd, instance="backtest"):
+    """
+    백테스트 결과를 strategy_result 테이블에 일괄 저장 (executemany + 배치 트랜잭션)
+
+    Args:
+        instance (str): strategy_result.instance 태그 (실매매 인스턴스와 구분)
+
+    Returns:
+        int: 저장한 행 수
+    """
+    executed_at = np.datetime_as_string(np.asarray(dates, dtype="datetime64[D]")).tolist()
+    n = len(executed_at)
+    columns = [result[name].tolist() for name in RESULT_COLUMNS]
+    reason_idx = RESULT_COLUMNS.index("reason")
+    columns[reason_idx] = [reason_text(code) for code in columns[reason_idx]]
+    rows = zip(executed_at, [instance] * n, [symbol] * n, [ovrs_excg_cd] * n, *columns)
+    return database.insert_strategy_results(rows)
+
+
+def summarize(result):
+    """백테스트 요약 지표 (dict)"""
+    if len(result["cycle"]) == 0:
+        return {}
+    completed = int(np.count_nonzero(result["reason"] & REASON_CYCLE_END))
+    return {
+        "days": len(result["cycle"]),
+        "completed_cycles": completed,
+        "max_T": float(result["T"].max()),
+        "final_portfolio_value": float(result["portfolio_value"][-1]),
+        "realized_profit_amount": float(result["realized_profit_amount"][-1]),
+        "cumulative_return_rate": float(result["cumulative_return_rate"][-1]),
+        "position_mdd": float(result["position_mdd"].min()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="무한매수법 v3.0 백테스트")
+    parser.add_argument("csv", nargs="?", help="일봉 CSV 경로 (Date,Open,High,Low,Close,Volume, 생략 시 가격 저장소)")
+    parser.add_argument("--setting", default="setting.json", help="세팅 파일 경로")
+    parser.add_argument("--save", action="store_true", help="strategy_result 테이블에 저장")
+    args = parser.parse_args()
+
+    settings = load_settings(args.setting)
+    bars = load_bars(args.csv, settings)
+
+    started = time.perf_counter()
+    rsi = entry_rsi(bars["close"], settings)
+    result = run_backtest(bars["high"], bars["close"], settings, rsi)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    log_print(f"[bold cyan]📈 {settings.get('symbol')} 백테스트 완료 ({len(bars['close'])}일, {elapsed_ms:.1f}ms)[/bold cyan]")
+    for key, value in summarize(result).items():
+        log_print(f"\t{key}: {value:,.2f}" if isinstance(value, float) else f"\t{key}: {value}")
+
+    if args.save:
+        saved = save_backtest_result(result, bars["date"], settings.get("symbol"), settings.get("ovrs_excg_cd"))
+        log_print(f"[bold green]strategy_result 테이블에 {saved}건 저장했습니다.[/bold green]")
+
+
+if __name__ == "__main__":
+    main()
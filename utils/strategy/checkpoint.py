@@ -0,0 +1,274 @@
+import json
+import numpy as np
+from utils import database
+from utils.kis_tr.models import to_decimal
+from utils.log_print import log_print
+from utils.strategy.infinite_buying import next_capital
+from utils.strategy.rsi import WilderRSI
+
+# 전략 상태 체크포인트
+# strategy_result 행을 저장할 때 같은 트랜잭션으로 인스턴스별 상태 1행(strategy_checkpoint)을 덮어씁니다.
+# 재시작 시에는 체크포인트 1행을 읽고 그 뒤에 생긴 체결(fills.id > fill_id)과 일봉(bar_date 이후)만 반영하므로
+# strategy_result / fills / 일봉 이력이 몇 년치로 늘어나도 복구 비용은 마지막 체크포인트 이후 분량에만 비례합니다.
+# 체결 반영 규칙(현금/평단/누적매수금/실현손익/사이클 종료)은 run_backtest 와 같습니다.
+# 현금은 매수금을 빼고 매도금을 더한 실제 잔액이라 평가금액/고점/MDD 에 실현손익이 포함됩니다.
+
+CHECKPOINT_COLUMNS = (
+    "instance", "strategy_result_id", "fill_id", "bar_date", "cycle", "round", "T", "star_pct",
+    "capital", "position", "avg_price", "cumulative_buy_amount", "realized_profit_amount",
+    "cycle_realized_amount", "peak_value", "position_mdd", "cash", "rsi_state",
+)
+
+UPSERT_CHECKPOINT_SQL = (
+    f"INSERT OR REPLACE INTO strategy_checkpoint ({', '.join(CHECKPOINT_COLUMNS)}, updated_at) "
+    f"VALUES ({', '.join('?' * len(CHECKPOINT_COLUMNS))}, CURRENT_TIMESTAMP)"
+)
+
+# 체크포인트가 없을 때 기본값 (새 인스턴스)
+_DEFAULTS = {
+    "strategy_result_id": None,
+    "fill_id": 0,
+    "bar_date": None,
+    "cycle": 1,
+    "round": 0,
+    "T": 0.0,
+    "star_pct": 0.0,
+    "capital": 0.0,
+    "position": 0,
+    "avg_price": 0.0,
+    "cumulative_buy_amount": 0.0,
+    "realized_profit_amount": 0.0,
+    "cycle_realized_amount": 0.0,
+    "peak_value": 0.0,
+    "position_mdd": 0.0,
+    "cash": None,       # None: 현금 컬럼이 없던 체크포인트 (restore 에서 with_cash 로 채움)
+}
+
+
+class StrategyState:
+    """
+    전략 인스턴스 1개의 이어서 계산할 상태 (strategy_checkpoint 1행)
+
+    사용 예시:
+        state = load_checkpoints(["12345678-01:SOXL"]).get("12345678-01:SOXL") or StrategyState.initial(instance_id, settings)
+        state.catch_up_bars(store, "SOXL", "AMEX")
+        state.apply_fill("buy", 10, 23.41, settings)
+    """
+
+    __slots__ = ("instance",) + tuple(_DEFAULTS) + ("rsi",)
+
+    def __init__(self, instance, rsi=None, **values):
+        self.instance = instance
+        for name, default in _DEFAULTS.items():
+            setattr(self, name, values.get(name, default))
+        self.rsi = rsi      # WilderRSI (진입 필터가 없으면 None)
+
+    @classmethod
+    def initial(cls, instance, settings, fill_id=0, last_row=None):
+        """
+        체크포인트가 없는 인스턴스 상태
+
+        이전 버전이 남긴 최신 strategy_result 행(last_row)이 있으면 사이클/회차/실현손익/MDD 를 이어받고,
+        fill_id 이하 체결은 이미 반영된 것으로 봅니다.
+        """
+        initial_capital = float(settings["initial_capital"])
+        state = cls(instance, fill_id=fill_id, capital=initial_capital, peak_value=initial_capital)
+        if last_row:
+            state.cycle = last_row.get("cycle") or 1
+            state.round = last_row.get("round") or 0
+            state.position = int(last_row.get("position") or 0)
+            state.avg_price = last_row.get("avg_price") or 0.0
+            state.cumulative_buy_amount = last_row.get("cumulative_buy_amount") or 0.0
+            state.realized_profit_amount = last_row.get("realized_profit_amount") or 0.0
+            state.position_mdd = last_row.get("position_mdd") or 0.0
+            state.peak_value = max(initial_capital, last_row.get("portfolio_value") or 0.0)
+            if settings.get("reinvestment_type") == "compound":
+                state.capital += state.realized_profit_amount * float(settings.get("compound_ratio", 0)) / 100
+        return state.with_cash(settings)
+
+    @classmethod
+    def from_row(cls, row):
+        values = dict(zip(CHECKPOINT_COLUMNS, row))
+        rsi_state = values.pop("rsi_state")
+        rsi = WilderRSI.from_state(json.loads(rsi_state)) if rsi_state else None
+        return cls(values.pop("instance"), rsi, **values)
+
+    def to_row(self):
+        """CHECKPOINT_COLUMNS 순서 tuple"""
+        rsi_state = json.dumps(self.rsi.state()) if self.rsi is not None else None
+        return (self.instance,) + tuple(getattr(self, name) for name in _DEFAULTS) + (rsi_state,)
+
+    def with_cash(self, settings):
+        """
+        현금 잔액이 없으면 (이전 버전 상태) 초기 원금 + 실현손익 - 보유분 매수금으로 채움
+
+        매도 시 누적매수금에서 평단 * 수량을 빼므로 이 값은 체결마다 더하고 뺀 현금과 같습니다.
+        """
+        if self.cash is None:
+            self.cash = float(settings["initial_capital"]) + self.realized_profit_amount - self.cumulative_buy_amount
+        return self
+
+    def value(self, price):
+        """평가금액 = 현금 + 보유수량 * price"""
+        return self.cash + self.position * price
+
+    # ------------------------------------------------------------------ 체결/일봉 반영
+
+    def apply_fill(self, side, qty, price, settings):
+        """체결 1건 반영 -> 사이클이 끝났으면 True"""
+        if side == "buy":
+            cost = qty * price
+            self.avg_price = (self.avg_price * self.position + cost) / (self.position + qty)
+            self.position += qty
+            self.cumulative_buy_amount += cost
+            self.cash -= cost
+            return False
+        qty = min(qty, self.position)
+        profit = (price - self.avg_price) * qty
+        self.realized_profit_amount += profit
+        self.cycle_realized_amount += profit
+        self.cumulative_buy_amount -= qty * self.avg_price
+        self.cash += qty * price
+        self.position -= qty
+        if self.position == 0 and qty:
+            self.end_cycle(settings)
+            return True
+        return False
+
+    def end_cycle(self, settings):
+        """전량 매도 -> 다음 사이클 원금 결정 후 사이클/회차 초기화"""
+        self.capital = next_capital(
+            self.capital, self.cycle_realized_amount,
+            settings.get("reinvestment_type", "simple"), float(settings.get("compound_ratio", 0)),
+        )
+        self.cycle += 1
+        self.round = 0
+        self.cycle_realized_amount = 0.0
+        self.cumulative_buy_amount = 0.0
+        self.avg_price = 0.0
+
+    def sync_position(self, position, avg_price, settings):
+        """
+        잔고 기준 보유수량/평단에 맞춤 (체결 기록 밖에서 바뀐 보유분 보정)
+
+        수량이 같으면 평단만 잔고 값으로 바꾸고, 수량이 다르면 누적매수금을 수량 * 평단으로 다시 잡습니다.
+        체결 기록 없이 0이 되었으면 (실현손익을 모르는 채로) 사이클을 끝냅니다.
+        기록 밖 매매는 체결가를 모르므로 현금은 매수금 차이(= 평단 거래로 본 금액)만큼 옮깁니다.
+        """
+        if position == self.position:
+            if position:
+                self.avg_price = avg_price
+            return
+        log_print(
+            f"{self.instance} 체크포인트 보유수량 {self.position} -> 잔고 {position} 으로 보정",
+            level="debug", instance=self.instance, checkpoint_qty=self.position, holdings_qty=position,
+        )
+        if not position:
+            self.cash += self.cumulative_buy_amount
+            self.position = 0
+            self.end_cycle(settings)
+            return
+        self.cash -= position * avg_price - self.cumulative_buy_amount
+        self.position = position
+        self.avg_price = avg_price
+        self.cumulative_buy_amount = position * avg_price
+
+    def mark(self, value):
+        """평가금액으로 고점/MDD 갱신"""
+        if value > self.peak_value:
+            self.peak_value = value
+        drawdown = (value / self.peak_value - 1) * 100 if self.peak_value > 0 else 0.0
+        if drawdown < self.position_mdd:
+            self.position_mdd = drawdown
+
+    def catch_up_bars(self, store, symbol, ovrs_excg_cd):
+        """
+        bar_date 이후 일봉만 반영 (고점/MDD, RSI) -> 반영한 봉 수
+
+        bar_date 가 없으면 (새 상태) 과거 일봉을 다시 돌리지 않고 마지막 날짜만 기록합니다.
+        """
+        if self.bar_date is None:
+            last = store.last_time(symbol, ovrs_excg_cd)
+            self.bar_date = str(last) if last is not None else None
+            return 0
+        bars = store.load(symbol, ovrs_excg_cd, start=np.datetime64(self.bar_date) + 1)
+        closes = bars["close"]
+        if not len(closes):
+            return 0
+        for close in closes.tolist():
+            self.mark(self.value(close))
+            if self.rsi is not None:
+                self.rsi.update(close)
+        self.bar_date = str(bars["date"][-1])
+        return len(closes)
+
+    def seed_rsi(self, store, symbol, ovrs_excg_cd, period):
+        """
+        RSI 상태가 없거나 기간이 바뀌었으면 저장된 일봉 전체로 새로 계산 (최초 1번)
+
+        이후로는 체크포인트의 RSI 상태에 catch_up_bars 로 새 일봉만 더합니다.
+        """
+        if self.rsi is not None and self.rsi.period == period:
+            return
+        bars = store.load(symbol, ovrs_excg_cd)
+        self.rsi = WilderRSI.from_prices(bars["close"], period)
+        self.bar_date = str(bars["date"][-1]) if len(bars["date"]) else None
+
+    def __repr__(self):
+        return (
+            f"StrategyState({self.instance} cycle={self.cycle} round={self.round} qty={self.position} "
+            f"avg={self.avg_price:.4f} cash={self.cash} fill_id={self.fill_id} bar_date={self.bar_date})"
+        )
+
+
+def load_checkpoints(instance_ids):
+    """인스턴스별 체크포인트 (한 번의 PK 조회) -> {instance: StrategyState}"""
+    if not instance_ids:
+        return {}
+    placeholders = ", ".join("?" * len(instance_ids))
+    rows = database.fetchall(
+        f"SELECT {', '.join(CHECKPOINT_COLUMNS)} FROM strategy_checkpoint WHERE instance IN ({placeholders})",
+        tuple(instance_ids),
+    )
+    return {row[0]: StrategyState.from_row(row) for row in rows}
+
+
+def last_fill_id():
+    """지금까지 기록된 마지막 체결 id (없으면 0)"""
+    return database.fetchone("SELECT COALESCE(MAX(id), 0) FROM fills")[0]
+
+
+def load_fills(after_id):
+    """
+    after_id 이후 체결 -> (마지막 id, {(account, ovrs_excg_cd, symbol): [(id, side, qty, price), ...]})
+
+    id 순서(= 반영 순서)로 모든 계좌/종목 체결을 한 번에 읽습니다.
+    """
+    rows = database.fetchall(
+        "SELECT id, account, ovrs_excg_cd, symbol, side, qty, price FROM fills WHERE id > ? ORDER BY id",
+        (after_id,),
+    )
+    fills = {}
+    for fill_id, account, ovrs_excg_cd, symbol, side, qty, price in rows:
+        fills.setdefault((account, ovrs_excg_cd, symbol), []).append((fill_id, side, qty, float(to_decimal(price))))
+    return (rows[-1][0] if rows else after_id), fills
+
+
+def save_checkpoints(rows, states):
+    """
+    strategy_result 행 + 체크포인트를 한 트랜잭션으로 저장
+
+    Args:
+        rows (list[tuple]): STRATEGY_RESULT_COLUMNS 순서의 행
+        states (list[StrategyState]): rows 와 같은 순서의 상태 (strategy_result_id 가 저장한 행 id 로 바뀜)
+
+    Returns:
+        int: 저장한 행 수
+    """
+    if not rows:
+        return 0
+    with database.transaction() as conn:
+        for row, state in zip(rows, states):
+            state.strategy_result_id = conn.execute(database.INSERT_STRATEGY_RESULT_SQL, row).lastrowid
+        conn.executemany(UPSERT_CHECKPOINT_SQL, [state.to_row() for state in states])
+    return len(rows)
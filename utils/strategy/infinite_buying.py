@@ -0,0 +1,188 @@
+import json
+import math
+import os
+
+# 무한매수법 v3.0 규칙 모음
+# setting.json 값을 해석해서 1회매수금, T, 별%, 목표가 등을 계산합니다.
+# 백테스트/실매매가 같은 규칙을 쓰도록 계산식은 모두 이 파일에만 둡니다.
+
+# signal 컬럼 값 (비트 플래그, 같은 날 매수/매도가 모두 체결되면 3)
+SIGNAL_NONE = 0
+SIGNAL_BUY = 1
+SIGNAL_SELL = 2
+
+# reason 컬럼 값 (비트 플래그 -> 문자열)
+REASON_ENTRY = 1          # 신규 사이클 진입 매수
+REASON_BUY_AVG = 2        # 평단 LOC 매수
+REASON_BUY_STAR = 4       # 별% LOC 매수
+REASON_SELL_TARGET = 8    # 목표가 지정가 매도
+REASON_SELL_STAR = 16     # 별% LOC 매도
+REASON_SELL_MOC = 32      # 소진 임박 MOC 매도
+REASON_CYCLE_END = 64     # 전량 매도 -> 사이클 종료
+
+REASON_LABELS = (
+    (REASON_ENTRY, "신규진입"),
+    (REASON_BUY_AVG, "평단LOC매수"),
+    (REASON_BUY_STAR, "별%LOC매수"),
+    (REASON_SELL_TARGET, "목표가매도"),
+    (REASON_SELL_STAR, "별%LOC매도"),
+    (REASON_SELL_MOC, "MOC매도"),
+    (REASON_CYCLE_END, "사이클종료"),
+)
+
+SETTING_KEYS = (
+    "initial_capital",
+    "num_of_purchases",
+    "sell_multiplier",
+    "moc_trigger_rate",
+    "profit_sell_ratio",
+    "rsi_period",
+    "rsi_entry_threshold",
+    "reinvestment_type",
+    "compound_ratio",
+)
+
+
+def load_settings(path="setting.json"):
+    """setting.json 로드 (필수 키가 없으면 ValueError)"""
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"{path} 파일이 존재하지 않습니다.")
+    with open(path, "r") as f:
+        settings = json.load(f)
+    missing = [key for key in SETTING_KEYS if settings.get(key) is None]
+    if missing:
+        raise ValueError(f"설정값이 누락되었습니다: {', '.join(missing)}")
+    return settings
+
+
+def reason_text(code):
+    """reason 비트 플래그를 strategy_result.reason 문자열로 변환"""
+    if not code:
+        return ""
+    return ",".join(label for flag, label in REASON_LABELS if code & flag)
+
+
+def unit_amount(capital, num_of_purchases):
+    """1회매수금 = 원금 / 분할수"""
+    return capital / num_of_purchases
+
+
+def calc_t(cumulative_buy_amount, unit):
+    """T = 누적매수금 / 1회매수금 (소수 둘째자리 올림)"""
+    if unit <= 0:
+        return 0.0
+    return math.ceil(round(cumulative_buy_amount / unit * 100, 6)) / 100
+
+
+def calc_star_pct(t, num_of_purchases, sell_multiplier):
+    """
+    별% 계산
+
+    목표수익률(sell_multiplier - 1)에서 시작해 T가 분할수의 절반일 때 0%,
+    분할수만큼 소진되면 -목표수익률이 되도록 선형으로 줄어듭니다.
+    (v3.0 40분할 기준: 목표 10% -> 별% = 10 - 0.5T)
+    """
+    target_pct = (sell_multiplier - 1) * 100
+    return target_pct * (1 - 2 * t / num_of_purchases)
+
+
+def calc_targets(avg_price, star_pct, sell_multiplier):
+    """(목표 매도가, 별% 지점가) 반환 - 호가 단위에 맞게 센트 반올림"""
+    if avg_price <= 0:
+        return 0.0, 0.0
+    sell_target_price = round(avg_price * sell_multiplier, 2)
+    star_pct_target_price = round(avg_price * (1 + star_pct / 100), 2)
+    return sell_target_price, star_pct_target_price
+
+
+def next_capital(capital, realized_profit, reinvestment_type, compound_ratio):
+    """
+    사이클 종료 후 다음 사이클 원금 계산
+
+    simple  : 원금 고정 (수익은 현금으로만 쌓임)
+    compound: 이번 사이클 실현손익의 compound_ratio% 만큼 원금에 반영
+    """
+    if reinvestment_type == "compound":
+        return capital + realized_profit * compound_ratio / 100
+    return capital
+
+
+# KIS 미국주식 주문구분 (ORD_DVSN)
+ORD_DVSN_LIMIT = "00"   # 지정가
+ORD_DVSN_MOC = "33"     # 장마감시장가 (매도만)
+ORD_DVSN_LOC = "34"     # 장마감지정가
+
+
+def plan_orders(position, avg_price, capital, cash, last_price, settings, rsi=None):
+    """
+    다음 장마감 주문 계획 (실매매용, run_backtest 와 같은 규칙)
+
+    Args:
+        position (int): 보유수량
+        avg_price (float): 평단
+        capital (float): 현재 사이클 원금 (1회매수금 = capital / num_of_purchases)
+        cash (float): 사용 가능 현금
+        last_price (float): 직전 가격 (신규 진입 수량 계산용)
+        settings (dict): setting.json 내용
+        rsi (float, optional): 현재 RSI (주어지면 rsi <= rsi_entry_threshold 일 때만 신규 진입)
+
+    Returns:
+        dict: T, star_pct, sell_target_price, star_pct_target_price, signal, reason,
+              orders(list[dict]: side, qty, price, ord_type, reason)
+    """
+    num_of_purchases = int(settings["num_of_purchases"])
+    sell_multiplier = float(settings["sell_multiplier"])
+    profit_sell_ratio = float(settings["profit_sell_ratio"])
+    unit = unit_amount(capital, num_of_purchases)
+    orders = []
+
+    if position <= 0:
+        # 신규 진입: 종가 체결을 위해 목표가 수준의 넉넉한 LOC 매수
+        limit = round(last_price * sell_multiplier, 2)
+        qty = int(min(unit, cash) // limit) if limit > 0 else 0
+        if rsi is not None and rsi > float(settings.get("rsi_entry_threshold", 100)):
+            qty = 0
+        if qty > 0:
+            orders.append({"side": "buy", "qty": qty, "price": limit, "ord_type": ORD_DVSN_LOC, "reason": REASON_ENTRY})
+        t = star_pct = sell_tp = star_tp = 0.0
+    else:
+        t = calc_t(position * avg_price, unit)
+        star_pct = calc_star_pct(t, num_of_purchases, sell_multiplier)
+        sell_tp, star_tp = calc_targets(avg_price, star_pct, sell_multiplier)
+
+        if t >= num_of_purchases * float(settings["moc_trigger_rate"]):
+            qty = position - int(position * profit_sell_ratio) or position
+            orders.append({"side": "sell", "qty": qty, "price": 0.0, "ord_type": ORD_DVSN_MOC, "reason": REASON_SELL_MOC})
+        else:
+            qty_target = int(position * profit_sell_ratio)
+            qty_star = position - qty_target
+            if qty_target > 0:
+                orders.append({"side": "sell", "qty": qty_target, "price": sell_tp, "ord_type": ORD_DVSN_LIMIT, "reason": REASON_SELL_TARGET})
+            if qty_star > 0:
+                orders.append({"side": "sell", "qty": qty_star, "price": star_tp, "ord_type": ORD_DVSN_LOC, "reason": REASON_SELL_STAR})
+
+            buy_limit = round(star_tp - 0.01, 2)
+            if t < num_of_purchases / 2:
+                buys = ((unit / 2, round(avg_price, 2), REASON_BUY_AVG), (unit / 2, buy_limit, REASON_BUY_STAR))
+            else:
+                buys = ((unit, buy_limit, REASON_BUY_STAR),)
+            for amount, limit, why in buys:
+                qty = int(min(amount, cash) // limit) if limit > 0 else 0
+                if qty > 0:
+                    cash -= qty * limit
+                    orders.append({"side": "buy", "qty": qty, "price": limit, "ord_type": ORD_DVSN_LOC, "reason": why})
+
+    signal = SIGNAL_NONE
+    reason = 0
+    for order in orders:
+        signal |= SIGNAL_BUY if order["side"] == "buy" else SIGNAL_SELL
+        reason |= order["reason"]
+    return {
+        "T": t,
+        "star_pct": star_pct,
+        "sell_target_price": sell_tp,
+        "star_pct_target_price": star_tp,
+        "signal": signal,
+        "reason": reason,
+        "orders": orders,
+    }
@@ -0,0 +1,387 @@
+import argparse
+import math
+import time
+import numpy as np
+from utils.log_print import log_print
+from utils.strategy.backtest import load_bars
+from utils.strategy.infinite_buying import load_settings
+from utils.strategy.rsi import wilder_rsi_paths
+
+# 무한매수법 몬테카를로 스트레스 시뮬레이션
+# 합성 가격 경로 수천 개를 만들고 run_backtest 와 같은 일별 규칙을 모든 경로에 동시에 적용합니다.
+# 상태(보유수량/평단/현금/T ...)는 경로 수 길이의 NumPy 배열이고 하루마다 배열 연산 몇십 번으로 전 경로를 진행합니다.
+# 경로는 chunk_size 개씩 만들어 시뮬레이션하므로 메모리는 경로 수와 상관없이 일정합니다.
+#
+# 가격 모델
+#   bootstrap : 과거 일봉의 (로그수익률, 고가/종가 비율)을 block 일 단위로 이어 붙임 (변동성 군집 유지)
+#   gbm       : 기하 브라운 운동, 일중 고가는 브라운 브리지 최대값 분포로 생성
+#   jump      : gbm + 시가 갭 점프 (Merton, 연 jump_intensity 회, 로그 점프 ~ N(jump_mean, jump_std))
+# vol_scale 로 변동성 국면(예: 0.75 / 1.0 / 1.5배)을 바꿔 가며 같은 세팅을 시험합니다.
+
+TRADING_DAYS = 252
+MODELS = ("bootstrap", "gbm", "jump")
+PERCENTILES = (5, 25, 50, 75, 95)
+
+
+# ------------------------------------------------------------------ 가격 경로
+
+
+def historical_returns(high, close):
+    """과거 일봉 -> (일별 로그수익률, 일별 log(고가/종가) >= 0)"""
+    close = np.asarray(close, dtype=np.float64)
+    high = np.maximum(np.asarray(high, dtype=np.float64), close)
+    returns = np.diff(np.log(close))
+    high_ratio = np.log(high[1:] / close[1:])
+    return returns, high_ratio
+
+
+def estimate_params(close):
+    """과거 종가 -> (연 기대수익률 mu, 연 변동성 sigma) - GBM 기본값용"""
+    returns = np.diff(np.log(np.asarray(close, dtype=np.float64)))
+    sigma = float(returns.std(ddof=1)) * math.sqrt(TRADING_DAYS)
+    mu = float(returns.mean()) * TRADING_DAYS + sigma ** 2 / 2
+    return mu, sigma
+
+
+def bootstrap_paths(returns, high_ratio, n_paths, n_days, s0, rng, block=20, vol_scale=1.0):
+    """
+    블록 부트스트랩 경로 -> (high, close) 각각 (n_paths, n_days)
+
+    vol_scale 은 평균 주변 편차(로그수익률)와 고가 비율을 같은 배수로 늘리거나 줄입니다.
+    """
+    block = max(1, min(int(block), len(returns)))
+    n_blocks = -(-n_days // block)
+    starts = rng.integers(0, len(returns) - block + 1, size=(n_paths, n_blocks))
+    index = (starts[:, :, None] + np.arange(block)).reshape(n_paths, -1)[:, :n_days]
+    log_returns = returns[index]
+    if vol_scale != 1.0:
+        mean = returns.mean()
+        log_returns = mean + (log_returns - mean) * vol_scale
+    close = s0 * np.exp(np.cumsum(log_returns, axis=1))
+    high = close * np.exp(high_ratio[index] * vol_scale)
+    return high, close
+
+
+def gbm_paths(n_paths, n_days, s0, mu, sigma, rng, jump_intensity=0.0, jump_mean=0.0, jump_std=0.0):
+    """
+    GBM(+점프) 경로 -> (high, close) 각각 (n_paths, n_days)
+
+    점프는 시가 갭으로 보고 (시가 = 전일 종가 * e^J), 시가 -> 종가 구간의 확산만 브라운 브리지로 고가를 뽑습니다.
+    """
+    dt = 1.0 / TRADING_DAYS
+    drift = (mu - sigma ** 2 / 2) * dt
+    diffusion = drift + sigma * math.sqrt(dt) * rng.standard_normal((n_paths, n_days))
+    if jump_intensity > 0:
+        count = rng.poisson(jump_intensity * dt, (n_paths, n_days))
+        jumps = count * jump_mean + np.sqrt(count) * jump_std * rng.standard_normal((n_paths, n_days))
+        # 점프 보정: 기대 수익률이 mu 로 유지되도록 drift 에서 점프 기대값을 뺌
+        jumps -= jump_intensity * dt * (math.exp(jump_mean + jump_std ** 2 / 2) - 1)
+    else:
+        jumps = 0.0
+    log_close = np.cumsum(diffusion + jumps, axis=1)
+    log_open = log_close - diffusion
+    # 브라운 브리지 최대값: (a + b + sqrt((b - a)^2 - 2 s^2 dt ln U)) / 2
+    u = 1.0 - rng.random((n_paths, n_days))
+    log_high = (log_open + log_close + np.sqrt(diffusion ** 2 - 2 * sigma ** 2 * dt * np.log(u))) / 2
+    return s0 * np.exp(log_high), s0 * np.exp(log_close)
+
+
+# ------------------------------------------------------------------ 시뮬레이션
+
+
+def _round2(values):
+    """센트 반올림 (calc_targets 의 round(x, 2) 와 같은 역할)"""
+    return np.round(values, 2)
+
+
+def _floor_div(a, b):
+    """
+    a // b (파이썬 float // 와 같은 결과)
+
+    np.floor_divide 는 나머지까지 계산해서 느리므로 floor(a / b) 로 구하고,
+    나눗셈이 정수 쪽으로 반올림됐을 수 있는 (정수에 아주 가까운) 값만 np.floor_divide 로 다시 계산합니다.
+    """
+    quotient = a / b
+    out = np.floor(quotient)
+    near = quotient - out < 1e-9
+    if near.any():
+        out[near] = np.floor_divide(a[near], b[near])
+    return out
+
+
+def simulate_paths(high, close, settings, rsi=None):
+    """
+    여러 가격 경로에 무한매수법 v3.0 규칙을 동시에 적용 (run_backtest 와 같은 일별 규칙)
+
+    Args:
+        high, close (ndarray): (경로 수, 일수) 일별 고가/종가
+        settings (dict): setting.json 내용
+        rsi (ndarray, optional): (경로 수, 일수) 신규 진입 필터용 RSI
+
+    Returns:
+        dict: 경로별 NumPy 배열
+            cumulative_return_rate  마지막 날 누적수익률(%)
+            position_mdd            최대 낙폭(%)
+            completed_cycles        완료 사이클 수
+            exhaustions             소진(MOC 손절) 횟수
+            exhaustion_cycle        처음 소진된 사이클 번호 (소진 없으면 NaN)
+            exhaustion_day          처음 소진된 날 인덱스 (소진 없으면 -1)
+            max_T                   최대 T
+    """
+    high = np.asarray(high, dtype=np.float64)
+    close = np.asarray(close, dtype=np.float64)
+    n_paths, n_days = close.shape
+
+    initial_capital = float(settings["initial_capital"])
+    num_of_purchases = int(settings["num_of_purchases"])
+    sell_multiplier = float(settings["sell_multiplier"])
+    moc_t = num_of_purchases * float(settings["moc_trigger_rate"])
+    profit_sell_ratio = float(settings["profit_sell_ratio"])
+    rsi_entry_threshold = float(settings.get("rsi_entry_threshold", 100))
+    compound = settings.get("reinvestment_type", "simple") == "compound"
+    compound_ratio = float(settings.get("compound_ratio", 0))
+    half_t = num_of_purchases / 2
+    target_pct = (sell_multiplier - 1) * 100
+
+    capital = np.full(n_paths, initial_capital)
+    cash = np.full(n_paths, initial_capital)
+    position = np.zeros(n_paths)          # 정수 수량 (float64 로 보관해 형 변환 없이 계산)
+    avg_price = np.zeros(n_paths)
+    cumulative_buy = np.zeros(n_paths)
+    cycle_realized = np.zeros(n_paths)
+    cycle = np.ones(n_paths)
+    peak = np.full(n_paths, initial_capital)
+    mdd = np.zeros(n_paths)
+    t = np.zeros(n_paths)
+    sell_tp = np.zeros(n_paths)
+    star_tp = np.zeros(n_paths)
+    max_t = np.zeros(n_paths)
+    completed = np.zeros(n_paths, dtype=np.int64)
+    exhaustions = np.zeros(n_paths, dtype=np.int64)
+    exhaustion_cycle = np.full(n_paths, np.nan)
+    exhaustion_day = np.full(n_paths, -1, dtype=np.int64)
+    value = cash.copy()
+
+    def _buy(active, amount, limit, c):
+        """지정가 limit 이하 종가 체결 매수 (active 경로만, 상태 배열을 제자리 갱신)"""
+        index = np.flatnonzero(active & (c <= limit) & (limit > 0))
+        if not index.size:
+            return
+        qty = _floor_div(np.minimum(amount[index], cash[index]), limit[index])
+        bought = qty > 0
+        index, qty = index[bought], qty[bought]
+        cost = qty * c[index]
+        held_qty = position[index]
+        avg_price[index] = (avg_price[index] * held_qty + cost) / (held_qty + qty)
+        position[index] = held_qty + qty
+        cash[index] -= cost
+        cumulative_buy[index] += cost
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for i in range(n_days):
+            h = high[:, i]
+            c = close[:, i]
+            unit = capital / num_of_purchases
+            flat = position == 0
+            held = ~flat
+
+            # 신규 진입 (종가 매수)
+            can_enter = flat if rsi is None else flat & (rsi[:, i] <= rsi_entry_threshold)
+            index = np.flatnonzero(can_enter & (c > 0))
+            if index.size:
+                price = c[index]
+                qty = _floor_div(np.minimum(unit[index], cash[index]), price)
+                entered = qty > 0
+                index, qty, price = index[entered], qty[entered], price[entered]
+                cost = qty * price
+                cash[index] -= cost
+                cumulative_buy[index] += cost
+                position[index] = qty
+                avg_price[index] = price
+
+            # 매도 (소진 임박이면 MOC, 아니면 목표가 지정가 + 별% LOC)
+            moc = held & (t >= moc_t)
+            normal = held & ~moc
+            qty_target = np.floor(position * profit_sell_ratio)
+            qty_star = position - qty_target
+            qty_moc = np.where(qty_star > 0, qty_star, position)
+            sell_target = normal & (qty_target > 0) & (h >= sell_tp)
+            sell_star = normal & (qty_star > 0) & (c >= star_tp)
+            sold_qty = (np.where(moc, qty_moc, 0.0) + np.where(sell_target, qty_target, 0.0)
+                        + np.where(sell_star, qty_star, 0.0))
+            proceeds = (np.where(moc | sell_star, np.where(moc, qty_moc, qty_star) * c, 0.0)
+                        + np.where(sell_target, qty_target * sell_tp, 0.0))
+            sold = sold_qty > 0
+            sold_cost = sold_qty * avg_price
+            cash += proceeds
+            cumulative_buy -= sold_cost
+            cycle_realized += proceeds - sold_cost
+            position -= sold_qty
+
+            if moc.any():
+                first = moc & (exhaustions == 0)
+                exhaustion_cycle = np.where(first, cycle, exhaustion_cycle)
+                exhaustion_day = np.where(first, i, exhaustion_day)
+                exhaustions += moc
+
+            # 매수 (전반전: 평단 LOC + 별% LOC 반씩, 후반전: 별% LOC 전액)
+            buy_limit = _round2(star_tp - 0.01)
+            first_half = normal & (t < half_t)
+            second_half = normal & ~first_half
+            if first_half.any():
+                half_unit = unit / 2
+                _buy(first_half, half_unit, avg_price.copy(), c)
+                _buy(first_half, half_unit, buy_limit, c)
+            if second_half.any():
+                _buy(second_half, unit, buy_limit, c)
+
+            # 전량 매도 -> 사이클 종료
+            cycle_end = sold & (position == 0)
+            if cycle_end.any():
+                if compound:
+                    capital = np.where(cycle_end, capital + cycle_realized * compound_ratio / 100, capital)
+                cycle += cycle_end
+                completed += cycle_end
+                cycle_realized[cycle_end] = 0.0
+                cumulative_buy[cycle_end] = 0.0
+                avg_price[cycle_end] = 0.0
+
+            value = cash + position * c
+            peak = np.maximum(peak, value)
+            mdd = np.minimum(mdd, (value / peak - 1) * 100)
+
+            # 다음 날 주문 기준 (T/별%/목표가)
+            held = position > 0
+            t = np.where(held, np.ceil(np.round(cumulative_buy / unit * 100, 6)) / 100, 0.0)
+            star_pct = target_pct * (1 - 2 * t / num_of_purchases)
+            sell_tp = np.where(held & (avg_price > 0), _round2(avg_price * sell_multiplier), 0.0)
+            star_tp = np.where(held & (avg_price > 0), _round2(avg_price * (1 + star_pct / 100)), 0.0)
+            max_t = np.maximum(max_t, t)
+
+    return {
+        "cumulative_return_rate": (value / initial_capital - 1) * 100,
+        "position_mdd": mdd,
+        "completed_cycles": completed,
+        "exhaustions": exhaustions,
+        "exhaustion_cycle": exhaustion_cycle,
+        "exhaustion_day": exhaustion_day,
+        "max_T": max_t,
+    }
+
+
+def run_monte_carlo(settings, model="bootstrap", n_paths=10000, years=5, seed=None, chunk_size=2000,
+                    history=None, s0=None, vol_scale=1.0, block=20, mu=None, sigma=None,
+                    jump_intensity=4.0, jump_mean=-0.05, jump_std=0.1):
+    """
+    합성 경로 n_paths 개 시뮬레이션 -> simulate_paths 결과를 모든 경로로 이어 붙인 dict
+
+    Args:
+        settings (dict): setting.json 내용
+        model (str): 'bootstrap' / 'gbm' / 'jump'
+        history (dict, optional): 과거 일봉 (high/close) - bootstrap 필수, gbm/jump 는 mu/sigma/s0 기본값 추정용
+        s0 (float, optional): 시작 가격 (기본: 과거 마지막 종가)
+        vol_scale (float): 변동성 배수 (bootstrap 은 편차, gbm/jump 는 sigma/jump_std 에 곱함)
+        chunk_size (int): 한 번에 만들어 시뮬레이션할 경로 수 (메모리 상한)
+    """
+    if model not in MODELS:
+        raise ValueError(f"알 수 없는 모델: {model} ({', '.join(MODELS)})")
+    n_days = int(round(years * TRADING_DAYS))
+    rng = np.random.default_rng(seed)
+
+    if history is not None and len(history["close"]) > 1:
+        s0 = s0 or float(history["close"][-1])
+        estimated_mu, estimated_sigma = estimate_params(history["close"])
+        mu = estimated_mu if mu is None else mu
+        sigma = estimated_sigma if sigma is None else sigma
+        returns, high_ratio = historical_returns(history["high"], history["close"])
+    elif model == "bootstrap":
+        raise ValueError("bootstrap 모델은 과거 일봉이 필요합니다.")
+    if s0 is None or mu is None or sigma is None:
+        raise ValueError("gbm/jump 모델은 과거 일봉이 없으면 s0, mu, sigma 를 지정해야 합니다.")
+
+    rsi_period = int(settings.get("rsi_period", 14))
+    use_rsi = float(settings.get("rsi_entry_threshold", 100)) < 100
+    parts = []
+    for start in range(0, n_paths, chunk_size):
+        count = min(chunk_size, n_paths - start)
+        if model == "bootstrap":
+            high, close = bootstrap_paths(returns, high_ratio, count, n_days, s0, rng, block, vol_scale)
+        else:
+            high, close = gbm_paths(
+                count, n_days, s0, mu, sigma * vol_scale, rng,
+                jump_intensity if model == "jump" else 0.0, jump_mean, jump_std * vol_scale,
+            )
+        rsi = wilder_rsi_paths(close, rsi_period) if use_rsi else None
+        parts.append(simulate_paths(high, close, settings, rsi))
+    return {key: np.concatenate([part[key] for part in parts]) for key in parts[0]}
+
+
+def summarize(result):
+    """경로별 결과 -> 분포 요약 (dict)"""
+    returns = result["cumulative_return_rate"]
+    exhausted = ~np.isnan(result["exhaustion_cycle"])
+    summary = {"paths": len(returns), "loss_probability": float(np.mean(returns < 0) * 100)}
+    for key in ("cumulative_return_rate", "position_mdd", "completed_cycles", "max_T"):
+        values = np.asarray(result[key], dtype=np.float64)
+        summary[key] = {"mean": float(values.mean()), **{f"p{q}": float(v) for q, v in zip(PERCENTILES, np.percentile(values, PERCENTILES))}}
+    summary["exhaustion_rate"] = float(exhausted.mean() * 100)
+    if exhausted.any():
+        cycles = result["exhaustion_cycle"][exhausted]
+        summary["cycles_to_exhaustion"] = {"mean": float(cycles.mean()), **{f"p{q}": float(v) for q, v in zip(PERCENTILES, np.percentile(cycles, PERCENTILES))}}
+    return summary
+
+
+def _parse_floats(text):
+    return [float(value) for value in text.split(",") if value.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="무한매수법 몬테카를로 스트레스 시뮬레이션")
+    parser.add_argument("csv", nargs="?", help="일봉 CSV 경로 (생략 시 가격 저장소, gbm/jump 는 없어도 됨)")
+    parser.add_argument("--setting", default="setting.json", help="세팅 파일 경로")
+    parser.add_argument("--model", choices=MODELS, default="bootstrap", help="가격 경로 모델")
+    parser.add_argument("--paths", type=int, default=10000, help="경로 수")
+    parser.add_argument("--years", type=float, default=5, help="경로 길이(년)")
+    parser.add_argument("--vol-scale", default="1.0", help="변동성 배수 목록 (예: 0.75,1,1.5 - 배수마다 따로 실행)")
+    parser.add_argument("--block", type=int, default=20, help="bootstrap 블록 길이(일)")
+    parser.add_argument("--mu", type=float, default=None, help="연 기대수익률 (기본: 과거 일봉 추정)")
+    parser.add_argument("--sigma", type=float, default=None, help="연 변동성 (기본: 과거 일봉 추정)")
+    parser.add_argument("--s0", type=float, default=None, help="시작 가격 (기본: 과거 마지막 종가)")
+    parser.add_argument("--jump-intensity", type=float, default=4.0, help="jump: 연 평균 점프 횟수")
+    parser.add_argument("--jump-mean", type=float, default=-0.05, help="jump: 로그 점프 평균")
+    parser.add_argument("--jump-std", type=float, default=0.1, help="jump: 로그 점프 표준편차")
+    parser.add_argument("--chunk-size", type=int, default=2000, help="한 번에 시뮬레이션할 경로 수")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    settings = load_settings(args.setting)
+    try:
+        history = load_bars(args.csv, settings)
+    except FileNotFoundError:
+        if args.model == "bootstrap":
+            raise
+        history = None
+
+    for vol_scale in _parse_floats(args.vol_scale):
+        started = time.perf_counter()
+        result = run_monte_carlo(
+            settings, args.model, args.paths, args.years, args.seed, args.chunk_size, history, args.s0,
+            vol_scale, args.block, args.mu, args.sigma, args.jump_intensity, args.jump_mean, args.jump_std,
+        )
+        elapsed = time.perf_counter() - started
+        summary = summarize(result)
+        log_print(
+            f"[bold cyan]🎲 {settings.get('symbol')} {args.model} x{vol_scale:g} "
+            f"{args.paths}경로 {args.years:g}년 ({elapsed:.2f}초)[/bold cyan]"
+        )
+        log_print(f"\t손실 확률: {summary['loss_probability']:.1f}%  소진 경로: {summary['exhaustion_rate']:.1f}%")
+        for key in ("cumulative_return_rate", "position_mdd", "completed_cycles", "max_T", "cycles_to_exhaustion"):
+            if key not in summary:
+                continue
+            stats = summary[key]
+            percentiles = " ".join(f"p{q}={stats[f'p{q}']:,.2f}" for q in PERCENTILES)
+            log_print(f"\t{key}: 평균 {stats['mean']:,.2f}  {percentiles}")
+
+
+if __name__ == "__main__":
+    main()
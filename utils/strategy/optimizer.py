@@ -0,0 +1,201 @@
+import argparse
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+from utils.log_print import log_print
+from utils.strategy.backtest import entry_rsi, load_bars, run_backtest
+from utils.strategy.infinite_buying import REASON_CYCLE_END, load_settings
+
+# 스윕 대상 파라미터 기본 그리드 (--param 으로 덮어쓰기 가능)
+DEFAULT_GRID = {
+    "num_of_purchases": [20, 30, 40],
+    "sell_multiplier": [1.05, 1.1, 1.15, 1.2],
+    "moc_trigger_rate": [0.9, 0.95, 1.0],
+    "profit_sell_ratio": [0.5, 0.75, 1.0],
+}
+# 기본 세팅이 compound 재투자일 때만 기본 그리드에 더하는 compound_ratio 후보
+COMPOUND_RATIO_GRID = [0, 25, 50]
+
+# 워커 프로세스 전역 상태 (initializer 에서 한 번만 세팅)
+_worker_shm = None
+_worker_high = None
+_worker_close = None
+_worker_base = None
+# rsi_period -> 일별 RSI 배열 (워커별로 기간마다 한 번만 계산)
+_worker_rsi = {}
+
+
+def _init_worker(shm_name, n, base_settings):
+    """워커 시작 시 공유메모리에 붙어 가격 배열 뷰를 만듦 (태스크마다 복사하지 않음)"""
+    global _worker_shm, _worker_high, _worker_close, _worker_base
+    _worker_shm = shared_memory.SharedMemory(name=shm_name)
+    prices = np.ndarray((2, n), dtype=np.float64, buffer=_worker_shm.buf)
+    _worker_high, _worker_close = prices[0], prices[1]
+    _worker_base = base_settings
+
+
+def _evaluate(params):
+    """파라미터 조합 1개 백테스트 -> (params, 누적수익률, MDD, 완료 사이클 수)"""
+    settings = dict(_worker_base, **params)
+    rsi = None
+    if float(settings.get("rsi_entry_threshold", 100)) < 100:
+        period = int(settings.get("rsi_period", 14))
+        rsi = _worker_rsi.get(period)
+        if rsi is None:
+            rsi = _worker_rsi[period] = entry_rsi(_worker_close, settings)
+    result = run_backtest(_worker_high, _worker_close, settings, rsi)
+    return (
+        params,
+        float(result["cumulative_return_rate"][-1]),
+        float(result["position_mdd"].min()),
+        int(np.count_nonzero(result["reason"] & REASON_CYCLE_END)),
+    )
+
+
+def expand_grid(grid):
+    """{"키": [값, ...]} -> 파라미터 조합 dict 리스트 (데카르트 곱)"""
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[key] for key in keys))]
+
+
+def default_grid(base_settings):
+    """
+    기본 스윕 그리드
+
+    재투자 방식은 사용자가 정한 값을 바꾸지 않도록, 기본 세팅이 compound 일 때만 compound_ratio 를 함께 스윕합니다.
+    """
+    grid = dict(DEFAULT_GRID)
+    if base_settings.get("reinvestment_type") == "compound":
+        grid["compound_ratio"] = list(COMPOUND_RATIO_GRID)
+    return grid
+
+
+def _sweep_base(base_settings, grid):
+    """
+    compound_ratio 를 스윕할 때는 compound 재투자로 고정한 기본 세팅 반환
+
+    simple 세팅에서 compound_ratio 를 스윕하는 건 --param 등으로 직접 요청한 경우뿐입니다. (default_grid 참고)
+    """
+    if "compound_ratio" in grid and "reinvestment_type" not in grid and base_settings.get("reinvestment_type") != "compound":
+        return dict(base_settings, reinvestment_type="compound")
+    return base_settings
+
+
+def sweep(high, close, base_settings, grid, max_workers=None, chunksize=None):
+    """
+    파라미터 그리드 병렬 스윕
+
+    가격 배열은 공유메모리에 한 번만 올리고 워커들은 이를 그대로 참조합니다.
+    결과는 누적수익률(cumulative_return_rate) 내림차순, 동률이면 MDD(position_mdd)가
+    얕은 순으로 정렬합니다.
+    compound_ratio 를 스윕하면 reinvestment_type 은 compound 로 고정합니다. (compound_ratio 0 = simple)
+
+    Args:
+        high, close (array-like): 일별 고가/종가
+        base_settings (dict): setting.json 기본값
+        grid (dict): 스윕할 키별 후보값 리스트
+        max_workers (int, optional): 프로세스 수 (기본: CPU 코어 수)
+        chunksize (int, optional): 워커에 한 번에 넘길 조합 수
+
+    Returns:
+        list[dict]: params, cumulative_return_rate, position_mdd, completed_cycles
+    """
+    combos = expand_grid(grid)
+    if not combos:
+        return []
+    base_settings = _sweep_base(base_settings, grid)
+    max_workers = max_workers or os.cpu_count() or 1
+    if chunksize is None:
+        chunksize = max(1, len(combos) // (max_workers * 8))
+
+    prices = np.vstack([np.asarray(high, dtype=np.float64), np.asarray(close, dtype=np.float64)])
+    shm = shared_memory.SharedMemory(create=True, size=prices.nbytes)
+    try:
+        np.ndarray(prices.shape, dtype=np.float64, buffer=shm.buf)[:] = prices
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_init_worker,
+            initargs=(shm.name, prices.shape[1], base_settings),
+        ) as executor:
+            rows = list(executor.map(_evaluate, combos, chunksize=chunksize))
+    finally:
+        shm.close()
+        shm.unlink()
+
+    rows.sort(key=lambda row: (row[1], row[2]), reverse=True)
+    return [
+        {
+            "params": params,
+            "cumulative_return_rate": ret,
+            "position_mdd": mdd,
+            "completed_cycles": cycles,
+        }
+        for params, ret, mdd, cycles in rows
+    ]
+
+
+def write_best_settings(base_settings, best, path):
+    """1위 파라미터를 반영한 setting.json 생성"""
+    settings = dict(base_settings, **best["params"])
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(settings, f, ensure_ascii=False, indent=2)
+    return settings
+
+
+def _parse_param(text):
+    """'key=v1,v2,v3' -> (key, [값...]) - 숫자는 int/float 로 변환"""
+    key, _, values = text.partition("=")
+    parsed = []
+    for value in values.split(","):
+        value = value.strip()
+        try:
+            parsed.append(int(value))
+        except ValueError:
+            try:
+                parsed.append(float(value))
+            except ValueError:
+                parsed.append(value)
+    return key.strip(), parsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="무한매수법 세팅값 병렬 스윕")
+    parser.add_argument("csv", nargs="?", help="일봉 CSV 경로 (Date,Open,High,Low,Close,Volume, 생략 시 가격 저장소)")
+    parser.add_argument("--setting", default="setting.json", help="기본 세팅 파일 경로")
+    parser.add_argument("--param", action="append", default=[], help="스윕 값 지정 (예: sell_multiplier=1.1,1.15)")
+    parser.add_argument("--workers", type=int, default=None, help="프로세스 수 (기본: CPU 코어 수)")
+    parser.add_argument("--top", type=int, default=10, help="출력할 상위 결과 수")
+    parser.add_argument("--output", default="setting.optimized.json", help="1위 세팅 저장 경로")
+    args = parser.parse_args()
+
+    base_settings = load_settings(args.setting)
+    grid = default_grid(base_settings)
+    grid.update(_parse_param(text) for text in args.param)
+    if _sweep_base(base_settings, grid) is not base_settings:
+        log_print("[bold yellow]compound_ratio 를 스윕하므로 reinvestment_type 을 compound 로 고정합니다.[/bold yellow]")
+    bars = load_bars(args.csv, base_settings)
+
+    started = time.perf_counter()
+    results = sweep(bars["high"], bars["close"], base_settings, grid, max_workers=args.workers)
+    elapsed = time.perf_counter() - started
+    if not results:
+        log_print("[bold red]Error:[/bold red] 스윕할 파라미터 조합이 없습니다.")
+        return
+
+    log_print(f"[bold cyan]🔍 {len(results)}개 조합 스윕 완료 ({elapsed:.2f}초)[/bold cyan]")
+    for rank, row in enumerate(results[: args.top], 1):
+        log_print(
+            f"\t{rank}. 누적수익률 {row['cumulative_return_rate']:,.2f}% "
+            f"MDD {row['position_mdd']:,.2f}% 사이클 {row['completed_cycles']} {row['params']}"
+        )
+
+    write_best_settings(_sweep_base(base_settings, grid), results[0], args.output)
+    log_print(f"[bold green]1위 세팅을 {args.output} 에 저장했습니다.[/bold green]")
+
+
+if __name__ == "__main__":
+    main()
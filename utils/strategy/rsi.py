@@ -0,0 +1,236 @@
+import math
+import numpy as np
+
+# Wilder RSI (rsi_period / rsi_entry_threshold)
+# 실시간용 WilderRSI(가격 1개당 O(1) 갱신)와 백테스트용 wilder_rsi(배열 일괄 계산)는
+# 같은 연산을 같은 순서로 수행하므로 결과가 비트 단위까지 같습니다.
+#
+#   첫 평균 = 처음 period 개 상승폭/하락폭의 합 / period  (앞에서부터 순서대로 합산)
+#   이후    = (이전 평균 * (period - 1) + 이번 값) / period
+#   RSI     = 100 - 100 / (1 + 평균상승 / 평균하락)   (평균하락 0 이면 100)
+
+
+def _rsi(avg_gain, avg_loss):
+    if avg_loss == 0:
+        return 100.0
+    return 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+
+
+class WilderRSI:
+    """
+    스트리밍 Wilder RSI (가격 1개당 상수 시간)
+
+    - update(close): 확정 종가 반영 -> RSI (period 개 변화량이 쌓이기 전에는 None)
+    - peek(price): 상태를 바꾸지 않고 price 가 종가라면 RSI 가 얼마인지 계산 (장중 시세 확인용)
+    - allows_entry(price, threshold): RSI <= threshold 여부. 종가가 확정될 때마다 한 번만 계산해 둔
+      한계가격과 비교하므로 장중 시세마다 여러 종목을 확인해도 비교 1번입니다.
+    - state()/from_state(): DB 등에 저장했다가 이어서 계산
+
+    사용 예시:
+        rsi = WilderRSI.from_prices(closes, period=14)
+        if rsi.allows_entry(quote, settings["rsi_entry_threshold"]):
+            ...
+        rsi.update(today_close)
+    """
+
+    __slots__ = ("period", "prev", "avg_gain", "avg_loss", "count", "_sum_gain", "_sum_loss", "value", "_limits")
+
+    def __init__(self, period=14):
+        if period < 1:
+            raise ValueError("rsi_period 는 1 이상이어야 합니다.")
+        self.period = int(period)
+        self.prev = None
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+        self.count = 0          # 반영한 변화량 수
+        self._sum_gain = 0.0
+        self._sum_loss = 0.0
+        self.value = None       # 마지막 확정 RSI
+        self._limits = {}       # threshold -> 한계가격 (update 때마다 초기화)
+
+    @classmethod
+    def from_prices(cls, prices, period=14):
+        """과거 종가로 상태를 채운 인스턴스 생성"""
+        rsi = cls(period)
+        for price in np.asarray(prices, dtype=np.float64).tolist():
+            rsi.update(price)
+        return rsi
+
+    @property
+    def ready(self):
+        """RSI 계산 가능 여부 (period 개 변화량 반영 완료)"""
+        return self.count >= self.period
+
+    def update(self, close):
+        """확정 종가 1개 반영 -> 현재 RSI (준비 전이면 None)"""
+        close = float(close)
+        prev = self.prev
+        self.prev = close
+        self._limits = {}
+        if prev is None:
+            return None
+        change = close - prev
+        gain = change if change > 0 else 0.0
+        loss = -change if change < 0 else 0.0
+        n = self.period
+        self.count += 1
+        if self.count < n:
+            self._sum_gain += gain
+            self._sum_loss += loss
+            return None
+        if self.count == n:
+            self.avg_gain = (self._sum_gain + gain) / n
+            self.avg_loss = (self._sum_loss + loss) / n
+        else:
+            self.avg_gain = (self.avg_gain * (n - 1) + gain) / n
+            self.avg_loss = (self.avg_loss * (n - 1) + loss) / n
+        self.value = _rsi(self.avg_gain, self.avg_loss)
+        return self.value
+
+    def peek(self, price):
+        """price 가 다음 종가라고 가정한 RSI (상태 변경 없음, 준비 전이면 None)"""
+        if self.prev is None or self.count + 1 < self.period:
+            return None
+        change = float(price) - self.prev
+        gain = change if change > 0 else 0.0
+        loss = -change if change < 0 else 0.0
+        n = self.period
+        if self.count + 1 == n:
+            return _rsi((self._sum_gain + gain) / n, (self._sum_loss + loss) / n)
+        return _rsi((self.avg_gain * (n - 1) + gain) / n, (self.avg_loss * (n - 1) + loss) / n)
+
+    def entry_limit(self, threshold):
+        """
+        RSI <= threshold 가 되는 최고 가격 (다음 종가 기준, 준비 전이면 None)
+
+        RSI 는 가격에 대해 단조 증가하므로 price <= 한계가격 과 peek(price) <= threshold 는 같은 조건입니다.
+        """
+        if self.prev is None or self.count + 1 < self.period:
+            return None
+        threshold = float(threshold)
+        limit = self._limits.get(threshold)
+        if limit is not None:
+            return limit
+        n = self.period
+        if self.count + 1 == n:
+            a, b = self._sum_gain, self._sum_loss
+        else:
+            a, b = self.avg_gain * (n - 1), self.avg_loss * (n - 1)
+        if threshold >= 100:
+            limit = math.inf
+        elif threshold <= 0:
+            # RSI 0 은 상승이 전혀 없을 때만 가능
+            limit = -math.inf if a > 0 else math.nextafter(self.prev, -math.inf)
+        else:
+            # 평균상승/평균하락 <= r 을 만족하는 변화량 상한
+            r = threshold / (100 - threshold)
+            if b > 0 and r * b >= a:
+                limit = self.prev + r * b - a
+            elif a > 0:
+                limit = self.prev + b - a / r
+            else:
+                limit = math.nextafter(self.prev, -math.inf)
+        self._limits[threshold] = limit
+        return limit
+
+    def allows_entry(self, price, threshold):
+        """신규 진입 허용 여부 (RSI <= threshold, 준비 전에는 threshold 100 이상일 때만 허용)"""
+        limit = self.entry_limit(threshold)
+        if limit is None:
+            return float(threshold) >= 100
+        return price <= limit
+
+    def state(self):
+        """저장용 상태 dict"""
+        return {
+            "period": self.period,
+            "prev": self.prev,
+            "avg_gain": self.avg_gain,
+            "avg_loss": self.avg_loss,
+            "count": self.count,
+            "sum_gain": self._sum_gain,
+            "sum_loss": self._sum_loss,
+            "value": self.value,
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        """state() 결과로 복원"""
+        rsi = cls(state["period"])
+        rsi.prev = state["prev"]
+        rsi.avg_gain = state["avg_gain"]
+        rsi.avg_loss = state["avg_loss"]
+        rsi.count = state["count"]
+        rsi._sum_gain = state["sum_gain"]
+        rsi._sum_loss = state["sum_loss"]
+        rsi.value = state["value"]
+        return rsi
+
+
+def wilder_rsi(close, period=14):
+    """
+    일괄 Wilder RSI (백테스트용) -> close 와 같은 길이의 NumPy 배열 (준비 전 구간은 NaN)
+
+    상승폭/하락폭은 NumPy 로 한 번에 구하고, 평균 점화식은 WilderRSI.update 와 같은 순서로
+    평탄한 리스트 위에서 돌려 스트리밍 결과와 비트 단위로 같게 맞춥니다.
+    """
+    prices = np.asarray(close, dtype=np.float64)
+    n = int(period)
+    out = np.full(prices.shape[0], np.nan)
+    if prices.shape[0] <= n:
+        return out
+
+    change = np.diff(prices)
+    gains = np.where(change > 0, change, 0.0).tolist()
+    losses = np.where(change < 0, -change, 0.0).tolist()
+
+    sum_gain = 0.0
+    sum_loss = 0.0
+    for i in range(n - 1):
+        sum_gain += gains[i]
+        sum_loss += losses[i]
+    avg_gain = (sum_gain + gains[n - 1]) / n
+    avg_loss = (sum_loss + losses[n - 1]) / n
+
+    values = [_rsi(avg_gain, avg_loss)]
+    m = n - 1
+    for gain, loss in zip(gains[n:], losses[n:]):
+        avg_gain = (avg_gain * m + gain) / n
+        avg_loss = (avg_loss * m + loss) / n
+        values.append(100.0 if avg_loss == 0 else 100.0 - 100.0 / (1.0 + avg_gain / avg_loss))
+    out[n:] = values
+    return out
+
+
+def wilder_rsi_paths(close, period=14):
+    """
+    경로별 일괄 Wilder RSI (몬테카를로용) -> close 와 같은 (경로 수, 일수) 배열 (준비 전 구간은 NaN)
+
+    시간축 점화식은 순서대로 돌리되 한 번에 모든 경로를 NumPy 로 계산합니다. (wilder_rsi 와 같은 순서)
+    """
+    prices = np.asarray(close, dtype=np.float64)
+    n = int(period)
+    out = np.full(prices.shape, np.nan)
+    if prices.shape[1] <= n:
+        return out
+
+    change = np.diff(prices, axis=1)
+    gains = np.where(change > 0, change, 0.0)
+    losses = np.where(change < 0, -change, 0.0)
+
+    sum_gain = np.zeros(prices.shape[0])
+    sum_loss = np.zeros(prices.shape[0])
+    for i in range(n - 1):
+        sum_gain += gains[:, i]
+        sum_loss += losses[:, i]
+    avg_gain = (sum_gain + gains[:, n - 1]) / n
+    avg_loss = (sum_loss + losses[:, n - 1]) / n
+
+    m = n - 1
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out[:, n] = np.where(avg_loss == 0, 100.0, 100.0 - 100.0 / (1.0 + avg_gain / avg_loss))
+        for i in range(n, change.shape[1]):
+            avg_gain = (avg_gain * m + gains[:, i]) / n
+            avg_loss = (avg_loss * m + losses[:, i]) / n
+            out[:, i + 1] = np.where(avg_loss == 0, 100.0, 100.0 - 100.0 / (1.0 + avg_gain / avg_loss))
+    return out
@@ -0,0 +1,588 @@
+import argparse
+import asyncio
+import json
+import os
+import time
+from datetime import datetime, timedelta
+from dotenv import load_dotenv
+from utils import database
+from utils.kis_tr.async_kis_client import AsyncKisClient
+from utils.kis_tr.order_manager import AsyncOrderManager
+from utils.kis_tr.해외주식_주문체결내역 import AsyncOverseasOrderHistory
+from utils.kis_tr.해외주식_주문 import AsyncOverseasStockOrder, submit_orders
+from utils.kis_tr.해외주식_체결기준현재잔고 import AsyncOverseasHoldings
+from utils.kis_tr.해외주식_실시간지연체결가 import OverseasRealtimeQuote
+from utils.kis_tr.해외주식_현재체결가 import AsyncOverseasPrice
+from utils.log_print import log_print
+from utils.market_calendar import NEW_YORK, us_market
+from utils.metrics import STRATEGY_STEP_SECONDS, start_metrics_server
+from utils.price_store import PriceStore
+from utils.scheduler import MarketTrigger, scheduler
+from utils.strategy.checkpoint import StrategyState, last_fill_id, load_checkpoints, load_fills, save_checkpoints
+from utils.strategy.infinite_buying import REASON_SELL_TARGET, SETTING_KEYS, load_settings, plan_orders, reason_text
+from utils.strategy.triggers import DOWN, EXPIRED, FIRED, UP, TriggerBook, load_fired, record_triggers
+from utils.token.token_manager import token_manager
+
+# 주문용 해외거래소코드 -> OverseasStockOrder.TR_ID_MAP 키
+EXCHANGE_BY_EXCG_CD = {
+    "NASD": "US",
+    "NYSE": "US",
+    "AMEX": "US",
+    "SEHK": "HK",
+    "TKSE": "JP",
+}
+
+
+class StrategyInstance:
+    """
+    전략 인스턴스 1개 (계좌 + 종목 + 세팅)
+
+    instance_id 는 strategy_result.instance 에 기록되는 태그입니다. (예: "12345678-01:SOXL")
+    """
+
+    def __init__(self, settings, account):
+        self.settings = settings
+        self.account = account
+        self.symbol = settings["symbol"]
+        self.ovrs_excg_cd = settings["ovrs_excg_cd"]
+        self.instance_id = settings.get("instance") or f"{account}:{self.symbol}"
+        self.state = None   # StrategyState (restore 로 채움)
+        self.rsi = None     # WilderRSI (rsi_entry_threshold < 100 일 때 state.rsi 와 같은 객체)
+
+    @property
+    def key(self):
+        """fills 조회 키 (account, ovrs_excg_cd, symbol)"""
+        return self.account, self.ovrs_excg_cd, self.symbol
+
+    def restore(self, state, store):
+        """
+        체크포인트 상태 연결 + 그 뒤에 쌓인 일봉 반영
+
+        진입 필터가 있으면 RSI 는 체크포인트에 저장된 상태를 이어 쓰고, 없거나 기간이 바뀐 경우에만 일봉 전체로 새로 계산합니다.
+        """
+        if float(self.settings.get("rsi_entry_threshold", 100)) < 100:
+            state.seed_rsi(store, self.symbol, self.ovrs_excg_cd, int(self.settings.get("rsi_period", 14)))
+        else:
+            state.rsi = None
+        state.with_cash(self.settings)
+        state.catch_up_bars(store, self.symbol, self.ovrs_excg_cd)
+        self.state = state
+        self.rsi = state.rsi
+
+    def current_rsi(self, price):
+        """
+        price 를 오늘 종가로 본 RSI (필터가 없으면 None)
+
+        저장된 일봉이 부족해 RSI 를 계산할 수 없으면 백테스트와 같이 진입하지 않도록 inf 를 돌려줍니다.
+        """
+        if self.rsi is None:
+            return None
+        value = self.rsi.peek(price)
+        return float("inf") if value is None else value
+
+    def __repr__(self):
+        return f"StrategyInstance({self.instance_id})"
+
+
+def load_instances(path="strategies.json", setting_path="setting.json"):
+    """
+    전략 인스턴스 목록 로드
+
+    strategies.json 이 있으면 각 항목(account, symbol, ovrs_excg_cd, initial_capital 등)을
+    setting.json 위에 덮어써서 인스턴스를 만들고, 없으면 setting.json + .env ACCOUNT 로 1개를 만듭니다.
+    enabled 가 false 인 항목은 건너뜁니다.
+
+    strategies.json 예시:
+        [
+          {"account": "12345678-01", "symbol": "SOXL", "ovrs_excg_cd": "AMEX", "initial_capital": 12000},
+          {"account": "12345678-01", "symbol": "TQQQ", "ovrs_excg_cd": "NASD", "initial_capital": 8000, "sell_multiplier": 1.15}
+        ]
+    """
+    base = load_settings(setting_path)
+    if not os.path.exists(path):
+        entries = [{"account": os.getenv("ACCOUNT")}]
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            entries = json.load(f)
+
+    instances = []
+    for entry in entries:
+        settings = dict(base, **{key: value for key, value in entry.items() if key != "account"})
+        if not settings.get("enabled", True):
+            continue
+        missing = [key for key in SETTING_KEYS + ("symbol", "ovrs_excg_cd") if settings.get(key) is None]
+        account = entry.get("account") or os.getenv("ACCOUNT")
+        if missing or not account:
+            raise ValueError(f"전략 인스턴스 설정이 올바르지 않습니다: {entry}")
+        instances.append(StrategyInstance(settings, account))
+    return instances
+
+
+def load_last_rows(instance_ids):
+    """인스턴스별 최신 strategy_result 행 (한 번의 쿼리) -> {instance: dict}"""
+    if not instance_ids:
+        return {}
+    placeholders = ", ".join("?" * len(instance_ids))
+    columns = ", ".join(database.STRATEGY_RESULT_COLUMNS)
+    rows = database.fetchall(
+        f"SELECT {columns} FROM strategy_result WHERE id IN ("
+        f"SELECT MAX(id) FROM strategy_result WHERE instance IN ({placeholders}) GROUP BY instance)",
+        tuple(instance_ids),
+    )
+    return {row[1]: dict(zip(database.STRATEGY_RESULT_COLUMNS, row)) for row in rows}
+
+
+def restore_states(instances, store):
+    """
+    인스턴스별 전략 상태 복구 -> 체크포인트가 없어 새로 시작한 인스턴스 수
+
+    체크포인트 1행 + 이후 일봉만 반영하므로 strategy_result 이력 길이와 상관없이 일정한 시간에 끝납니다.
+    체크포인트가 없으면 최신 strategy_result 행(있으면)에서 시작하고 지금까지의 체결은 반영된 것으로 봅니다.
+    """
+    checkpoints = load_checkpoints([instance.instance_id for instance in instances])
+    missing = [instance.instance_id for instance in instances if instance.instance_id not in checkpoints]
+    last_rows = load_last_rows(missing)
+    fill_id = last_fill_id() if missing else 0
+    for instance in instances:
+        state = checkpoints.get(instance.instance_id)
+        if state is None:
+            state = StrategyState.initial(instance.instance_id, instance.settings, fill_id, last_rows.get(instance.instance_id))
+        instance.restore(state, store)
+    return len(missing)
+
+
+class StrategyRunner:
+    """
+    여러 계좌/종목 전략 인스턴스를 한 프로세스에서 실행
+
+    - 모든 인스턴스가 AsyncKisClient 1개(커넥션 풀/RateLimiter)와 token_manager 토큰을 공유합니다.
+    - 계좌별 잔고 조회는 계좌당 1번만, 그리고 모든 계좌/종목을 동시에 진행합니다.
+    - 인스턴스별 주문 계획(plan_orders)을 모아 submit_orders 로 한 번에 동시 전송합니다.
+    - 인스턴스마다 strategy_result 행 1개를 instance 태그와 함께 저장하고, 같은 트랜잭션으로 상태 체크포인트를 덮어씁니다.
+      재시작 시에는 체크포인트 + 이후 체결/일봉만 반영해 사이클/회차/T/평단/누적매수금을 복구합니다.
+    - 나간 주문은 계좌별 AsyncOrderManager 가 기록하고, 매 실행 시작 때 계좌당 주문체결내역 조회 1번으로 체결을 맞춥니다.
+    - rsi_entry_threshold < 100 인 인스턴스는 가격 저장소 일봉으로 RSI 를 준비해 신규 진입을 거릅니다.
+
+    사용 예시:
+        runner = StrategyRunner(load_instances(), appkey, appsecret)
+        decisions = asyncio.run(runner.run_once())
+    """
+
+    def __init__(self, instances, appkey, appsecret):
+        self.instances = instances
+        self.client = AsyncKisClient(appkey, appsecret)
+        accounts = {instance.account for instance in instances}
+        self.holdings = {
+            account: AsyncOverseasHoldings(appkey, appsecret, None, account, client=self.client)
+            for account in accounts
+        }
+        self.orders = {
+            account: AsyncOverseasStockOrder(appkey, appsecret, None, account[:8], account[-2:], client=self.client)
+            for account in accounts
+        }
+        self.order_managers = {
+            account: AsyncOrderManager(AsyncOverseasOrderHistory(appkey, appsecret, None, account, client=self.client))
+            for account in accounts
+        }
+        self.prices = AsyncOverseasPrice(appkey, appsecret, client=self.client)
+        self.store = PriceStore()
+        with STRATEGY_STEP_SECONDS.time("restore_states"):
+            restore_states(instances, self.store)
+
+    async def close(self):
+        for manager in self.order_managers.values():
+            manager.close()
+            await manager.drain()
+        await self.client.close()
+
+    async def reconcile_orders(self):
+        """모든 계좌 열린 주문 체결 대사 (계좌별 동시, 실패한 계좌는 경고만) -> 바뀐 주문 목록"""
+        results = await asyncio.gather(
+            *(manager.reconcile() for manager in self.order_managers.values()),
+            return_exceptions=True,
+        )
+        updates = []
+        for account, result in zip(self.order_managers, results):
+            if isinstance(result, Exception):
+                log_print(f"[bold yellow]Warning:[/bold yellow] {account} 체결 대사 실패: {result}")
+            else:
+                updates.extend(result)
+        return updates
+
+    async def _fetch_positions(self, account):
+        """계좌 보유종목 {(ovrs_excg_cd, pdno): Position}"""
+        with STRATEGY_STEP_SECONDS.time("fetch_positions"):
+            snapshot = await self.holdings[account].get_snapshot()
+        if snapshot is None:
+            raise RuntimeError(f"{account} 잔고 조회 실패")
+        manager = self.order_managers[account]
+        if not manager.seeded:
+            manager.seed_positions(snapshot)
+        return snapshot.positions
+
+    def _catch_up(self, instance, fills, last_id):
+        """
+        체크포인트 이후 체결/일봉을 상태에 반영 (fills: 이 인스턴스 계좌/종목 체결, last_id: 이번에 읽은 마지막 fills.id)
+
+        체결 커서(state.fill_id)는 체결 1건을 반영할 때마다 옮기므로, 중간에 실패해도 반영한 체결까지만 지나갑니다.
+        다 반영한 뒤에 last_id 까지 옮겨 다른 종목 체결을 다음에 다시 읽지 않게 합니다.
+        """
+        state = instance.state
+        for fill_id, side, qty, price in fills:
+            if fill_id > state.fill_id:
+                state.apply_fill(side, qty, price, instance.settings)
+                state.fill_id = fill_id
+        state.fill_id = max(state.fill_id, last_id)
+        state.catch_up_bars(self.store, instance.symbol, instance.ovrs_excg_cd)
+
+    async def _evaluate(self, instance, positions_task, fills, last_id):
+        """인스턴스 1개 주문 계획 + strategy_result 행 생성"""
+        self._catch_up(instance, fills, last_id)
+        positions = await positions_task
+        settings = instance.settings
+        state = instance.state
+        held = positions.get((instance.ovrs_excg_cd, instance.symbol))
+        position = held.qty if held else 0
+        avg_price = float(held.avg_price) if held else 0.0
+        last_price = float(held.now_price) if held and held.now_price else None
+        if last_price is None:
+            with STRATEGY_STEP_SECONDS.time("fetch_price"):
+                last_price = await self.prices.get_price(instance.ovrs_excg_cd, instance.symbol)
+        if not last_price:
+            raise RuntimeError(f"{instance.instance_id} 현재가 조회 실패")
+
+        # 사이클/회차: 체결로 전량 매도됐거나 잔고가 0이 되면 사이클 종료 (state 가 처리), 보유 중이면 회차 + 1
+        state.sync_position(position, avg_price, settings)
+        if position > 0:
+            state.round += 1
+        capital = state.capital
+        cash = state.cash
+
+        with STRATEGY_STEP_SECONDS.time("plan_orders"):
+            plan = plan_orders(position, avg_price, capital, cash, last_price, settings, instance.current_rsi(last_price))
+        state.T = plan["T"]
+        state.star_pct = plan["star_pct"]
+
+        value = state.value(last_price)
+        state.mark(value)
+        row = (
+            datetime.now().isoformat(timespec="seconds"),
+            instance.instance_id,
+            instance.symbol,
+            instance.ovrs_excg_cd,
+            state.cycle,
+            state.round,
+            plan["T"],
+            plan["star_pct"],
+            position,
+            avg_price,
+            plan["sell_target_price"],
+            plan["star_pct_target_price"],
+            cash,
+            value,
+            plan["signal"],
+            reason_text(plan["reason"]),
+            (last_price / avg_price - 1) * 100 if position else 0.0,
+            state.realized_profit_amount,
+            state.position_mdd,
+            state.cumulative_buy_amount,
+            (value / float(settings["initial_capital"]) - 1) * 100,
+        )
+        return {
+            "instance": instance,
+            "plan": plan,
+            "row": row,
+            "last_price": last_price,
+            "position": position,
+            "capital": capital,
+            "cash": cash,
+        }
+
+    async def evaluate(self):
+        """모든 인스턴스 주문 계획을 동시에 계산 -> 인스턴스 순서대로 결과 목록 (실패한 인스턴스는 error)"""
+        # 체크포인트 이후 체결은 모든 인스턴스 것을 한 번에 읽음 (fills.id 범위 조회)
+        with STRATEGY_STEP_SECONDS.time("load_fills"):
+            fill_id, fills = load_fills(min(instance.state.fill_id for instance in self.instances))
+        positions_tasks = {
+            account: asyncio.ensure_future(self._fetch_positions(account))
+            for account in self.holdings
+        }
+        results = await asyncio.gather(
+            *(
+                self._evaluate(instance, positions_tasks[instance.account], fills.get(instance.key, ()), fill_id)
+                for instance in self.instances
+            ),
+            return_exceptions=True,
+        )
+        decisions = []
+        for instance, result in zip(self.instances, results):
+            if isinstance(result, Exception):
+                decisions.append({"instance": instance, "error": str(result)})
+            else:
+                decisions.append(result)
+        return decisions
+
+    def _order_spec(self, instance, order):
+        """plan_orders 주문 -> submit_orders 주문 dict"""
+        return {
+            "side": order["side"],
+            "exchange": EXCHANGE_BY_EXCG_CD.get(instance.ovrs_excg_cd, "US"),
+            "ovrs_excg_cd": instance.ovrs_excg_cd,
+            "symbol": instance.symbol,
+            "qty": order["qty"],
+            "price": order["price"],
+            "ord_type": order["ord_type"],
+        }
+
+    async def _submit(self, items):
+        """(decision, 주문) 목록 동시 전송 -> 결과는 decision["order_results"] 에 추가"""
+        if not items:
+            return []
+        batch = [
+            (self.orders[decision["instance"].account], self._order_spec(decision["instance"], order))
+            for decision, order in items
+        ]
+        with STRATEGY_STEP_SECONDS.time("submit_orders"):
+            results = await submit_orders(batch)
+        for (decision, _), result in zip(items, results):
+            decision.setdefault("order_results", []).append(result)
+        return results
+
+    async def run_once(self, submit=True):
+        """
+        1회 실행: 열린 주문 체결 대사 -> 계획 계산 -> (submit 이면) 주문 동시 전송 -> strategy_result + 체크포인트 저장
+
+        submit=False(dry run) 이면 계획만 계산하고 strategy_result / 체크포인트는 저장하지 않습니다.
+        (실행 중인 인스턴스의 회차/고점/MDD 가 dry run 으로 바뀌지 않음)
+
+        Returns:
+            list[dict]: 인스턴스별 instance, plan, row, order_results 또는 error
+        """
+        await self.reconcile_orders()
+        with STRATEGY_STEP_SECONDS.time("evaluate"):
+            decisions = await self.evaluate()
+        ok = [decision for decision in decisions if "error" not in decision]
+
+        if not submit:
+            return decisions
+        for decision in ok:
+            decision["order_results"] = []
+        await self._submit([(decision, order) for decision in ok for order in decision["plan"]["orders"]])
+
+        with STRATEGY_STEP_SECONDS.time("save_results"):
+            save_checkpoints([decision["row"] for decision in ok], [decision["instance"].state for decision in ok])
+        return decisions
+
+    async def run_realtime(self, feed, submit=True, until=None):
+        """
+        실시간 시세 기반 실행 (feed: OverseasRealtimeQuote)
+
+        - 목표가 지정가 매도(평단 * sell_multiplier)는 미리 걸어두지 않고, 시세가 목표가 이상이 되는 순간 전송합니다.
+        - RSI 필터로 막힌 신규 진입은 RSI <= rsi_entry_threshold 가 되는 한계가격 이하로 내려오는 순간 전송합니다.
+        - 나머지 LOC 주문과 moc_trigger_rate 도달 시 MOC 매도는 바로 전송합니다. (T 는 보유수량으로만 정해짐)
+        - 걸어 둔 트리거가 모두 발동하거나, until(기본: 다음 정규장 마감) 이 되거나, feed.stop() 이 호출되면 끝납니다.
+          마감까지 발동하지 않은 트리거는 버립니다. (다음 세션 계획은 다음 실행에서 다시 계산)
+        - 발동/만료는 strategy_trigger 에 세션 날짜별로 기록하고, 같은 세션에 다시 실행하면 이미 발동한 트리거는 걸지 않습니다.
+        - submit=False(dry run) 이면 주문/strategy_result/체크포인트/트리거 기록 없이 감시만 합니다.
+
+        Returns:
+            list[dict]: run_once 와 같은 형식 (트리거로 나간 주문 결과도 order_results 에 포함)
+        """
+        until = until or us_market.next_event("close")
+        session_date = until.astimezone(NEW_YORK).strftime("%Y%m%d")
+        await self.reconcile_orders()
+        with STRATEGY_STEP_SECONDS.time("evaluate"):
+            decisions = await self.evaluate()
+        ok = [decision for decision in decisions if "error" not in decision]
+        fired = load_fired(session_date, [decision["instance"].instance_id for decision in ok])
+        book = TriggerBook()
+        armed = {}      # PriceTrigger -> StrategyInstance
+        immediate = []
+
+        def _arm(instance, name, price, direction, callback):
+            if (instance.instance_id, name) in fired:
+                log_print(f"\t{instance.instance_id} {name} 트리거는 이번 세션({session_date})에 이미 발동했습니다.")
+                return
+            armed[book.add(instance.ovrs_excg_cd, instance.symbol, name, price, direction, callback)] = instance
+
+        for decision in ok:
+            decision["order_results"] = []
+            instance = decision["instance"]
+            for order in decision["plan"]["orders"]:
+                if order["reason"] == REASON_SELL_TARGET:
+                    _arm(instance, "sell_target", order["price"], UP,
+                         self._make_trigger_callback(book, feed, decision, [order], submit, session_date))
+                else:
+                    immediate.append((decision, order))
+            if decision["position"] == 0 and not decision["plan"]["orders"] and instance.rsi is not None:
+                limit = instance.rsi.entry_limit(instance.settings["rsi_entry_threshold"])
+                if limit is not None and limit > 0:
+                    _arm(instance, "entry", limit, DOWN,
+                         self._make_trigger_callback(book, feed, decision, None, submit, session_date))
+
+        if submit:
+            await self._submit(immediate)
+            save_checkpoints([decision["row"] for decision in ok], [decision["instance"].state for decision in ok])
+
+        watched = {(instance.ovrs_excg_cd, instance.symbol) for instance in armed.values()}
+        if not watched:
+            return decisions
+        feed.add_listener(book.on_quote)
+        for ovrs_excg_cd, symbol in watched:
+            await feed.subscribe(ovrs_excg_cd, symbol)
+        loop = asyncio.get_running_loop()
+        timer = loop.call_later(max((until - datetime.now(until.tzinfo)).total_seconds(), 0), feed.stop)
+        log_print(
+            f"[bold cyan]📡 실시간 시세 감시 시작 ({len(watched)}종목, "
+            f"{until.astimezone(NEW_YORK):%Y-%m-%d %H:%M} ET 까지)[/bold cyan]"
+        )
+        try:
+            await feed.run()
+        finally:
+            timer.cancel()
+            feed.listeners.remove(book.on_quote)
+            expired = [trigger for trigger in armed if not trigger.fired]
+            book.clear()
+            if expired:
+                log_print(f"[bold yellow]⌛ 발동하지 않은 트리거 {len(expired)}건을 버립니다.[/bold yellow]")
+            if expired and submit:
+                await loop.run_in_executor(None, record_triggers, [
+                    (armed[trigger].instance_id, session_date, trigger.name, trigger.direction, trigger.price, EXPIRED, None)
+                    for trigger in expired
+                ])
+        return decisions
+
+    def _make_trigger_callback(self, book, feed, decision, orders, submit, session_date):
+        """
+        트리거 발동 시 주문 전송 콜백
+
+        orders 가 None 이면 신규 진입: 발동 시세로 plan_orders 를 다시 계산해 진입 주문을 만듭니다.
+        주문 전송 전에 발동을 기록하므로, 전송 도중 재시작해도 같은 세션에 두 번 주문하지 않습니다.
+        """
+        instance = decision["instance"]
+
+        async def _callback(trigger, quote):
+            sign = ">=" if trigger.direction == UP else "<="
+            log_print(
+                f"[bold magenta]⚡ {instance.instance_id} {trigger.name} "
+                f"({quote['price']} {sign} {trigger.price:.2f})[/bold magenta]"
+            )
+            if submit:
+                await asyncio.get_running_loop().run_in_executor(None, record_triggers, [
+                    (instance.instance_id, session_date, trigger.name, trigger.direction, trigger.price, FIRED, quote["price"])
+                ])
+            fire = orders
+            if fire is None:
+                plan = plan_orders(0, 0.0, decision["capital"], decision["cash"], quote["price"],
+                                   instance.settings, instance.current_rsi(quote["price"]))
+                fire = plan["orders"]
+            if submit:
+                await self._submit([(decision, order) for order in fire])
+            if not len(book):
+                feed.stop()
+
+        return _callback
+
+
+def print_decisions(decisions, elapsed_ms):
+    """실행 결과 요약 로그"""
+    log_print(f"[bold cyan]🤖 {len(decisions)}개 인스턴스 실행 완료 ({elapsed_ms:.0f}ms)[/bold cyan]")
+    for decision in decisions:
+        instance = decision["instance"]
+        if "error" in decision:
+            log_print(f"\t[bold red]{instance.instance_id}[/bold red] : {decision['error']}")
+            continue
+        plan = decision["plan"]
+        log_print(
+            f"\t[bold green]{instance.instance_id}[/bold green] : T={plan['T']:.2f} 별%={plan['star_pct']:.2f} "
+            f"주문 {len(plan['orders'])}건 ({reason_text(plan['reason']) or '없음'})"
+        )
+        for result in decision.get("order_results", []):
+            status = result["error"] or result["result"].msg1
+            log_print(f"\t\t{result['side']} {result['qty']} @ {result['price']} ({result['ord_type']}) : {status}")
+
+
+def schedule_jobs(runner, submit=True, pre_close_minutes=10, post_close_minutes=15):
+    """
+    거래일 예약 작업 등록 (중앙 스케줄러, 휴장일/조기폐장/서머타임 반영)
+
+    - pre_close_orders: 정규장 마감 pre_close_minutes 분 전 - 체결 대사 -> 계획 -> LOC/MOC 주문 -> strategy_result 저장
+      마감 1분 전까지 실행하지 못하면 그날은 건너뜁니다. (놓친 주문을 마감 후에 내지 않음)
+    - post_close_reconcile: 마감 post_close_minutes 분 후 - 당일 주문 체결 대사
+      재시작으로 놓쳤으면 12시간 안에서 바로 따라잡습니다.
+    토큰 갱신은 token_manager 가 같은 스케줄러에 예약합니다.
+    """
+    async def _pre_close():
+        started = time.perf_counter()
+        decisions = await runner.run_once(submit=submit)
+        print_decisions(decisions, (time.perf_counter() - started) * 1000)
+
+    async def _post_close():
+        updates = await runner.reconcile_orders()
+        log_print(f"[bold cyan]🧾 마감 후 체결 대사: 주문 {len(updates)}건 갱신[/bold cyan]")
+
+    scheduler.add_job(
+        "pre_close_orders", _pre_close, MarketTrigger("close", timedelta(minutes=-pre_close_minutes)),
+        misfire_grace=max(pre_close_minutes - 1, 0) * 60,
+    )
+    scheduler.add_job(
+        "post_close_reconcile", _post_close, MarketTrigger("close", timedelta(minutes=post_close_minutes)),
+        jitter=30, misfire_grace=None, catch_up=12 * 3600,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="무한매수법 멀티 종목/계좌 실행")
+    parser.add_argument("--strategies", default="strategies.json", help="전략 인스턴스 목록 파일")
+    parser.add_argument("--setting", default="setting.json", help="기본 세팅 파일 경로")
+    parser.add_argument("--dry-run", action="store_true", help="주문 전송 없이 계획만 계산 (strategy_result/체크포인트 저장 안 함)")
+    parser.add_argument("--realtime", action="store_true", help="실시간 시세로 목표가/진입 돌파 시점에 주문")
+    parser.add_argument("--schedule", action="store_true", help="상주 실행: 거래일마다 마감 전 주문 + 마감 후 체결 대사")
+    parser.add_argument("--pre-close-minutes", type=int, default=10, help="마감 몇 분 전에 주문할지 (--schedule)")
+    parser.add_argument("--post-close-minutes", type=int, default=15, help="마감 몇 분 후에 체결 대사할지 (--schedule)")
+    parser.add_argument("--metrics-port", type=int, default=None, help="Prometheus /metrics 포트 (기본: METRICS_PORT, 없으면 끔)")
+    args = parser.parse_args()
+
+    load_dotenv(".env")
+    metrics_port = args.metrics_port if args.metrics_port is not None else os.getenv("METRICS_PORT")
+    if metrics_port:
+        log_print(f"[bold cyan]📈 지표 엔드포인트: {start_metrics_server(int(metrics_port))}[/bold cyan]")
+    database.create_tables()
+    if not token_manager.start():
+        log_print("[bold red]Error:[/bold red] KIS 토큰 조회/생성 실패했습니다.")
+        return
+
+    instances = load_instances(args.strategies, args.setting)
+    runner = StrategyRunner(instances, os.getenv("KIS_APP_KEY"), os.getenv("KIS_APP_SECRET"))
+
+    if args.schedule:
+        schedule_jobs(runner, not args.dry_run, args.pre_close_minutes, args.post_close_minutes)
+        scheduler.start()
+        log_print(f"[bold cyan]⏰ 예약 실행 시작 ({len(instances)}개 인스턴스)[/bold cyan]")
+        for job in scheduler.jobs():
+            log_print(f"\t{job.name} : {job.next_run_at.astimezone():%Y-%m-%d %H:%M:%S} ({job.trigger!r})")
+        try:
+            scheduler.wait()
+        except KeyboardInterrupt:
+            log_print("[bold yellow]예약 실행을 종료합니다.[/bold yellow]")
+        finally:
+            scheduler.run_coroutine(runner.close())
+            scheduler.stop()
+        return
+
+    async def _run():
+        try:
+            if args.realtime:
+                feed = OverseasRealtimeQuote(None, None, client=runner.client)
+                return await runner.run_realtime(feed, submit=not args.dry_run)
+            return await runner.run_once(submit=not args.dry_run)
+        finally:
+            await runner.close()
+
+    started = time.perf_counter()
+    decisions = asyncio.run(_run())
+    print_decisions(decisions, (time.perf_counter() - started) * 1000)
+
+
+if __name__ == "__main__":
+    main()
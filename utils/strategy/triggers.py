@@ -0,0 +1,138 @@
+import inspect
+from utils import database
+from utils.log_print import log_print
+
+# 가격 돌파 트리거
+# 실시간 시세가 들어올 때마다 종목별로 등록된 가격선과 비교해 넘어선 순간 콜백을 한 번 호출합니다.
+# 종목당 가격선은 상향(가격 >= 선)/하향(가격 <= 선)별로 정렬해 두므로 시세 1건 처리는
+# 가장 가까운 선 하나와의 비교로 끝납니다. (넘지 않은 시세는 비교 1번)
+
+UP = "up"
+DOWN = "down"
+
+# strategy_trigger.status
+FIRED = "fired"
+EXPIRED = "expired"    # 세션 마감까지 발동하지 않아 버림
+
+UPSERT_TRIGGER_SQL = (
+    "INSERT OR REPLACE INTO strategy_trigger "
+    "(instance, session_date, name, direction, price, status, quote_price, updated_at) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)"
+)
+
+
+class PriceTrigger:
+    """가격선 1개 (name 예: 'sell_target', 'entry')"""
+
+    __slots__ = ("key", "name", "price", "direction", "callback", "fired")
+
+    def __init__(self, key, name, price, direction, callback):
+        self.key = key
+        self.name = name
+        self.price = float(price)
+        self.direction = direction
+        self.callback = callback
+        self.fired = False
+
+    def __repr__(self):
+        return f"PriceTrigger({self.key[0]}:{self.key[1]} {self.name} {'>=' if self.direction == UP else '<='} {self.price})"
+
+
+class TriggerBook:
+    """
+    종목별 가격 돌파 트리거 모음
+
+    사용 예시:
+        book = TriggerBook()
+        book.add("AMEX", "SOXL", "sell_target", 31.5, UP, on_target)   # on_target(trigger, quote)
+        feed.add_listener(book.on_quote)
+    """
+
+    def __init__(self):
+        # (ovrs_excg_cd, symbol) -> {UP: 가격 오름차순 목록, DOWN: 가격 내림차순 목록}
+        self._book = {}
+        self.fired = []
+
+    def add(self, ovrs_excg_cd, symbol, name, price, direction, callback):
+        """트리거 등록 -> PriceTrigger"""
+        if direction not in (UP, DOWN):
+            raise ValueError(f"direction 은 '{UP}' 또는 '{DOWN}' 이어야 합니다.")
+        key = (ovrs_excg_cd, symbol)
+        trigger = PriceTrigger(key, name, price, direction, callback)
+        sides = self._book.setdefault(key, {UP: [], DOWN: []})
+        side = sides[direction]
+        side.append(trigger)
+        side.sort(key=lambda t: t.price, reverse=direction == DOWN)
+        return trigger
+
+    def remove(self, trigger):
+        sides = self._book.get(trigger.key)
+        if sides and trigger in sides[trigger.direction]:
+            sides[trigger.direction].remove(trigger)
+
+    def clear(self, ovrs_excg_cd=None, symbol=None):
+        """종목 트리거 삭제 (인자가 없으면 전체)"""
+        if ovrs_excg_cd is None:
+            self._book.clear()
+        else:
+            self._book.pop((ovrs_excg_cd, symbol), None)
+
+    def __len__(self):
+        """아직 발동하지 않은 트리거 수"""
+        return sum(len(side) for sides in self._book.values() for side in sides.values())
+
+    def pending(self, ovrs_excg_cd, symbol):
+        """아직 발동하지 않은 트리거 목록"""
+        sides = self._book.get((ovrs_excg_cd, symbol), {})
+        return [trigger for side in sides.values() for trigger in side]
+
+    async def on_quote(self, quote):
+        """실시간 시세 1건 처리 - 넘어선 트리거를 목록에서 빼고 콜백 호출"""
+        sides = self._book.get((quote["ovrs_excg_cd"], quote["symbol"]))
+        if not sides:
+            return
+        price = quote["price"]
+        hit = []
+        up = sides[UP]
+        while up and price >= up[0].price:
+            hit.append(up.pop(0))
+        down = sides[DOWN]
+        while down and price <= down[0].price:
+            hit.append(down.pop(0))
+        # 콜백 하나가 실패해도 같은 시세로 발동한 나머지 트리거의 주문은 나가도록 콜백마다 따로 처리
+        for trigger in hit:
+            trigger.fired = True
+            self.fired.append(trigger)
+            try:
+                result = trigger.callback(trigger, quote)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                log_print(f"[bold red]Error:[/bold red] 트리거 콜백 실패 {trigger!r}: {e}", level="error")
+
+
+def load_fired(session_date, instance_ids):
+    """session_date 세션에 이미 발동한 트리거 -> {(instance, name)}"""
+    if not instance_ids:
+        return set()
+    placeholders = ", ".join("?" * len(instance_ids))
+    rows = database.fetchall(
+        f"SELECT instance, name FROM strategy_trigger "
+        f"WHERE session_date = ? AND status = ? AND instance IN ({placeholders})",
+        (session_date, FIRED) + tuple(instance_ids),
+    )
+    return {(instance, name) for instance, name in rows}
+
+
+def record_triggers(rows):
+    """
+    트리거 발동/만료 기록
+
+    Args:
+        rows (list[tuple]): (instance, session_date, name, direction, price, status, quote_price)
+    """
+    if not rows:
+        return 0
+    with database.transaction() as conn:
+        conn.executemany(UPSERT_TRIGGER_SQL, rows)
+    return len(rows)
@@ -1,11 +1,45 @@
 import os
-import sqlite3
 from datetime import datetime, timedelta
-import requests
+from utils import database
+from utils.kis_tr.kis_client import KisClient
 from utils.log_print import log_print
 
 def get_kis_token():
     """KIS 토큰 조회/생성 함수"""
+    token, _ = fetch_kis_token()
+    return token
+
+SELECT_LATEST_TOKEN_SQL = """
+    SELECT token, expired_at FROM Token 
+    WHERE provider = ? 
+    ORDER BY expired_at DESC 
+    LIMIT 1
+"""
+
+def token_provider():
+    """Token.provider 값 - 실서버는 'kis', KIS_BASE_URL 로 바꾼 서버는 'kis@주소' (목 서버 토큰이 실서버에 쓰이지 않도록)"""
+    base_url = KisClient.get_base_url()
+    return "kis" if base_url == KisClient.BASE_URL else f"kis@{base_url}"
+
+def _valid_token(latest):
+    """DB 최신 kis 토큰 행이 만료 1시간 이상 남았으면 (토큰, 만료시각) 반환, 아니면 None"""
+    if not latest:
+        return None
+    token, expired_at_str = latest
+    expired_at = datetime.fromisoformat(expired_at_str.replace('Z', '+00:00'))
+    # 만료 1시간 전이 아니면 기존 토큰 사용
+    if expired_at - datetime.now() > timedelta(hours=1):
+        return token, expired_at
+    return None
+
+def fetch_kis_token():
+    """
+    KIS 토큰 조회/생성 후 (토큰, 만료시각 datetime) 반환 - 실패시 (None, None)
+
+    같은 호스트의 여러 프로세스가 동시에 갱신 시점을 맞아도 발급은 한 번만 일어나도록
+    발급 구간을 database.process_lock("token") (DB 옆 lock 파일의 쓰기 잠금)으로 감쌉니다.
+    잠금을 기다린 프로세스는 잠금을 얻은 뒤 DB 를 다시 읽어 먼저 발급된 토큰을 그대로 사용합니다.
+    """
     try:
         # 환경변수 확인
         app_key = os.getenv("KIS_APP_KEY")
@@ -13,78 +47,54 @@ def get_kis_token():
         
         if not app_key or not app_secret:
             log_print("[bold red]Error:[/bold red] KIS_APP_KEY 또는 KIS_APP_SECRET이 설정되지 않았습니다.")
-            return None
-        
-        # 데이터베이스 연결
-        conn = sqlite3.connect("database/db.sqlite3")
-        cursor = conn.cursor()
+            return None, None
         
-        # 1. DB에서 kis 토큰 중 가장 최신 것을 찾음
-        cursor.execute("""
-            SELECT token, expired_at FROM Token 
-            WHERE provider = 'kis' 
-            ORDER BY expired_at DESC 
-            LIMIT 1
-        """)
-        latest = cursor.fetchone()
-        
-        now = datetime.now()
-        one_hour = timedelta(hours=1)
-        
-        if latest:
-            token, expired_at_str = latest
-            expired_at = datetime.fromisoformat(expired_at_str.replace('Z', '+00:00'))
+        provider = token_provider()
+
+        # 1. 잠금 없이 먼저 확인 (대부분 여기서 끝남)
+        valid = _valid_token(database.fetchone(SELECT_LATEST_TOKEN_SQL, (provider,)))
+        if valid:
+            _set_global_token(valid[0])
+            return valid
+
+        # 2. 만료 1시간 이내면 발급 잠금(별도 lock 파일)을 잡고 DB 를 다시 확인 -> 그래도 없으면 새로 발급
+        #    발급 요청 동안 공용 DB 연결/쓰기 잠금은 쥐지 않으므로 주문 기록 등 다른 DB 사용은 막히지 않음
+        with database.process_lock("token"):
+            valid = _valid_token(database.fetchone(SELECT_LATEST_TOKEN_SQL, (provider,)))
+            if valid:
+                _set_global_token(valid[0])
+                return valid
+
+            response = KisClient(app_key, app_secret).issue_token()
             
-            # 만료 1시간 전이 아니면 기존 토큰 사용
-            if expired_at - now > one_hour:
-                # 전역변수에 토큰 저장
-                import utils.globals
-                utils.globals.KIS_ACCESS_TOKEN = token
-                conn.close()
-                return token
-        
-        # 2. 만료 1시간 이내면 새로 발급
-        
-        url = "https://openapi.koreainvestment.com:9443/oauth2/tokenP"
-        body = {
-            "grant_type": "client_credentials",
-            "appkey": app_key,
-            "appsecret": app_secret,
-        }
-        headers = {
-            "Content-Type": "application/json",
-        }
-        
-        response = requests.post(url, headers=headers, json=body)
-        
-        if not response.ok:
-            log_print(f"[bold red]Error:[/bold red] 토큰 발급 실패: {response.status_code} {response.text}")
-            conn.close()
-            return None
-        
-        data = response.json()
-        access_token = data.get("access_token")
-        expired_at = data.get("access_token_token_expired")
-        
-        if not access_token or not expired_at:
-            log_print("[bold red]Error:[/bold red] 토큰 응답에 필수 필드가 없습니다.")
-            conn.close()
-            return None
-        
-        # DB에 저장
-        cursor.execute("""
-            INSERT INTO Token (provider, token, expired_at, created_at, updated_at)
-            VALUES (?, ?, ?, ?, ?)
-        """, ('kis', access_token, expired_at, now, now))
-        
-        conn.commit()
-        conn.close()
+            if not response.ok:
+                log_print(f"[bold red]Error:[/bold red] 토큰 발급 실패: {response.status_code} {response.text}")
+                return None, None
+            
+            data = response.json()
+            access_token = data.get("access_token")
+            expired_at = data.get("access_token_token_expired")
+            
+            if not access_token or not expired_at:
+                log_print("[bold red]Error:[/bold red] 토큰 응답에 필수 필드가 없습니다.")
+                return None, None
+            
+            # DB에 저장 후 잠금 해제 -> 대기 중인 프로세스가 이 토큰을 읽음
+            now = datetime.now()
+            with database.transaction() as conn:
+                conn.execute("""
+                    INSERT INTO Token (provider, token, expired_at, created_at, updated_at)
+                    VALUES (?, ?, ?, ?, ?)
+                """, (provider, access_token, expired_at, now, now))
         
-        # 전역변수에 토큰 저장
-        import utils.globals
-        utils.globals.KIS_ACCESS_TOKEN = access_token
-        return access_token
+        _set_global_token(access_token)
+        return access_token, datetime.fromisoformat(expired_at)
         
     except Exception as e:
         log_print(f"[bold red]Error:[/bold red] KIS 토큰 발급 중 오류 발생: {e}")
-        return None
\ No newline at end of file
+        return None, None
+
+def _set_global_token(token):
+    """전역변수에 토큰 저장"""
+    import utils.globals
+    utils.globals.KIS_ACCESS_TOKEN = token
@@ -0,0 +1,145 @@
+import threading
+from datetime import datetime, timedelta
+import utils.globals
+from utils.log_print import log_print
+from utils.scheduler import DateTrigger, scheduler
+
+
+class TokenManager:
+    """
+    KIS 접근 토큰 메모리 관리자
+
+    - 현재 토큰과 만료시각을 메모리에 들고 있다가 get_token() 으로 바로 돌려줍니다. (DB 조회 없음)
+    - 만료 REFRESH_MARGIN 전에 딱 한 번 갱신하도록 중앙 스케줄러(utils.scheduler)에 예약합니다.
+    - SQLite 는 갱신할 때만 사용합니다. (fetch_kis_token: DB 조회 -> 필요시 발급/저장)
+    - 갱신되면 utils.globals.KIS_ACCESS_TOKEN 과 subscribe() 로 등록한 콜백에 새 토큰을 전달합니다.
+    - 갱신에 실패하면 RETRY_DELAY 동안은 다시 시도하지 않고 아직 유효한 기존 토큰을 돌려줍니다. (주문 경로에서 매번 재발급 시도 방지)
+
+    사용 예시:
+        token_manager.start()
+        token = token_manager.get_token()
+    """
+    # 만료 몇 시간 전에 갱신할지 (get_kis_token 의 재사용 기준과 동일)
+    REFRESH_MARGIN = timedelta(hours=1)
+    # 갱신 실패 시 재시도 간격
+    RETRY_DELAY = timedelta(minutes=5)
+    # 스케줄러 작업 이름
+    JOB_NAME = "token_refresh"
+
+    def __init__(self):
+        self._token = None
+        self._expired_at = None
+        self._retry_after = None    # 갱신 실패 후 다음 시도 가능 시각
+        self._lock = threading.Lock()
+        self._listeners = []
+        self.last_refresh_time = None
+        self.next_refresh_at = None
+
+    def get_token(self):
+        """
+        현재 토큰 반환
+
+        평소에는 메모리 값만 읽고, 타이머가 밀려 갱신 시점을 지났을 때만 그 자리에서 갱신합니다.
+        """
+        token = self._cached(datetime.now())
+        if token is None:
+            return self.refresh()
+        return token
+
+    def _cached(self, now):
+        """갱신 없이 돌려줄 토큰 (갱신해야 하면 None)"""
+        if self._token is None or now >= self._expired_at:
+            return None
+        if now < self._expired_at - self.REFRESH_MARGIN:
+            return self._token
+        # 갱신 시점은 지났지만 직전 갱신이 실패해 재시도 대기 중 -> 아직 유효한 토큰 사용
+        if self._retry_after is not None and now < self._retry_after:
+            return self._token
+        return None
+
+    def refresh(self, force=False):
+        """
+        토큰 갱신 (DB 조회 -> 필요시 발급) 후 다음 갱신 예약, 새 토큰 반환 (실패시 None)
+
+        Args:
+            force (bool): True 면 아직 갱신 시점 전이어도 DB/발급 경로를 탐 (예약 타이머용)
+        """
+        from utils.token.get_token import fetch_kis_token
+
+        with self._lock:
+            # 다른 스레드가 먼저 갱신했거나 방금 실패해 재시도 대기 중이면 그대로 사용
+            if not force:
+                cached = self._cached(datetime.now())
+                if cached is not None:
+                    return cached
+
+            try:
+                token, expired_at = fetch_kis_token()
+            except Exception as e:
+                log_print(f"[bold red]Error:[/bold red] 토큰 조회/발급 실패: {e}")
+                token = expired_at = None
+            self.last_refresh_time = datetime.now()
+            if not token:
+                self._retry_after = self.last_refresh_time + self.RETRY_DELAY
+                self._schedule(self.RETRY_DELAY.total_seconds())
+                return self._token
+
+            changed = token != self._token
+            self._token = token
+            self._expired_at = expired_at
+            self._retry_after = None
+            utils.globals.KIS_ACCESS_TOKEN = token
+            self._schedule((expired_at - self.REFRESH_MARGIN - datetime.now()).total_seconds())
+
+        if changed:
+            for callback in list(self._listeners):
+                try:
+                    callback(token)
+                except Exception as e:
+                    log_print(f"[bold red]Error:[/bold red] 토큰 갱신 콜백 오류: {e}")
+        return token
+
+    def _schedule(self, delay_seconds):
+        """delay_seconds 뒤에 refresh 1회 예약 (기존 예약은 교체, 절전 등으로 늦어져도 실행)"""
+        delay_seconds = max(delay_seconds, 1)
+        self.next_refresh_at = datetime.now() + timedelta(seconds=delay_seconds)
+        scheduler.add_job(self.JOB_NAME, self._on_timer, DateTrigger(self.next_refresh_at), misfire_grace=None)
+        scheduler.start()
+
+    def _on_timer(self):
+        try:
+            if self.refresh(force=True):
+                log_print(f"[dim][TOKEN] 토큰 갱신 완료 (다음 갱신: {self.next_refresh_at.strftime('%Y-%m-%d %H:%M:%S')})[/dim]")
+        except Exception as e:
+            log_print(f"[bold red]Error:[/bold red] 토큰 갱신 실패: {e}")
+            self._schedule(self.RETRY_DELAY.total_seconds())
+
+    def start(self):
+        """최초 토큰 로드 + 갱신 예약 (성공시 토큰 반환)"""
+        return self.refresh()
+
+    def stop(self):
+        """예약된 갱신 취소"""
+        scheduler.remove_job(self.JOB_NAME)
+        self.next_refresh_at = None
+
+    def subscribe(self, callback):
+        """토큰이 바뀔 때 callback(token) 호출"""
+        self._listeners.append(callback)
+
+    @property
+    def token(self):
+        """현재 메모리 토큰 (갱신하지 않음)"""
+        return self._token
+
+    @property
+    def expired_at(self):
+        return self._expired_at
+
+    @property
+    def is_running(self):
+        return scheduler.running and scheduler.get_job(self.JOB_NAME) is not None
+
+
+# 전역 토큰 관리자 인스턴스
+token_manager = TokenManager()
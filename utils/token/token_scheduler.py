@@ -1,91 +1,58 @@
-import threading
-import time
-from datetime import datetime, timedelta
-from utils.token.get_token import get_kis_token
-from utils.globals import KIS_ACCESS_TOKEN
+from utils.token.token_manager import token_manager
 from utils.log_print import log_print
-from rich import print
 
 class TokenScheduler:
-    def __init__(self, check_interval_minutes=30):
+    def __init__(self, manager=token_manager):
         """
         토큰 자동 갱신 스케줄러
-        
+
+        주기적으로 DB 를 폴링하지 않고, TokenManager 가 만료 1시간 전에 딱 한 번 갱신하도록
+        중앙 스케줄러(utils.scheduler)에 예약합니다.
+
         Args:
-            check_interval_minutes (int): 토큰 체크 간격 (분 단위, 기본값: 30분)
+            manager (TokenManager): 토큰 관리자 (기본값: 전역 token_manager)
         """
-        self.check_interval_minutes = check_interval_minutes
-        self.is_running = False
-        self.scheduler_thread = None
-        self.last_check_time = None
-        
+        self.manager = manager
+
     def start(self):
         """스케줄러 시작"""
-        if self.is_running:
+        if self.manager.is_running:
             log_print("[bold yellow]Warning:[/bold yellow] 토큰 스케줄러가 이미 실행 중입니다.")
             return
-            
-        self.is_running = True
-        self.scheduler_thread = threading.Thread(target=self._scheduler_loop, daemon=True)
-        self.scheduler_thread.start()
-        log_print(f"[bold green]토큰 스케줄러가 시작되었습니다. (체크 간격: {self.check_interval_minutes}분)[/bold green]")
-        
+
+        self.manager.start()
+        next_refresh_at = self.manager.next_refresh_at
+        next_text = next_refresh_at.strftime('%Y-%m-%d %H:%M:%S') if next_refresh_at else "-"
+        log_print(f"[bold green]토큰 스케줄러가 시작되었습니다. (다음 갱신: {next_text})[/bold green]")
+
     def stop(self):
         """스케줄러 중지"""
-        self.is_running = False
-        if self.scheduler_thread:
-            self.scheduler_thread.join(timeout=5)
+        self.manager.stop()
         log_print("[bold yellow]토큰 스케줄러가 중지되었습니다.[/bold yellow]")
-        
-    def _scheduler_loop(self):
-        """스케줄러 메인 루프"""
-        while self.is_running:
-            try:
-                # 현재 시간 기록
-                self.last_check_time = datetime.now()
-                
-                # 토큰 가져오기 (필요시 자동 갱신)
-                token = get_kis_token()
-                
-                if token:
-                    print(f"[dim][SCHEDULER] 토큰 상태: 정상 (다음 체크: {(self.last_check_time + timedelta(minutes=self.check_interval_minutes)).strftime('%Y-%m-%d %H:%M:%S')})[/dim]")
-                
-                # 지정된 간격만큼 대기
-                time.sleep(self.check_interval_minutes * 60)
-                
-            except Exception as e:
-                time.sleep(300)
-                
+
     def get_status(self):
         """스케줄러 상태 정보 반환"""
+        token = self.manager.token
         status = {
-            "is_running": self.is_running,
-            "check_interval_minutes": self.check_interval_minutes,
-            "last_check_time": self.last_check_time,
-            "current_token": KIS_ACCESS_TOKEN[:4] + "..." if KIS_ACCESS_TOKEN else None
+            "is_running": self.manager.is_running,
+            "last_check_time": self.manager.last_refresh_time,
+            "next_refresh_at": self.manager.next_refresh_at,
+            "expired_at": self.manager.expired_at,
+            "current_token": token[:4] + "..." if token else None
         }
         return status
 
 # 전역 스케줄러 인스턴스
 token_scheduler = TokenScheduler()
 
-def start_token_scheduler(check_interval_minutes=30):
-    """
-    토큰 스케줄러 시작 함수
-    
-    Args:
-        check_interval_minutes (int): 체크 간격 (분 단위)
-    """
-    global token_scheduler
-    token_scheduler = TokenScheduler(check_interval_minutes)
+def start_token_scheduler():
+    """토큰 스케줄러 시작 함수"""
     token_scheduler.start()
-    
+
 def stop_token_scheduler():
     """토큰 스케줄러 중지 함수"""
-    global token_scheduler
     token_scheduler.stop()
-    
+
 def get_scheduler_status():
     """스케줄러 상태 조회 함수"""
-    global token_scheduler
-    return token_scheduler.get_status() 
\ No newline at end of file
+    return token_scheduler.get_status()